@@ -0,0 +1,137 @@
+"""Benchmark: encoding + writing RPC responses to a pipe.
+
+Compares the old response path (pydantic ``Response.model_dump_json`` +
+write + flush per line) with ``kibrary_sidecar.wire`` (direct encoding,
+orjson when installed, one flush per drained burst).  Two workloads:
+
+* large — ~1 MB results, the size of a base64 photo data URL or a big
+  ``parts.read_file`` body;
+* burst — many small ``download.progress``-style notifications, where
+  per-line flushes dominate.
+
+Output goes to a real OS pipe drained by a reader thread, like the Rust
+shell reading the sidecar's stdout.
+
+Usage (from sidecar/):
+    python benchmarks/bench_json_encoding.py [--count 200] [--size-mb 1] [--burst 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from kibrary_sidecar import wire  # noqa: E402
+from kibrary_sidecar.protocol import Notification, Response  # noqa: E402
+
+
+def _pipe_stdout():
+    """Return (text stream writing into a pipe, stop()) — stop returns bytes read."""
+    rfd, wfd = os.pipe()
+    total = [0]
+
+    def drain() -> None:
+        while True:
+            chunk = os.read(rfd, 1 << 20)
+            if not chunk:
+                break
+            total[0] += len(chunk)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    stream = io.TextIOWrapper(io.FileIO(wfd, "wb"), encoding="utf-8")
+
+    def stop() -> int:
+        stream.close()
+        reader.join()
+        os.close(rfd)
+        return total[0]
+
+    return stream, stop
+
+
+def _large(count: int, size_mb: float) -> list[dict]:
+    raw = os.urandom(int(size_mb * 1024 * 1024 * 3 / 4))
+    photo = "data:image/jpeg;base64," + base64.b64encode(raw).decode("ascii")
+    sym = '(symbol "R_1" (property "Value" "10k \\"x\\"") (pin passive line))\n'
+    text = sym * int(size_mb * 1024 * 1024 / len(sym))
+    return [{"data_url": photo} if i % 2 else {"content": text} for i in range(count)]
+
+
+def _old_path(items: list[dict], notify: bool, sink) -> None:
+    for i, item in enumerate(items):
+        if notify:
+            line = Notification(event="download.progress", params=item).model_dump_json()
+        else:
+            line = Response(id=i, ok=True, result=item).model_dump_json(exclude_none=True)
+        sink.write(line + "\n")
+        sink.flush()
+
+
+def _new_path(items: list[dict], notify: bool, sink) -> None:
+    saved = sys.stdout
+    sys.stdout = sink
+    writer = wire.StdoutWriter()
+    try:
+        for i, item in enumerate(items):
+            if notify:
+                writer.write(wire.encode({"event": "download.progress", "params": item}))
+            else:
+                writer.write(wire.encode({"id": i, "ok": True, "result": item}))
+    finally:
+        writer.close()
+        sys.stdout = saved
+
+
+def _run(name: str, fn, items: list[dict], notify: bool) -> None:
+    sink, stop = _pipe_stdout()
+    start = time.perf_counter()
+    fn(items, notify, sink)
+    sink.flush()
+    elapsed = time.perf_counter() - start
+    nbytes = stop()
+    print(
+        f"  {name:<28} {len(items) / elapsed:10.1f} lines/s  "
+        f"{nbytes / elapsed / 1e6:8.1f} MB/s  ({elapsed * 1000:.0f} ms)"
+    )
+
+
+def _compare(items: list[dict], notify: bool) -> None:
+    _run("pydantic + flush per line", _old_path, items, notify)
+    _run("wire (orjson)" if wire.orjson else "wire (pydantic-core)", _new_path, items, notify)
+    if wire.orjson is not None:
+        saved, wire.orjson = wire.orjson, None
+        try:
+            _run("wire (pydantic-core)", _new_path, items, notify)
+        finally:
+            wire.orjson = saved
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--count", type=int, default=200)
+    ap.add_argument("--size-mb", type=float, default=1.0)
+    ap.add_argument("--burst", type=int, default=20000)
+    args = ap.parse_args()
+
+    print(f"orjson installed: {'yes' if wire.orjson else 'no'}")
+    print(f"large: {args.count} responses of ~{args.size_mb} MB")
+    _compare(_large(args.count, args.size_mb), notify=False)
+    print(f"burst: {args.burst} progress notifications")
+    progress = [
+        {"lcsc": f"C{i}", "status": "downloading", "progress": i % 100}
+        for i in range(args.burst)
+    ]
+    _compare(progress, notify=True)
+
+
+if __name__ == "__main__":
+    main()
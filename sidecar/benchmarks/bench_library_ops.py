@@ -0,0 +1,147 @@
+"""Benchmark: library operations on a generated production-size workspace.
+
+Builds a workspace with :mod:`workspace_gen` (default 20 libraries × 500
+symbols, 10% multi-unit, half the icons missing, one git commit per
+library) and times, in order:
+
+* ``lib_scanner.list_libraries``: cold (no index), warm, and ``fast``;
+* ``lib_scanner.list_components`` / ``get_component`` on one library;
+* ``lib_ops``: ``rename_component``, ``move_component``,
+  ``delete_component``, ``rename_library``;
+* ``library.commit_to_library``: merging ``--commits`` staged parts into
+  an existing library, one at a time;
+* ``library.commit_many``: the same number of parts again, as one batch
+  spread over two libraries;
+* ``icons.backfill_icons`` over the whole workspace.  When ``kicad-cli``
+  is not installed a stub that writes a fixed SVG is put on PATH, so the
+  number is kibrary's own overhead plus one process spawn per icon.
+
+Usage (from sidecar/):
+    python benchmarks/bench_library_ops.py [--libraries 20] [--symbols 500]
+        [--commits 20] [--seed 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import workspace_gen  # noqa: E402
+from kibrary_sidecar import icons, lib_index, lib_ops, lib_scanner, library  # noqa: E402
+
+_STUB_KICAD_CLI = """#!/bin/sh
+# kicad-cli fp export svg ... --output DIR PRETTY: write DIR/<footprint>.svg
+fp=""; out=""
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --footprint) fp="$2"; shift ;;
+    --output) out="$2"; shift ;;
+  esac
+  shift
+done
+printf '<svg xmlns="http://www.w3.org/2000/svg"/>' > "$out/$fp.svg"
+"""
+
+
+def timed(results: list, label: str, fn, *args, repeat: int = 1, **kwargs):
+    samples = []
+    value = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        value = fn(*args, **kwargs)
+        samples.append((time.perf_counter() - t0) * 1000)
+    results.append((label, repeat, statistics.mean(samples), max(samples)))
+    return value
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--libraries", type=int, default=20)
+    ap.add_argument("--symbols", type=int, default=500, help="symbols per library")
+    ap.add_argument("--commits", type=int, default=20, help="staged parts to commit")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    results: list[tuple[str, int, float, float]] = []
+    with tempfile.TemporaryDirectory(prefix="kibrary-bench-") as tmp:
+        tmp = Path(tmp)
+        ws = tmp / "ws"
+        info = timed(
+            results, "generate workspace", workspace_gen.generate_workspace,
+            ws, args.libraries, args.symbols, seed=args.seed, git=shutil.which("git") is not None,
+        )
+        names = info["libraries"]
+
+        lib_index.invalidate()
+        timed(results, "list_libraries (cold)", lib_scanner.list_libraries, ws)
+        timed(results, "list_libraries (warm)", lib_scanner.list_libraries, ws, repeat=5)
+        lib_index.invalidate()
+        timed(results, "list_libraries (fast)", lib_scanner.list_libraries, ws, fast=True, repeat=5)
+
+        lib0 = ws / names[0]
+        components = timed(results, "list_components", lib_scanner.list_components, lib0, repeat=5)
+        sample = components[len(components) // 2]["name"]
+        timed(results, "get_component", lib_scanner.get_component, lib0, sample, repeat=20)
+
+        timed(results, "rename_component", lib_ops.rename_component, lib0, sample, sample + "_R")
+        timed(results, "move_component", lib_ops.move_component, lib0, ws / names[1], sample + "_R")
+        timed(results, "delete_component", lib_ops.delete_component, ws / names[1], sample + "_R")
+        renamed = names[-1].replace("_KSL", "Renamed_KSL")
+        timed(results, "rename_library", lib_ops.rename_library, ws, names[-1], renamed)
+
+        staging = tmp / "staging"
+        parts = [
+            workspace_gen.generate_staged_part(staging, f"C{9_000_000 + i}", seed=args.seed)
+            for i in range(args.commits)
+        ]
+        commit_ms = []
+        for part in parts:
+            t0 = time.perf_counter()
+            library.commit_to_library(ws, part.name, part, names[0], {})
+            commit_ms.append((time.perf_counter() - t0) * 1000)
+        results.append(("commit_to_library (merge)", len(commit_ms), statistics.mean(commit_ms), max(commit_ms)))
+
+        batch = [
+            {
+                "lcsc": part.name,
+                "staging_part": part,
+                "target_lib": names[i % 2],
+                "edits": {},
+            }
+            for i, part in enumerate(
+                workspace_gen.generate_staged_part(staging, f"C{9_500_000 + i}", seed=args.seed)
+                for i in range(args.commits)
+            )
+        ]
+        timed(results, f"commit_many ({args.commits} parts)", library.commit_many, ws, batch)
+
+        stub_note = ""
+        if shutil.which("kicad-cli") is None:
+            bin_dir = tmp / "bin"
+            bin_dir.mkdir()
+            stub = bin_dir / "kicad-cli"
+            stub.write_text(_STUB_KICAD_CLI)
+            stub.chmod(0o755)
+            os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+            stub_note = " (stub kicad-cli)"
+        backfill = timed(results, "backfill_icons" + stub_note, icons.backfill_icons, ws)
+
+    print(
+        f"workspace: {args.libraries} libraries x {args.symbols} symbols (seed {args.seed}); "
+        f"backfill rendered {backfill['icons_rendered']} icons"
+    )
+    print(f"{'operation':<36} {'runs':>5} {'mean ms':>10} {'max ms':>10}")
+    for label, runs, mean, worst in results:
+        print(f"{label:<36} {runs:>5} {mean:>10.1f} {worst:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Benchmark: end-to-end RPC throughput of the sidecar over its stdio pipes.
+
+Spawns ``python -m kibrary_sidecar`` the way the Rust shell does and
+drives it with synthetic workloads, keeping up to ``--window`` requests in
+flight (the shell pipelines whatever the UI fires).  For each workload it
+reports requests/sec, p50/p99 latency (send → response line read) and
+stdout bytes/sec:
+
+* ping — thousands of ``system.ping``: pure dispatcher + wire overhead;
+* library — ``library.list_components`` / ``library.get_component``
+  mixed 1:9 over a :mod:`workspace_gen` workspace of a few libraries with
+  thousands of symbols each;
+* photo — a burst of ``search.fetch_photo`` against a local stub HTTP
+  server standing in for search.raph.io (distinct parts, so the photo
+  LRU never hits), in data-URL mode and, with ``--as-file``, in blob
+  mode.
+
+The sidecar runs with a throwaway config dir (so the stub's URL can be
+set in its settings.json) and with the background pre-warm off.
+
+Usage (from sidecar/):
+    python benchmarks/bench_rpc_throughput.py [--pings 5000] [--lookups 2000]
+        [--photos 500] [--symbols 3000] [--window 32] [--as-file]
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import workspace_gen
+
+SIDECAR_DIR = Path(__file__).resolve().parents[1]
+
+# ~40 KB, about the size of a real part thumbnail
+PHOTO_BYTES = b"\xff\xd8\xff\xe0" + os.urandom(40 * 1024)
+
+
+class Sidecar:
+    """A sidecar subprocess with a reader thread matching responses to ids."""
+
+    def __init__(self, config_dir: Path, window: int) -> None:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SIDECAR_DIR), env.get("PYTHONPATH")]))
+        env["XDG_CONFIG_HOME"] = str(config_dir)
+        env["APPDATA"] = str(config_dir)
+        env["KIBRARY_SIDECAR_PREWARM"] = "0"
+        env["KIBRARY_SEARCH_API_KEY"] = "bench"
+        env["NO_PROXY"] = env["no_proxy"] = "127.0.0.1"
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "kibrary_sidecar"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=SIDECAR_DIR,
+            env=env,
+        )
+        self._next_id = 0
+        self._sent: dict[int, float] = {}
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._bytes = 0
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._window = window
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def run(self, requests: list[tuple[str, dict]]) -> dict:
+        """Send *requests* with at most ``window`` in flight; wait for all."""
+        with self._cond:
+            self._latencies = []
+            self._errors = 0
+            self._bytes = 0
+        started = time.perf_counter()
+        for method, params in requests:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending < self._window)
+                self._next_id += 1
+                req_id = self._next_id
+                self._pending += 1
+                self._sent[req_id] = time.perf_counter()
+            line = json.dumps({"id": req_id, "method": method, "params": params}) + "\n"
+            self.proc.stdin.write(line.encode())
+            self.proc.stdin.flush()
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending == 0)
+            elapsed = time.perf_counter() - started
+            latencies = sorted(self._latencies)
+            return {
+                "requests": len(requests),
+                "errors": self._errors,
+                "elapsed_s": elapsed,
+                "req_per_s": len(requests) / elapsed,
+                "p50_ms": _percentile(latencies, 0.50) * 1000,
+                "p99_ms": _percentile(latencies, 0.99) * 1000,
+                "stdout_mb_per_s": self._bytes / elapsed / 1e6,
+            }
+
+    def close(self) -> None:
+        self.proc.stdin.close()
+        self.proc.wait(timeout=30)
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            now = time.perf_counter()
+            msg = json.loads(line)
+            with self._cond:
+                self._bytes += len(line)
+                req_id = msg.get("id")
+                if req_id is None or "event" in msg:
+                    continue  # notification
+                self._latencies.append(now - self._sent.pop(req_id))
+                if not msg.get("ok") or "error" in (msg.get("result") or {}):
+                    self._errors += 1
+                self._pending -= 1
+                self._cond.notify_all()
+
+
+class _PhotoHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(PHOTO_BYTES)))
+        self.end_headers()
+        self.wfile.write(PHOTO_BYTES)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_photo_server() -> tuple[http.server.ThreadingHTTPServer, str]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _PhotoHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pings", type=int, default=5000)
+    ap.add_argument("--lookups", type=int, default=2000)
+    ap.add_argument("--photos", type=int, default=500)
+    ap.add_argument("--symbols", type=int, default=3000, help="symbols per generated library")
+    ap.add_argument("--libraries", type=int, default=3)
+    ap.add_argument("--window", type=int, default=32, help="max requests in flight")
+    ap.add_argument("--as-file", action="store_true", help="photos via the blob store")
+    args = ap.parse_args()
+
+    server, base_url = start_photo_server()
+    with tempfile.TemporaryDirectory(prefix="kibrary-bench-") as tmp:
+        tmp = Path(tmp)
+        settings = tmp / "config" / "kibrary" / "settings.json"
+        settings.parent.mkdir(parents=True)
+        settings.write_text(json.dumps({"search_raph_io": {"enabled": True, "base_url": base_url}}))
+        workspace = tmp / "ws"
+        generated = workspace_gen.generate_workspace(
+            workspace, args.libraries, args.symbols, icons=0, git=False
+        )
+        symbols = list(generated["lcscs"].values())
+
+        sidecar = Sidecar(tmp / "config", args.window)
+        try:
+            sidecar.run([("system.ping", {})] * 10)  # let the workers start
+
+            results = {}
+            results["ping"] = sidecar.run([("system.ping", {})] * args.pings)
+
+            # Index the libraries once so the workload measures serving them
+            sidecar.run([("library.list", {"workspace": str(workspace)})])
+            lookups = []
+            for i in range(args.lookups):
+                lib, name = symbols[(i * 7919) % len(symbols)]
+                lib_dir = str(workspace / lib)
+                if i % 10 == 0:
+                    lookups.append(("library.list_components", {"lib_dir": lib_dir}))
+                else:
+                    lookups.append(("library.get_component", {"lib_dir": lib_dir, "component_name": name}))
+            results["library"] = sidecar.run(lookups)
+
+            photo_params = {"as_file": True, "workspace": str(workspace)} if args.as_file else {}
+            results["photo"] = sidecar.run(
+                [("search.fetch_photo", {"lcsc": f"C{i}", **photo_params}) for i in range(args.photos)]
+            )
+        finally:
+            sidecar.close()
+            server.shutdown()
+
+    print(f"{'workload':<10} {'requests':>9} {'errors':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'stdout MB/s':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['requests']:>9} {r['errors']:>7} {r['req_per_s']:>10.0f} "
+            f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['stdout_mb_per_s']:>12.2f}"
+        )
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Benchmark: sidecar cold start — time-to-first-ping, import cost, peak RSS.
+
+Spawns ``python -m kibrary_sidecar`` the way the Rust shell does, writes a
+single ``system.ping`` and measures:
+
+* time-to-first-ping — until its response line arrives.  That is the wait
+  the app sees before the UI can talk to the sidecar at all, so it
+  includes interpreter start-up and every import ``rpc.serve`` needs;
+* import cost — the same start-up under ``-X importtime``, parsed per
+  module, so a regression can be traced to the import that caused it;
+* peak RSS — the child's ``ru_maxrss`` once it exits (POSIX only).
+
+The background warm-up (:mod:`kibrary_sidecar.prewarm`) stays on for
+time-to-first-ping, since users get it too, and is switched off for the
+import and RSS numbers — otherwise they would depend on how far it got
+before the process exited.
+
+Each run is a fresh process; the median and the best run are reported
+(the best is the least noisy estimate of import cost, the median what a
+user typically sees).
+
+Regression gate
+---------------
+``startup_thresholds.json`` next to this file holds the budget for each
+number.  Run under pytest to fail when one is exceeded::
+
+    python -m pytest benchmarks/bench_startup.py
+
+(the file is not named ``test_*`` so the regular test run skips it).  Set
+``KIBRARY_BENCH_TOLERANCE`` to a multiplier (e.g. ``1.5``) on slow CI
+machines.  When a budget has to move on purpose, edit the JSON in the
+same commit that moves it.
+
+Usage (from sidecar/):
+    python benchmarks/bench_startup.py [--runs 20] [--top 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SIDECAR_DIR = Path(__file__).resolve().parents[1]
+THRESHOLDS_FILE = Path(__file__).with_name("startup_thresholds.json")
+
+PING = b'{"id": 1, "method": "system.ping", "params": {}}\n'
+
+# "import time:       606 |      16254 |             pydantic_core"
+_IMPORTTIME_RE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+def run_sidecar(python: str = sys.executable, importtime: bool = False, prewarm: bool = True) -> dict:
+    """Spawn one sidecar, ping it, shut it down.
+
+    Returns ``{elapsed_s, peak_rss_kb, stderr}``; ``peak_rss_kb`` is None
+    where ``os.wait4`` is unavailable (Windows).
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SIDECAR_DIR), env.get("PYTHONPATH")]))
+    env["KIBRARY_SIDECAR_PREWARM"] = "1" if prewarm else "0"
+    argv = [python] + (["-X", "importtime"] if importtime else []) + ["-m", "kibrary_sidecar"]
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        argv,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=SIDECAR_DIR,
+        env=env,
+    )
+    proc.stdin.write(PING)
+    proc.stdin.flush()
+    line = proc.stdout.readline()
+    elapsed = time.perf_counter() - started
+    proc.stdin.close()
+    stderr = proc.stderr.read().decode("utf-8", "replace")
+    peak_rss_kb = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    else:
+        proc.wait(timeout=30)
+    proc.stdout.close()
+    proc.stderr.close()
+
+    resp = json.loads(line) if line else {}
+    if not resp.get("ok"):
+        raise RuntimeError(f"ping failed: {line!r}\n{stderr}")
+    return {"elapsed_s": elapsed, "peak_rss_kb": peak_rss_kb, "stderr": stderr}
+
+
+def time_to_first_ping(python: str = sys.executable) -> float:
+    """Seconds from spawn until the first ``system.ping`` response."""
+    return run_sidecar(python)["elapsed_s"]
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parse ``-X importtime`` output into ``[{module, self_ms, cumulative_ms, depth}]``.
+
+    ``depth`` is 0 for modules imported directly by the entry point.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, module = m.groups()
+        rows.append({
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cum_us) / 1000,
+            "depth": (len(indent) - 1) // 2,
+        })
+    return rows
+
+
+def import_cost() -> dict:
+    """Import profile of one start-up: ``{total_ms, modules}``.
+
+    ``total_ms`` sums the top-level imports, i.e. everything imported
+    after the interpreter's own start-up (``site`` and friends excluded).
+    """
+    rows = parse_importtime(run_sidecar(importtime=True, prewarm=False)["stderr"])
+    startup = {"site", "encodings", "_frozen_importlib_external", "zipimport", "codecs", "io", "abc"}
+    top = [r for r in rows if r["depth"] == 0 and r["module"] not in startup]
+    return {"total_ms": round(sum(r["cumulative_ms"] for r in top), 1), "modules": rows}
+
+
+def measure(runs: int) -> dict:
+    """Run *runs* timed cold starts, three RSS starts and one ``-X importtime``
+    start; return the numbers the thresholds apply to."""
+    run_sidecar()  # warm the OS page cache and __pycache__
+    samples = [run_sidecar()["elapsed_s"] * 1000 for _ in range(runs)]
+    rss = [r["peak_rss_kb"] for r in (run_sidecar(prewarm=False) for _ in range(3))
+           if r["peak_rss_kb"] is not None]
+    imports = import_cost()
+    return {
+        "time_to_first_ping_ms": {
+            "median": round(statistics.median(samples), 1),
+            "best": round(min(samples), 1),
+            "worst": round(max(samples), 1),
+        },
+        "import_ms": imports["total_ms"],
+        "peak_rss_mb": round(max(rss) / 1024, 1) if rss else None,
+        "modules": imports["modules"],
+    }
+
+
+def load_thresholds() -> dict:
+    thresholds = json.loads(THRESHOLDS_FILE.read_text(encoding="utf-8"))
+    tolerance = float(os.environ.get("KIBRARY_BENCH_TOLERANCE", "1"))
+    return {k: v * tolerance if isinstance(v, (int, float)) else v for k, v in thresholds.items()}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = ap.parse_args()
+
+    result = measure(args.runs)
+    limits = load_thresholds()
+    ping = result["time_to_first_ping_ms"]
+    print(
+        f"time-to-first-ping over {args.runs} runs: median {ping['median']:.1f} ms, "
+        f"best {ping['best']:.1f} ms, worst {ping['worst']:.1f} ms "
+        f"(budget {limits['time_to_first_ping_ms']:.0f} ms median)"
+    )
+    print(f"import cost: {result['import_ms']:.1f} ms (budget {limits['import_ms']:.0f} ms)")
+    if result["peak_rss_mb"] is not None:
+        print(f"peak RSS: {result['peak_rss_mb']:.1f} MB (budget {limits['peak_rss_mb']:.0f} MB)")
+
+    print(f"\nslowest {args.top} imports (cumulative ms, self ms):")
+    for row in sorted(result["modules"], key=lambda r: r["cumulative_ms"], reverse=True)[: args.top]:
+        print(f"  {row['cumulative_ms']:8.1f} {row['self_ms']:8.1f}  {row['module']}")
+
+
+# ---------------------------------------------------------------------------
+# pytest entry points — ``python -m pytest benchmarks/bench_startup.py``
+# ---------------------------------------------------------------------------
+
+
+def test_time_to_first_ping_within_budget():
+    limits = load_thresholds()
+    run_sidecar()
+    samples = [time_to_first_ping() * 1000 for _ in range(5)]
+    assert statistics.median(samples) <= limits["time_to_first_ping_ms"], samples
+
+
+def test_import_cost_within_budget():
+    limits = load_thresholds()
+    cost = import_cost()
+    slowest = sorted(cost["modules"], key=lambda r: r["cumulative_ms"], reverse=True)[:10]
+    assert cost["total_ms"] <= limits["import_ms"], [
+        (r["module"], r["cumulative_ms"]) for r in slowest
+    ]
+
+
+def test_deferred_modules_stay_deferred():
+    loaded = {r["module"] for r in import_cost()["modules"]}
+    assert not loaded & set(load_thresholds()["deferred_modules"])
+
+
+def test_peak_rss_within_budget():
+    import pytest
+
+    rss_kb = run_sidecar(prewarm=False)["peak_rss_kb"]
+    if rss_kb is None:
+        pytest.skip("peak RSS needs os.wait4 (POSIX)")
+    assert rss_kb / 1024 <= load_thresholds()["peak_rss_mb"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Synthetic KiCad library workspaces for benchmarks.
+
+The test fixtures are a single four-line ``sample.kicad_sym``; real
+workspaces have dozens of ``_KSL`` libraries with thousands of symbols.
+This module builds workspaces of a chosen size, in the layout
+``library.commit_to_library`` produces::
+
+    <root>/
+      repository.json                      {"packages": [{"path": "<lib>/metadata.json"}, ...]}
+      .kibrary/                            (so lib_index persists, like an opened workspace)
+      <lib>/
+        <lib>.kicad_sym                    N symbols; some multi-unit
+        <lib>.pretty/<symbol>.kicad_mod    one footprint per symbol
+        <lib>.3dshapes/<symbol>.step       one model per symbol, referenced via ${KSL_ROOT}
+        <lib>.icons/<symbol>.svg           for a fraction of symbols (the rest need backfill)
+        metadata.json
+
+plus, optionally, a git history with one commit per library.  Output is a
+pure function of the arguments: the same seed gives byte-identical files
+(and, with fixed commit dates, identical git object ids).
+
+:func:`generate_staged_part` builds a ``<staging>/<lcsc>/`` directory as
+the downloader leaves it, for ``commit_to_library`` benchmarks.
+
+Usage (from sidecar/):
+    python benchmarks/workspace_gen.py OUT_DIR [--libraries 20] [--symbols 500]
+        [--seed 0] [--multi-unit 0.1] [--icons 0.5] [--no-git]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+KSL_ROOT = "${KSL_ROOT}"
+
+# Fixed identity and dates so the git history is reproducible.
+_GIT_ENV = {
+    "GIT_AUTHOR_NAME": "kibrary-bench",
+    "GIT_AUTHOR_EMAIL": "bench@kibrary.invalid",
+    "GIT_COMMITTER_NAME": "kibrary-bench",
+    "GIT_COMMITTER_EMAIL": "bench@kibrary.invalid",
+}
+_GIT_EPOCH = 1_700_000_000
+
+_FAMILIES = (
+    # (library stem, reference, value pattern, footprint stem)
+    ("Resistors", "R", "{n}R", "R_0603_1608Metric"),
+    ("Capacitors", "C", "{n}nF", "C_0402_1005Metric"),
+    ("Inductors", "L", "{n}uH", "L_0805_2012Metric"),
+    ("Diodes", "D", "D{n}", "D_SOD-123"),
+    ("Transistors", "Q", "Q{n}", "SOT-23"),
+    ("ICs", "U", "IC{n}", "SOIC-8_3.9x4.9mm_P1.27mm"),
+    ("Connectors", "J", "Conn_{n}", "PinHeader_1x04_P2.54mm"),
+)
+
+_FONT = "(effects (font (size 1.27 1.27)))"
+_HIDDEN = "(effects (font (size 1.27 1.27)) hide)"
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def generate_workspace(
+    root: Path,
+    libraries: int = 20,
+    symbols: int = 500,
+    *,
+    seed: int = 0,
+    multi_unit: float = 0.1,
+    icons: float = 0.5,
+    git: bool = True,
+) -> dict:
+    """Build a workspace under *root* (created; must not already hold libraries).
+
+    *multi_unit* is the fraction of symbols with 2–4 units, *icons* the
+    fraction that already has a rendered icon.  Returns
+    ``{root, libraries: [names], symbols, lcscs}`` where ``lcscs`` maps each
+    symbol's LCSC number to ``(library, symbol)``.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".kibrary" / "cache").mkdir(parents=True, exist_ok=True)
+    if git:
+        _git(root, "init", "-q", "-b", "main")
+
+    names: list[str] = []
+    lcscs: dict[str, tuple[str, str]] = {}
+    packages = []
+    next_lcsc = 100_000
+    for i in range(libraries):
+        family = _FAMILIES[i % len(_FAMILIES)]
+        lib_name = f"{family[0]}{i // len(_FAMILIES) or ''}_KSL"
+        symbol_names = []
+        for j in range(symbols):
+            symbol_names.append((f"{family[1]}_{lib_name[:-4]}_{j:05d}", f"C{next_lcsc}"))
+            next_lcsc += 1 + rng.randrange(3)
+        write_library(root / lib_name, symbol_names, family, rng, multi_unit=multi_unit, icons=icons)
+        for sym_name, lcsc in symbol_names:
+            lcscs[lcsc] = (lib_name, sym_name)
+        names.append(lib_name)
+        packages.append({"path": f"{lib_name}/metadata.json"})
+        (root / "repository.json").write_text(json.dumps({"packages": packages}, indent=2))
+        if git:
+            _git(root, "add", "-A")
+            _git(root, "commit", "-q", "-m", f"Add {lib_name}", date=_GIT_EPOCH + i * 3600)
+
+    return {"root": root, "libraries": names, "symbols": libraries * symbols, "lcscs": lcscs}
+
+
+def write_library(
+    lib_dir: Path,
+    symbols: list[tuple[str, str]],
+    family: tuple[str, str, str, str] = _FAMILIES[0],
+    rng: random.Random | None = None,
+    *,
+    multi_unit: float = 0.0,
+    icons: float = 0.0,
+) -> Path:
+    """Write one library for ``[(symbol_name, lcsc), ...]`` into *lib_dir*."""
+    rng = rng or random.Random(0)
+    lib_name = lib_dir.name
+    pretty = lib_dir / f"{lib_name}.pretty"
+    shapes = lib_dir / f"{lib_name}.3dshapes"
+    icons_dir = lib_dir / f"{lib_name}.icons"
+    for d in (pretty, shapes, icons_dir):
+        d.mkdir(parents=True, exist_ok=True)
+
+    out = ['(kicad_symbol_lib (version 20231120) (generator "kibrary_bench")\n']
+    for name, lcsc in symbols:
+        units = rng.randint(2, 4) if rng.random() < multi_unit else 1
+        out.append(symbol_text(name, lcsc, f"{lib_name}:{name}", family, rng.randint(1, 999), units))
+        (pretty / f"{name}.kicad_mod").write_text(
+            footprint_text(name, f"{KSL_ROOT}/{lib_name}/{lib_name}.3dshapes/{name}.step", rng),
+            encoding="utf-8",
+        )
+        (shapes / f"{name}.step").write_bytes(_step_bytes(name, rng))
+        if rng.random() < icons:
+            (icons_dir / f"{name}.svg").write_text(_SVG.format(name=name), encoding="utf-8")
+    out.append(")\n")
+    (lib_dir / f"{lib_name}.kicad_sym").write_text("".join(out), encoding="utf-8")
+    (lib_dir / "metadata.json").write_text(json.dumps(_metadata(lib_name), indent=2))
+    return lib_dir
+
+
+def generate_staged_part(staging_dir: Path, lcsc: str, *, seed: int = 0, units: int = 1) -> Path:
+    """Build ``<staging_dir>/<lcsc>/`` the way the downloader leaves it:
+    ``<lcsc>.kicad_sym`` with one symbol whose footprint is ``.:<name>``,
+    ``<lcsc>.pretty/`` and ``<lcsc>.3dshapes/`` with a relative model path,
+    and a pre-rendered ``<lcsc>.icon.svg``.  Returns the part directory."""
+    rng = random.Random(f"{seed}:{lcsc}")
+    family = _FAMILIES[rng.randrange(len(_FAMILIES))]
+    name = f"{family[1]}_{lcsc}"
+    part = Path(staging_dir) / lcsc
+    (part / f"{lcsc}.pretty").mkdir(parents=True, exist_ok=True)
+    (part / f"{lcsc}.3dshapes").mkdir(parents=True, exist_ok=True)
+    (part / f"{lcsc}.kicad_sym").write_text(
+        '(kicad_symbol_lib (version 20231120) (generator "JLC2KiCadLib")\n'
+        + symbol_text(name, lcsc, f".:{name}", family, rng.randint(1, 999), units)
+        + ")\n",
+        encoding="utf-8",
+    )
+    (part / f"{lcsc}.pretty" / f"{name}.kicad_mod").write_text(
+        footprint_text(name, f"./{name}.step", rng), encoding="utf-8"
+    )
+    (part / f"{lcsc}.3dshapes" / f"{name}.step").write_bytes(_step_bytes(name, rng))
+    (part / f"{lcsc}.icon.svg").write_text(_SVG.format(name=name), encoding="utf-8")
+    return part
+
+
+def symbol_text(
+    name: str, lcsc: str, footprint: str, family: tuple[str, str, str, str], n: int, units: int = 1
+) -> str:
+    """One ``(symbol ...)`` block with the properties kibrary reads."""
+    ref = family[1]
+    props = [
+        ("Reference", ref, _FONT),
+        ("Value", family[2].format(n=n), _FONT),
+        ("Footprint", footprint, _HIDDEN),
+        ("Datasheet", f"https://datasheet.invalid/{lcsc}.pdf", _HIDDEN),
+        ("Description", f"{family[0][:-1]} {family[2].format(n=n)} {family[3]}", _HIDDEN),
+        ("LCSC", lcsc, _HIDDEN),
+    ]
+    lines = [f'  (symbol "{name}" (in_bom yes) (on_board yes)\n']
+    for key, value, effects in props:
+        lines.append(f'    (property "{key}" "{value}" (at 0 0 0) {effects})\n')
+    lines.append(
+        f'    (symbol "{name}_0_1" (rectangle (start -2.54 2.54) (end 2.54 -2.54)'
+        " (stroke (width 0.254) (type default)) (fill (type background))))\n"
+    )
+    for unit in range(1, units + 1):
+        lines.append(f'    (symbol "{name}_{unit}_1"\n')
+        for pin in range(2):
+            number = (unit - 1) * 2 + pin + 1
+            y = 5.08 if pin == 0 else -5.08
+            angle = 270 if pin == 0 else 90
+            lines.append(
+                f"      (pin passive line (at 0 {y} {angle}) (length 2.54)"
+                f' (name "~" {_FONT}) (number "{number}" {_FONT}))\n'
+            )
+        lines.append("    )\n")
+    lines.append("  )\n")
+    return "".join(lines)
+
+
+def footprint_text(name: str, model_path: str, rng: random.Random) -> str:
+    """A small two-pad SMD footprint with one ``(model ...)`` block."""
+    w = round(rng.uniform(0.4, 2.0), 2)
+    h = round(rng.uniform(0.3, 1.2), 2)
+    return (
+        f'(footprint "{name}" (version 20221018) (generator pcbnew)\n'
+        '  (layer "F.Cu")\n'
+        f'  (attr smd)\n'
+        f'  (fp_text reference "REF**" (at 0 -1.5) (layer "F.SilkS") {_FONT})\n'
+        f'  (fp_text value "{name}" (at 0 1.5) (layer "F.Fab") {_FONT})\n'
+        f'  (fp_rect (start -{w + 0.5} -{h + 0.3}) (end {w + 0.5} {h + 0.3})'
+        ' (stroke (width 0.05) (type solid)) (fill none) (layer "F.CrtYd"))\n'
+        f'  (pad "1" smd roundrect (at -{w / 2} 0) (size {w / 2} {h})'
+        ' (layers "F.Cu" "F.Paste" "F.Mask") (roundrect_rratio 0.25))\n'
+        f'  (pad "2" smd roundrect (at {w / 2} 0) (size {w / 2} {h})'
+        ' (layers "F.Cu" "F.Paste" "F.Mask") (roundrect_rratio 0.25))\n'
+        f'  (model "{model_path}"\n'
+        "    (offset (xyz 0 0 0))\n"
+        "    (scale (xyz 1 1 1))\n"
+        "    (rotate (xyz 0 0 0))\n"
+        "  )\n"
+        ")\n"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+    '<title>{name}</title><rect x="2" y="3" width="6" height="4"/></svg>\n'
+)
+
+
+def _step_bytes(name: str, rng: random.Random) -> bytes:
+    # Real STEP models are 50 KB – 2 MB; a few KB of deterministic filler
+    # keeps generated workspaces small while still exercising file copies.
+    header = f"ISO-10303-21;\nHEADER;\nFILE_NAME('{name}.step');\nENDSEC;\nDATA;\n".encode()
+    return header + rng.randbytes(rng.randint(2048, 8192)) + b"\nENDSEC;\nEND-ISO-10303-21;\n"
+
+
+def _metadata(lib_name: str) -> dict:
+    return {
+        "$schema": "https://go.kicad.org/pcm/schemas/v1",
+        "name": lib_name,
+        "description": lib_name,
+        "identifier": f"com.kibrary.kicad-shared-libs.{lib_name}",
+        "type": "library",
+        "license": "CC-BY-SA-4.0",
+        "author": {"name": "Unknown"},
+        "maintainer": {"name": "kibrary-automator"},
+        "content": {
+            "symbols": [f"{lib_name}.kicad_sym"],
+            "footprints": [f"{lib_name}.pretty"],
+            "3dmodels": [f"{lib_name}.3dshapes"],
+        },
+        "versions": [{"version": "1.0.0", "status": "stable", "kicad_version": "9.0"}],
+    }
+
+
+def _git(root: Path, *args: str, date: int | None = None) -> None:
+    env = dict(os.environ, **_GIT_ENV)
+    if date is not None:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = f"@{date} +0000"
+    subprocess.run(["git", *args], cwd=root, env=env, check=True, capture_output=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("out", type=Path)
+    ap.add_argument("--libraries", type=int, default=20)
+    ap.add_argument("--symbols", type=int, default=500, help="symbols per library")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--multi-unit", type=float, default=0.1)
+    ap.add_argument("--icons", type=float, default=0.5, help="fraction with a rendered icon")
+    ap.add_argument("--no-git", action="store_true")
+    args = ap.parse_args()
+
+    if args.out.exists() and any(args.out.iterdir()):
+        ap.error(f"{args.out} is not empty")
+    if not args.no_git and shutil.which("git") is None:
+        ap.error("git not found; pass --no-git")
+    info = generate_workspace(
+        args.out,
+        args.libraries,
+        args.symbols,
+        seed=args.seed,
+        multi_unit=args.multi_unit,
+        icons=args.icons,
+        git=not args.no_git,
+    )
+    print(f"{info['root']}: {len(info['libraries'])} libraries, {info['symbols']} symbols")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,9 +34,9 @@ elif [ -x "$VENV/Scripts/python.exe" ]; then VPY="$VENV/Scripts/python.exe"
 else echo "error: venv python not found"; exit 1
 fi
 
-# Install the sidecar package itself + PyInstaller
+# Install the sidecar package itself (with the orjson speed-up) + PyInstaller
 "$VPY" -m pip install --quiet --upgrade pip
-"$VPY" -m pip install --quiet -e .
+"$VPY" -m pip install --quiet -e ".[fast]"
 "$VPY" -m pip install --quiet pyinstaller
 
 # Tauri sidecar convention: the binary must be named with the target triple
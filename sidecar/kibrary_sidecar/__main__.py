@@ -1,5 +1,6 @@
 """Sidecar entry point. Launched by the Rust shell as a subprocess."""
 
+import multiprocessing
 import os
 import sys
 
@@ -9,6 +10,7 @@ import sys
 os.environ.setdefault("GIT_PYTHON_REFRESH", "quiet")
 
 from kibrary_sidecar import __version__  # noqa: E402
+from kibrary_sidecar import prewarm  # noqa: E402
 from kibrary_sidecar.rpc import serve  # noqa: E402  (env var must be set first)
 
 
@@ -32,7 +34,14 @@ def _bootstrap_diagnostics() -> None:
 
 
 def main() -> None:
+    # lib_index scans stale libraries in a spawn-based process pool; in the
+    # PyInstaller onefile build the children re-enter here and must be
+    # diverted to the multiprocessing worker loop before anything else runs.
+    multiprocessing.freeze_support()
     _bootstrap_diagnostics()
+    # Import heavy modules and refresh the last workspace's library index
+    # in the background while the UI loads (KIBRARY_SIDECAR_PREWARM=0 to skip).
+    prewarm.start()
     serve()
 
 
@@ -0,0 +1,129 @@
+"""blobs.py — content-addressed file store for payloads too big for the pipe.
+
+Binary payloads such as part photos used to travel over the line-delimited
+stdout pipe as base64 data URLs (+33% size, plus a JSON copy on both
+sides).  Instead, a handler can write the bytes here once and return the
+file's path; the Rust shell turns that into a file URL for the webview and
+the RPC line stays a few hundred bytes.
+
+Blobs are named by the SHA-256 of their content, so the same photo fetched
+twice is stored once and a path, once returned, never changes content.
+They live under ``<workspace>/.kibrary/cache/blobs/`` when a workspace is
+known, else under the per-user cache directory.
+
+Public API
+----------
+store_root(workspace)      → the blob directory for *workspace* (or the user cache)
+put(data, root, suffix)    → {path, sha256, size}; writes only if not already stored
+prune(root, max_bytes)     → delete least-recently-used blobs over the cap
+
+A blob's mtime records when it was last handed out: :func:`put` touches a
+blob it finds already stored, and :func:`prune` never deletes one used in
+the last ``PRUNE_GRACE_S`` seconds, so a path a caller was just given
+stays valid while the caller uses it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from kibrary_sidecar import settings
+
+log = logging.getLogger(__name__)
+
+# Soft cap per store; checked every _PRUNE_EVERY writes.  Photos are
+# ~50 KB, so this holds a few thousand of them.
+MAX_BYTES = 256 * 1024 * 1024
+_PRUNE_EVERY = 64
+# Blobs used more recently than this are never pruned.
+PRUNE_GRACE_S = 300
+
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def store_root(workspace: Path | None = None) -> Path:
+    """Return (without creating) the blob directory to use."""
+    if workspace is not None:
+        return Path(workspace) / ".kibrary" / "cache" / "blobs"
+    return settings.user_cache_root() / "kibrary" / "blobs"
+
+
+def put(data: bytes, root: Path, suffix: str = "") -> dict:
+    """Store *data* under *root* and return ``{path, sha256, size}``.
+
+    The file is ``<root>/<first two hex digits>/<sha256><suffix>``.  It is
+    written to a temp file and renamed into place, so readers never see a
+    partial blob; if it already exists nothing is written and it is only
+    touched, marking it recently used.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = Path(root) / digest[:2] / f"{digest}{suffix}"
+    try:
+        os.utime(path)
+        stored = True
+    except OSError:  # not stored yet, or pruned a moment ago
+        stored = False
+    if not stored:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        _maybe_prune(Path(root))
+    return {"path": str(path), "sha256": digest, "size": len(data)}
+
+
+def prune(root: Path, max_bytes: int = MAX_BYTES) -> int:
+    """Delete the least recently used blobs under *root* until it fits in
+    *max_bytes*, sparing those used in the last ``PRUNE_GRACE_S`` seconds.
+
+    Returns the number of bytes freed.  Errors on individual files are
+    ignored — a blob may be in use or already gone.
+    """
+    cutoff = time.time() - PRUNE_GRACE_S
+    entries = []
+    for path in Path(root).glob("??/*"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for mtime, size, path in sorted(entries):
+        if total - freed <= max_bytes or mtime > cutoff:
+            break
+        try:
+            path.unlink()
+            freed += size
+        except OSError:
+            continue
+    return freed
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _maybe_prune(root: Path) -> None:
+    global _writes
+    with _writes_lock:
+        _writes += 1
+        due = _writes % _PRUNE_EVERY == 0
+    if due:
+        try:
+            prune(root)
+        except OSError as exc:
+            log.warning("blobs: prune of %s failed: %s", root, exc)
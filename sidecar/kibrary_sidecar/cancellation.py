@@ -0,0 +1,95 @@
+"""cancellation.py — cooperative cancellation for RPC handlers.
+
+Every request the RPC server dispatches gets a :class:`CancelToken`.  A
+``$/cancel`` for that request id sets the token; requests still queued in
+the worker pool are dropped outright and async handlers have their task
+cancelled, but a sync handler that is already running can only stop if it
+looks.  Long or network-bound handlers call :func:`check` at convenient
+points (e.g. before issuing an HTTP request) to bail out early.
+
+Public API
+----------
+CancelToken        → settable flag, one per request; ``on_cancel(cb)`` for
+                     handlers that can be interrupted (async tasks)
+Cancelled          → raised by :func:`check` / ``CancelToken.raise_if_cancelled``
+bind(token)        → context manager making *token* the current one
+current()          → the token of the request running on this thread (or a
+                     never-cancelled dummy outside any request)
+check()            → raise :class:`Cancelled` if the current request was cancelled
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+from typing import Callable, Iterator
+
+
+class Cancelled(Exception):
+    """The request was cancelled by the client."""
+
+
+class CancelToken:
+    """A one-way flag: once cancelled, always cancelled."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            cb()
+
+    def on_cancel(self, cb: Callable[[], None]) -> None:
+        """Call *cb* when the token is cancelled (right away if it already is)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(cb)
+                return
+        cb()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise Cancelled()
+
+
+# Token used when code runs outside any request (tests, warm-up); never set.
+_NEVER = CancelToken()
+
+_current: contextvars.ContextVar[CancelToken] = contextvars.ContextVar(
+    "kibrary_cancel_token", default=_NEVER
+)
+
+
+@contextlib.contextmanager
+def bind(token: CancelToken) -> Iterator[CancelToken]:
+    """Make *token* the current token for the duration of the block.
+
+    Uses a context variable, so it is per-thread for sync handlers and
+    per-task for async ones.
+    """
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def current() -> CancelToken:
+    return _current.get()
+
+
+def check() -> None:
+    """Raise :class:`Cancelled` if the current request has been cancelled."""
+    _current.get().raise_if_cancelled()
@@ -21,13 +21,19 @@ Frontend uses these to drive both the per-row progress bar and the
 import asyncio
 import logging
 import os
+import weakref
 from pathlib import Path
 from typing import Awaitable, Callable
 
-from kibrary_sidecar import jlc
-from kibrary_sidecar import icons
-from kibrary_sidecar import search_client
-from kibrary_sidecar import staging as staging_mod  # `staging` param shadows the module
+from kibrary_sidecar import lazy
+
+# Imported on the first download (see lazy.py): rpc.py imports this module
+# for ASYNC_REGISTRY at startup, and httpx / JLC2KiCadLib are not needed
+# until a part is actually fetched.
+jlc = lazy.module("kibrary_sidecar.jlc")
+icons = lazy.module("kibrary_sidecar.icons")
+search_client = lazy.module("kibrary_sidecar.search_client")
+staging_mod = lazy.module("kibrary_sidecar.staging")  # `staging` param shadows the module
 
 log = logging.getLogger(__name__)
 
@@ -35,6 +41,24 @@ EmitFn = Callable[[dict], Awaitable[None]]
 # A download function may optionally accept a progress callback (int 0-100).
 DlFn = Callable[..., Awaitable[tuple[bool, str | None]]]
 
+# Cap on part downloads running at once across *all* in-flight
+# parts.download requests.  The RPC server hosts every async handler on one
+# event loop, so concurrent batches share this semaphore instead of each
+# opening its own ``concurrency`` connections to LCSC.
+MAX_ACTIVE_DOWNLOADS = 8
+_download_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_slots() -> asyncio.Semaphore:
+    """The download semaphore shared by every batch on the running loop."""
+    loop = asyncio.get_running_loop()
+    sem = _download_slots.get(loop)
+    if sem is None:
+        sem = _download_slots[loop] = asyncio.Semaphore(MAX_ACTIVE_DOWNLOADS)
+    return sem
+
 
 async def _default_dl(
     lcsc: str,
@@ -62,6 +86,7 @@ async def run_batch(
     Returns a dict mapping lcsc -> {"ok": bool, "error": str|None}.
     """
     sem = asyncio.Semaphore(concurrency)
+    shared = _shared_slots()
     dl_fn: DlFn = dl or _default_dl
     results: dict[str, dict] = {}
     loop = asyncio.get_running_loop()
@@ -106,10 +131,11 @@ async def run_batch(
                     log.debug("progress emit raised", exc_info=True)
 
             # Pass progress callback if supported, else fall back gracefully.
-            try:
-                ok, err = await dl_fn(lcsc, staging / lcsc, progress=_on_progress)
-            except TypeError:
-                ok, err = await dl_fn(lcsc, staging / lcsc)
+            async with shared:
+                try:
+                    ok, err = await dl_fn(lcsc, staging / lcsc, progress=_on_progress)
+                except TypeError:
+                    ok, err = await dl_fn(lcsc, staging / lcsc)
             results[lcsc] = {"ok": ok, "error": err}
 
             # Best-effort icon render — never fails the download
@@ -0,0 +1,236 @@
+"""dup_index.py — workspace-wide symbol-name / LCSC index for duplicate checks.
+
+Committing a part that is already in the workspace used to go unnoticed:
+the sidecar appended a second symbol of the same name, and the legacy CLI's
+``check_duplicate`` re-read every library as text for each new part.  This
+module keeps, per workspace, two lookup tables over all of its libraries:
+
+* symbol name  → libraries that contain it;
+* LCSC number  → ``(library, symbol)`` pairs carrying it in an ``LCSC``
+  property (see :data:`LCSC_KEYS`).
+
+The tables are built from the :mod:`lib_index` entries, so a library is
+only parsed when its files changed, and are refreshed per library: a
+lookup costs one ``stat`` of the workspace directory (its subdirectories
+are only listed again when that changes) and one of each library's
+``.kicad_sym`` — commits splice into it in place, which leaves every
+directory mtime alone — plus a dict hit per name.  Stats and re-reads run
+outside the module lock, which is only held to swap a library's entries
+in and for the lookups themselves.  A commit calls :func:`record`
+afterwards, so the library it just wrote is not re-parsed by the next
+check.
+
+Public API
+----------
+find(workspace, names, lcscs)  → [{kind, value, library, component}], sorted
+record(lib_dir, symbols)       → add committed ``(name, lcsc | None)`` pairs
+symbol_lcsc(properties)        → the LCSC number in a property dict, or None
+invalidate(workspace)          → forget the tables (all, or one workspace's)
+DuplicateComponentError        → raised by commits that would add a duplicate
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from kibrary_sidecar import lib_index
+
+# Property names JLC2KiCadLib, easyeda2kicad and hand-made libraries use
+# for the LCSC part number, checked in this order.
+LCSC_KEYS = ("LCSC", "LCSC Part", "LCSC Part #")
+
+# workspace path (str) →
+#   {"mtime": workspace dir st_mtime_ns, "dirs": its subdirectory names,
+#    "libs":  {library: {"key", "names": set, "lcscs": set of (lcsc, name)}},
+#    "names": {symbol name: set of libraries},
+#    "lcscs": {lcsc: set of (library, symbol name)}}
+_indexes: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+class DuplicateComponentError(FileExistsError):
+    """A commit would add a symbol name or LCSC number the workspace has.
+
+    ``duplicates`` holds the :func:`find` matches that blocked it.
+    """
+
+    def __init__(self, message: str, duplicates: list[dict]) -> None:
+        super().__init__(message)
+        self.duplicates = duplicates
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def find(
+    workspace: Path,
+    names: Iterable[str] = (),
+    lcscs: Iterable[str] = (),
+) -> list[dict]:
+    """Return the existing symbols matching any of *names* or *lcscs*.
+
+    Each match is ``{kind: "name" | "lcsc", value, library, component}``.
+    Libraries changed on disk since the last call are re-read first (from
+    the library index, so usually without a parse).
+    """
+    workspace = Path(workspace)
+    state = _refresh(workspace)
+    with _lock:
+        matches = []
+        for name in set(names):
+            for library in state["names"].get(name, ()):
+                matches.append({"kind": "name", "value": name, "library": library, "component": name})
+        for lcsc in {_normalise(v) for v in lcscs} - {""}:
+            for library, component in state["lcscs"].get(lcsc, ()):
+                matches.append({"kind": "lcsc", "value": lcsc, "library": library, "component": component})
+    return sorted(matches, key=lambda m: (m["kind"], m["value"], m["library"], m["component"]))
+
+
+def record(lib_dir: Path, symbols: Iterable[tuple[str, str | None]]) -> None:
+    """Add *symbols* — ``(name, lcsc)`` pairs just written to *lib_dir* —
+    and mark the library fresh at its current stat.
+
+    Call with the library's write lock still held, right after a commit
+    whose duplicate check refreshed the tables; a workspace that was never
+    checked is left alone.
+    """
+    lib_dir = Path(lib_dir)
+    try:
+        key = _sym_key(lib_dir)
+    except OSError:
+        return
+    with _lock:
+        state = _indexes.get(str(lib_dir.parent))
+        if state is None:
+            return
+        lib = state["libs"].setdefault(lib_dir.name, {"key": key, "names": set(), "lcscs": set()})
+        lib["key"] = key
+        for name, lcsc in symbols:
+            _add(state, lib_dir.name, name, lcsc)
+
+
+def symbol_lcsc(properties: dict) -> str | None:
+    """Return the LCSC number in a symbol's *properties*, or None."""
+    for key in LCSC_KEYS:
+        value = _normalise(properties.get(key) or "")
+        if value:
+            return value
+    return None
+
+
+def invalidate(workspace: Path | None = None) -> None:
+    """Forget the tables of every workspace, or just *workspace*'s."""
+    with _lock:
+        if workspace is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(str(Path(workspace)), None)
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _refresh(workspace: Path) -> dict:
+    """Bring *workspace*'s tables up to date and return them.
+
+    Takes ``_lock`` only to snapshot the keys and to swap re-read
+    libraries in; a library whose entry changed in between (a
+    :func:`record`, another refresh) keeps the newer one.
+    """
+    ws_key = str(workspace)
+    while True:
+        with _lock:
+            state = _indexes.get(ws_key)
+            if state is None:
+                state = _indexes[ws_key] = _new_state()
+            known = {name: lib["key"] for name, lib in state["libs"].items()}
+            cached_mtime, cached_dirs = state["mtime"], state["dirs"]
+
+        try:
+            mtime = workspace.stat().st_mtime_ns
+        except OSError:
+            mtime, dirs = None, []
+        else:
+            dirs = cached_dirs if mtime == cached_mtime else _subdirs(workspace)
+
+        keys: dict[str, list[int]] = {}
+        for name in dirs:
+            try:
+                keys[name] = _sym_key(workspace / name)
+            except OSError:
+                pass  # not (or no longer) a library
+        gone = set(known) - set(keys)
+        stale = [workspace / name for name, key in keys.items() if known.get(name) != key]
+        entries = lib_index.get_libraries(stale) if stale else {}
+
+        with _lock:
+            if _indexes.get(ws_key) is not state:  # invalidated meanwhile
+                continue
+            state["mtime"], state["dirs"] = mtime, dirs
+            for name in gone | {d.name for d in stale}:
+                lib = state["libs"].get(name)
+                if (lib["key"] if lib else None) != known.get(name):
+                    continue  # updated since the snapshot
+                _drop(state, name)
+                entry = entries.get(name)
+                if entry is None:  # gone or unreadable: nothing to match against
+                    continue
+                state["libs"][name] = {"key": entry["key"][:3], "names": set(), "lcscs": set()}
+                for sym in entry["symbols"]:
+                    _add(state, name, sym["name"], symbol_lcsc(sym["properties"]))
+            return state
+
+
+def _new_state() -> dict:
+    return {"mtime": None, "dirs": [], "libs": {}, "names": {}, "lcscs": {}}
+
+
+def _subdirs(workspace: Path) -> list[str]:
+    try:
+        return sorted(entry.name for entry in workspace.iterdir() if entry.is_dir())
+    except OSError:
+        return []
+
+
+def _sym_key(lib_dir: Path) -> list[int]:
+    """The ``.kicad_sym`` part of :func:`lib_index.stat_key` — all that
+    matters for names and LCSC numbers."""
+    st = (lib_dir / f"{lib_dir.name}.kicad_sym").stat()
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def _add(state: dict, library: str, name: str, lcsc: str | None) -> None:
+    lib = state["libs"][library]
+    lib["names"].add(name)
+    state["names"].setdefault(name, set()).add(library)
+    if lcsc:
+        lib["lcscs"].add((lcsc, name))
+        state["lcscs"].setdefault(lcsc, set()).add((library, name))
+
+
+def _drop(state: dict, library: str) -> None:
+    lib = state["libs"].pop(library, None)
+    if lib is None:
+        return
+    for name in lib["names"]:
+        libs = state["names"].get(name)
+        if libs is not None:
+            libs.discard(library)
+            if not libs:
+                del state["names"][name]
+    for lcsc, name in lib["lcscs"]:
+        pairs = state["lcscs"].get(lcsc)
+        if pairs is not None:
+            pairs.discard((library, name))
+            if not pairs:
+                del state["lcscs"][lcsc]
+
+
+def _normalise(lcsc: str) -> str:
+    return lcsc.strip().upper()
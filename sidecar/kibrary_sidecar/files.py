@@ -12,8 +12,12 @@ see :func:`read_library_file`.
 
 from __future__ import annotations
 
+import mmap
+import os
 from pathlib import Path
 
+from kibrary_sidecar import sexpr_scan
+
 
 def read_part_file(staging_dir: Path, lcsc: str, kind: str) -> str:
     """Return the text content of the requested KiCad part file.
@@ -39,13 +43,22 @@ def read_part_file(staging_dir: Path, lcsc: str, kind: str) -> str:
     ValueError
         If *kind* is not one of the supported values.
     """
+    return part_file_path(staging_dir, lcsc, kind).read_text(encoding="utf-8")
+
+
+def part_file_path(staging_dir: Path, lcsc: str, kind: str) -> Path:
+    """Return the path of the requested KiCad part file without reading it.
+
+    Same lookup and errors as :func:`read_part_file`; used when the caller
+    hands the file over out-of-band instead of through the RPC pipe.
+    """
     part_dir = Path(staging_dir) / lcsc
 
     if kind == "sym":
         path = part_dir / f"{lcsc}.kicad_sym"
         if not path.is_file():
             raise FileNotFoundError(f"Symbol file not found: {path}")
-        return path.read_text(encoding="utf-8")
+        return path
 
     if kind == "fp":
         pretty_dir = part_dir / f"{lcsc}.pretty"
@@ -56,7 +69,7 @@ def read_part_file(staging_dir: Path, lcsc: str, kind: str) -> str:
             raise FileNotFoundError(
                 f"No .kicad_mod files found in: {pretty_dir}"
             )
-        return mods[0].read_text(encoding="utf-8")
+        return mods[0]
 
     if kind == "3d":
         shapes_dir = part_dir / f"{lcsc}.3dshapes"
@@ -66,7 +79,7 @@ def read_part_file(staging_dir: Path, lcsc: str, kind: str) -> str:
         for ext in ("*.step", "*.stp", "*.wrl"):
             hits = sorted(shapes_dir.glob(ext))
             if hits:
-                return hits[0].read_text(encoding="utf-8")
+                return hits[0]
         raise FileNotFoundError(f"No 3D model files found in: {shapes_dir}")
 
     raise ValueError(f"Unsupported kind {kind!r}; expected 'sym', 'fp', or '3d'")
@@ -170,8 +183,12 @@ def read_library_file(lib_dir: Path, component_name: str, kind: str) -> str:
         <lib_dir>/<lib_name>.pretty/<component>.kicad_mod (per-component footprint)
 
     For ``kind="sym"`` we slice the merged ``.kicad_sym`` to extract just the
-    one matching ``(symbol "<component>" ...)`` and re-emit a single-symbol
-    library so kicanvas can render only that component.
+    one matching ``(symbol "<component>" ...)`` and wrap it in a library
+    header so kicanvas can render only that component.  The slice is taken
+    straight from the file bytes via the cached offset table in
+    :mod:`sexpr_scan` — no parse and no re-serialisation.  A unit name
+    (``<component>_N_M``) resolves to its owning symbol; a derived symbol
+    (``extends``) is emitted together with its base so it still renders.
 
     For ``kind="fp"`` we return the matching ``.kicad_mod`` text verbatim.
 
@@ -187,24 +204,7 @@ def read_library_file(lib_dir: Path, component_name: str, kind: str) -> str:
         path = lib_dir / f"{lib_name}.kicad_sym"
         if not path.is_file():
             raise FileNotFoundError(f"Symbol library not found: {path}")
-        from kiutils.symbol import SymbolLib
-
-        lib = SymbolLib.from_file(str(path))
-        sym = next(
-            (s for s in lib.symbols if s.entryName == component_name),
-            None,
-        )
-        if sym is None:
-            raise FileNotFoundError(
-                f"symbol {component_name!r} not in {path}"
-            )
-        # Wrap a single-symbol library so kicanvas can parse it.
-        single = SymbolLib(
-            symbols=[sym],
-            generator=lib.generator or "kibrary",
-            version=lib.version,
-        )
-        return single.to_sexpr()
+        return _slice_symbol(path, component_name)
 
     if kind == "fp":
         pretty = lib_dir / f"{lib_name}.pretty"
@@ -222,6 +222,47 @@ def read_library_file(lib_dir: Path, component_name: str, kind: str) -> str:
     raise ValueError(f"Unsupported kind {kind!r}; expected 'sym' or 'fp'")
 
 
+def _slice_symbol(path: Path, component_name: str) -> str:
+    """Return *component_name*'s original bytes from *path*, wrapped in a
+    ``(kicad_symbol_lib ...)`` header.  See :func:`read_library_file`."""
+    for _attempt in range(3):
+        with open(path, "rb") as fh:
+            # Only trust a table that describes exactly the file version we
+            # have open — a concurrent rewrite would skew the offsets.
+            st = os.fstat(fh.fileno())
+            table = sexpr_scan.offset_table(path)
+            if table["stat"] != (st.st_mtime_ns, st.st_size, st.st_ino):
+                continue
+
+            symbols = table["symbols"]
+            span = symbols.get(component_name)
+            if span is None:
+                raise FileNotFoundError(f"symbol {component_name!r} not in {path}")
+            name = span[2] or component_name
+            names = [name]
+            base = table["extends"].get(name)
+            if base in symbols and symbols[base][2] is None:
+                names.insert(0, base)
+
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                body = "\n  ".join(
+                    mm[symbols[n][0]:symbols[n][1]].decode("utf-8", errors="replace")
+                    for n in names
+                )
+        break
+    else:
+        raise OSError(f"{path} kept changing while being read")
+
+    header = table["header"]
+    version = header["version"] or "20211014"
+    generator = (header["generator"] or "kibrary").replace('"', '\\"')
+    return (
+        f'(kicad_symbol_lib (version {version}) (generator "{generator}")\n'
+        f"  {body}\n"
+        ")\n"
+    )
+
+
 def list_part_dir(staging_dir: Path, lcsc: str, subdir: str = "") -> list[str]:
     """List filenames in a staged part's directory (or a sub-directory of it).
 
@@ -5,6 +5,7 @@ Public API
 is_clean_repo(workspace)       -> bool
 is_safe_to_commit(workspace)   -> tuple[bool, str | None]
 auto_commit(workspace, message, paths, enabled) -> str | None
+auto_commit_many(workspace, commits, enabled)   -> list[str | None]
 init_repo(workspace)           -> None
 """
 
@@ -100,49 +101,70 @@ def auto_commit(
     - *enabled* is ``False``
     - The repository is not in a safe state (see :func:`is_safe_to_commit`)
     - The working tree has changes *outside* the listed *paths* — we refuse
-      to auto-commit while someone else has WIP in the same repo.
+      to auto-commit while someone else has WIP in the same repo.  A
+      directory in *paths* covers every file below it.
     """
+    return auto_commit_many(workspace, [(message, paths)], enabled)[0]
+
+
+def auto_commit_many(
+    workspace: Path,
+    commits: list[tuple[str, list[str]]],
+    enabled: bool = True,
+) -> list[str | None]:
+    """Create several commits back to back, one per ``(message, paths)``.
+
+    The skip conditions of :func:`auto_commit` are checked once, against
+    the union of all paths, so a batch whose files are all written up
+    front can still be split into one commit per library.  Returns one SHA
+    per entry, or all ``None`` if the batch was skipped.  A commit whose
+    paths turn out to have nothing staged is still created (as
+    :func:`auto_commit` always did).
+    """
+    skipped: list[str | None] = [None] * len(commits)
     if not enabled:
         log.debug("auto_commit: disabled, skipping")
-        return None
+        return skipped
 
     safe, reason = is_safe_to_commit(workspace)
     if not safe:
         log.warning("auto_commit: unsafe to commit (%s), skipping", reason)
-        return None
+        return skipped
 
     try:
         repo = git.Repo(workspace)
     except (git.InvalidGitRepositoryError, git.NoSuchPathError):
         log.warning("auto_commit: workspace is not a git repo")
-        return None
+        return skipped
 
     # Check for dirty working tree *outside* the paths we intend to commit.
     # We look at both staged (index) and unstaged changes plus untracked files.
     dirty = _dirty_files(repo)
     # Normalise the caller-supplied paths to forward-slash relative strings
     # so we can compare them against what GitPython reports.
-    norm_paths = {p.replace("\\", "/") for p in paths}
-    extra_dirty = dirty - norm_paths
+    norm_paths = {p.replace("\\", "/").rstrip("/") for _, paths in commits for p in paths}
+    extra_dirty = {f for f in dirty if not _covered(f, norm_paths)}
     if extra_dirty:
         log.warning(
             "auto_commit: working tree is dirty outside target paths (%s), skipping",
             sorted(extra_dirty),
         )
-        return None
+        return skipped
 
-    # Stage the listed paths and commit.
-    # Only stage files that actually exist (new or modified); deletions are
-    # handled via index.remove which we skip for simplicity — callers deal
-    # with deletions separately if needed.
-    existing = [p for p in paths if (workspace / p).exists()]
-    if existing:
-        repo.index.add(existing)
+    shas: list[str | None] = []
+    for message, paths in commits:
+        # Stage the listed paths and commit.
+        # Only stage files that actually exist (new or modified); deletions are
+        # handled via index.remove which we skip for simplicity — callers deal
+        # with deletions separately if needed.
+        existing = [p for p in paths if (workspace / p).exists()]
+        if existing:
+            repo.index.add(existing)
 
-    commit = repo.index.commit(message)
-    sha = commit.hexsha
-    log.info("auto_commit: created commit %s — %s", sha[:8], message)
-    return sha
+        commit = repo.index.commit(message)
+        shas.append(commit.hexsha)
+        log.info("auto_commit: created commit %s — %s", commit.hexsha[:8], message.splitlines()[0])
+    return shas
 
 
 # ---------------------------------------------------------------------------
@@ -183,3 +205,8 @@ def _dirty_files(repo: git.Repo) -> set[str]:
         dirty.add(f)
 
     return dirty
+
+
+def _covered(path: str, targets: set[str]) -> bool:
+    """True if *path* is one of *targets* or lies below one of them."""
+    return path in targets or any(path.startswith(t + "/") for t in targets)
@@ -11,6 +11,9 @@ import subprocess
 import tempfile
 import shutil
 from pathlib import Path
+from typing import Generator
+
+from kibrary_sidecar import cancellation
 
 log = logging.getLogger(__name__)
 
@@ -125,6 +128,21 @@ def backfill_icons(workspace: Path) -> dict:
         icons_rendered  (int)
         errors          (list[str])
     """
+    it = iter_backfill_icons(workspace)
+    while True:
+        try:
+            next(it)
+        except StopIteration as stop:
+            return stop.value
+
+
+def iter_backfill_icons(workspace: Path) -> Generator[dict, None, dict]:
+    """Generator form of :func:`backfill_icons`.
+
+    Yields one ``{library, icons_rendered, errors}`` dict per library as it
+    is finished, and returns the same totals dict :func:`backfill_icons`
+    does — so a streaming RPC can report progress library by library.
+    """
     from kibrary_sidecar import lib_scanner  # local import to avoid circular
 
     libs_processed = 0
@@ -143,40 +161,47 @@ def backfill_icons(workspace: Path) -> dict:
         pretty_dir = lib_dir / f"{lib_name}.pretty"
 
         libs_processed += 1
+        lib_rendered = 0
+        lib_errors: list[str] = []
 
-        if not pretty_dir.is_dir():
-            continue
-
-        try:
-            components = lib_scanner.list_components(lib_dir)
-        except Exception as exc:
-            errors.append(f"{lib_name}: failed to list components: {exc}")
-            continue
-
-        for comp in components:
-            comp_name = comp["name"]
-            icon_path = icons_dir / f"{comp_name}.svg"
-            if icon_path.is_file():
-                continue  # already rendered
-
-            # Try the footprint with the exact component name first
-            mod_path = pretty_dir / f"{comp_name}.kicad_mod"
-            if not mod_path.is_file():
-                # Fall back to any .kicad_mod
-                mods = sorted(pretty_dir.glob("*.kicad_mod"))
-                if not mods:
-                    continue
-                mod_path = mods[0]
-
-            footprint_name = mod_path.stem
+        if pretty_dir.is_dir():
             try:
-                icons_dir.mkdir(parents=True, exist_ok=True)
-                render_footprint_icon(pretty_dir, footprint_name, icon_path)
-                icons_rendered += 1
-                log.info("Backfill: rendered %s → %s", comp_name, icon_path)
+                components = lib_scanner.list_components(lib_dir)
             except Exception as exc:
-                errors.append(f"{lib_name}/{comp_name}: {exc}")
-                log.warning("Backfill failed for %s/%s: %s", lib_name, comp_name, exc)
+                lib_errors.append(f"{lib_name}: failed to list components: {exc}")
+                components = []
+
+            for comp in components:
+                # Each render is a kicad-cli subprocess; stop between them if
+                # the client cancelled the request.
+                cancellation.check()
+                comp_name = comp["name"]
+                icon_path = icons_dir / f"{comp_name}.svg"
+                if icon_path.is_file():
+                    continue  # already rendered
+
+                # Try the footprint with the exact component name first
+                mod_path = pretty_dir / f"{comp_name}.kicad_mod"
+                if not mod_path.is_file():
+                    # Fall back to any .kicad_mod
+                    mods = sorted(pretty_dir.glob("*.kicad_mod"))
+                    if not mods:
+                        continue
+                    mod_path = mods[0]
+
+                footprint_name = mod_path.stem
+                try:
+                    icons_dir.mkdir(parents=True, exist_ok=True)
+                    render_footprint_icon(pretty_dir, footprint_name, icon_path)
+                    lib_rendered += 1
+                    log.info("Backfill: rendered %s → %s", comp_name, icon_path)
+                except Exception as exc:
+                    lib_errors.append(f"{lib_name}/{comp_name}: {exc}")
+                    log.warning("Backfill failed for %s/%s: %s", lib_name, comp_name, exc)
+
+        icons_rendered += lib_rendered
+        errors.extend(lib_errors)
+        yield {"library": lib_name, "icons_rendered": lib_rendered, "errors": lib_errors}
 
     return {
         "libs_processed": libs_processed,
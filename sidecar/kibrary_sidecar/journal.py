@@ -0,0 +1,400 @@
+"""journal.py — atomic, crash-safe multi-file writes for library mutations.
+
+Committing a part or moving/renaming a library touches several files — the
+``.kicad_sym``, footprints, 3D models, ``metadata.json``,
+``repository.json`` — and writing them in place means a crash half-way
+leaves a truncated multi-megabyte library or a repository.json pointing at
+nothing.  Those operations run as a :class:`Transaction` instead:
+
+1. every new file body is written to a staging file under
+   ``<workspace>/.kibrary/journal/<txid>/``; the workspace is untouched;
+2. the staged files are fsynced and ``journal.json``, listing the steps,
+   is written atomically — this is the commit point;
+3. the steps are applied in order and the transaction directory removed.
+
+A crash before step 2 leaves a directory without ``journal.json``:
+:func:`recover` deletes it and the operation never happened.  A crash
+during step 3 leaves the journal, which :func:`recover` replays from the
+top — every step is idempotent, so replaying finishes the operation.
+Recovery runs when a workspace is opened and before each new transaction
+on it; with nothing to do it costs one directory listing.  Replaying holds
+the workspace's write lock (see :mod:`locks`), so two callers finding the
+same leftover never apply it twice.
+
+A transaction id embeds the pid of the process that runs it, and only
+directories of processes that are gone count as leftovers: another
+sidecar's transaction in flight (it holds its library's lock, not the
+workspace's) is never discarded or replayed under it.  A journal left by
+a failed apply in a live process is recovered by that process's next
+transaction, or by anyone once it exits.
+
+Steps (paths are stored relative to the workspace)::
+
+    replace  {path, staged}          os.replace the staged file over path
+    rename   {src, dst}              move src (file or dir) to dst
+    splice   {path, offset, staged}  write the staged bytes at offset and
+                                     truncate there; appending to a big
+                                     library rewrites only its tail
+    delete   {path}                  remove path (file or dir)
+
+A step is skipped on replay when its source is already gone, so a
+transaction must not reuse a path that one of its earlier steps renamed
+away.
+
+Files come into the workspace without copying their bytes where the
+filesystem allows (see :mod:`transfer`): ``copy`` stages a reflink,
+``link`` a reflink or hard link, and ``move`` renames at apply time.
+``Transaction.transferred`` counts the bytes each way copied or linked.
+
+Public API
+----------
+transaction(workspace, name)  → context manager yielding a :class:`Transaction`;
+                                commits on normal exit, discards on error
+Transaction.write(path, data) / copy(src, path) / link(src, path) /
+            move(src, dst) / rename(src, dst) / splice(path, offset, data) /
+            delete(path)
+write_atomic(path, data)      → single file: temp + fsync + rename
+recover(workspace)            → finish or discard leftover transactions;
+                                returns how many were found
+journal_dir(workspace)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import itertools
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+from kibrary_sidecar import locks, transfer
+
+log = logging.getLogger(__name__)
+
+JOURNAL_FILE = "journal.json"
+
+_counter = itertools.count()
+
+# Transaction directories owned by a transaction still running in this
+# process; recover() must not mistake them for leftovers of a crash.
+_live: set[Path] = set()
+_live_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def journal_dir(workspace: Path) -> Path:
+    return Path(workspace) / ".kibrary" / "journal"
+
+
+class Transaction:
+    """The steps of one library operation, applied together by :meth:`commit`.
+
+    Nothing in the workspace changes until :meth:`commit`: ``write`` and
+    ``copy`` stage the new body inside the transaction directory, the
+    other methods only record a step.
+    """
+
+    def __init__(self, workspace: Path, name: str) -> None:
+        self.workspace = Path(workspace)
+        self.name = name
+        self.id = f"{int(time.time() * 1000)}-{os.getpid()}-{next(_counter)}"
+        self.dir = journal_dir(self.workspace) / self.id
+        self.committed = False
+        self._steps: list[dict] = []
+        self._staged: list[Path] = []
+        # bytes brought in by copy / link / move: {"copied", "linked"}
+        self.transferred = {"copied": 0, "linked": 0}
+
+    def write(self, path: Path, data: bytes | str) -> Path:
+        """Replace *path* with *data*; returns the staged file."""
+        staged = self._stage(path)
+        staged.write_bytes(data.encode("utf-8") if isinstance(data, str) else data)
+        self._steps.append({"op": "replace", "path": self._rel(path), "staged": staged.name})
+        return staged
+
+    def copy(self, src: Path, path: Path) -> Path:
+        """Replace *path* with a copy of *src*; returns the staged copy,
+        which the caller may still edit before the commit."""
+        staged = self._stage(path)
+        self._count(transfer.clone(src, staged) != "copy", staged.stat().st_size)
+        self._steps.append({"op": "replace", "path": self._rel(path), "staged": staged.name})
+        return staged
+
+    def link(self, src: Path, path: Path) -> None:
+        """Replace *path* with *src*'s content, unchanged.
+
+        The staged file may be a hard link to *src*: neither may be edited
+        in place afterwards, only replaced.
+        """
+        staged = self._stage(path)
+        self._count(transfer.link(src, staged) != "copy", staged.stat().st_size)
+        self._steps.append({"op": "replace", "path": self._rel(path), "staged": staged.name})
+
+    def move(self, src: Path, dst: Path) -> None:
+        """Like :meth:`rename`, for a file or directory brought into the
+        workspace: its bytes count as linked when the rename stays on one
+        filesystem."""
+        self._count(transfer.same_device(src, dst), transfer.tree_size(src))
+        self.rename(src, dst)
+
+    def rename(self, src: Path, dst: Path) -> None:
+        """Move *src* (a file or directory) to *dst*, replacing *dst*."""
+        self._steps.append({"op": "rename", "src": self._rel(src), "dst": self._rel(dst)})
+
+    def splice(self, path: Path, offset: int, data: bytes) -> None:
+        """Overwrite *path* from byte *offset* on with *data*."""
+        staged = self._stage(path)
+        staged.write_bytes(data)
+        self._steps.append(
+            {"op": "splice", "path": self._rel(path), "offset": offset, "staged": staged.name}
+        )
+
+    def delete(self, path: Path) -> None:
+        """Remove *path* (a file or directory) if it exists."""
+        self._steps.append({"op": "delete", "path": self._rel(path)})
+
+    def commit(self) -> None:
+        """Make the transaction durable, then apply it."""
+        if not self._steps:
+            self.discard()
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for staged in self._staged:
+            _fsync_file(staged)
+        write_atomic(
+            self.dir / JOURNAL_FILE,
+            json.dumps({"name": self.name, "steps": self._steps}, indent=1),
+        )
+        self.committed = True
+        _apply(self.workspace, self.dir, self._steps)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def discard(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _count(self, linked: bool, size: int) -> None:
+        self.transferred["linked" if linked else "copied"] += size
+
+    def _stage(self, target: Path) -> Path:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        staged = self.dir / f"{len(self._steps)}-{Path(target).name}"
+        self._staged.append(staged)
+        return staged
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return os.path.relpath(path, self.workspace)
+        except ValueError:  # another drive (Windows)
+            return str(Path(path).resolve())
+
+
+@contextlib.contextmanager
+def transaction(workspace: Path, name: str) -> Iterator[Transaction]:
+    """Run a library operation as one :class:`Transaction`.
+
+    Leftover transactions from a crash are finished first, so operations
+    on a workspace always apply in order.  If the body raises, nothing it
+    staged is applied.  If applying fails after the commit point, the
+    journal stays behind for :func:`recover` and the error propagates.
+    """
+    recover(workspace)
+    tx = Transaction(workspace, name)
+    with _live_lock:
+        _live.add(tx.dir)
+    try:
+        yield tx
+        tx.commit()
+    except BaseException:
+        if not tx.committed:
+            tx.discard()
+        raise
+    finally:
+        with _live_lock:
+            _live.discard(tx.dir)
+
+
+def write_atomic(path: Path, data: bytes | str) -> None:
+    """Replace *path* with *data* so readers see the old or the new file,
+    never a partial one, even across a crash."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data.encode("utf-8") if isinstance(data, str) else data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+
+def recover(workspace: Path) -> int:
+    """Finish committed transactions left by a crash and discard the rest.
+
+    Returns the number of leftover transactions found.  A journal that
+    cannot be replayed is logged and left in place, and the error raised.
+    """
+    if not _leftovers(workspace):
+        return 0
+    # Only takes the workspace lock, and no library lock under it, so it
+    # is safe to call with library locks held (see locks.py).
+    with locks.hold(workspace):
+        # Listed again: another thread or process may have finished them
+        # while this one waited for the lock.
+        leftovers = _leftovers(workspace)
+        for tx_dir in leftovers:
+            _recover_one(Path(workspace), tx_dir)
+    return len(leftovers)
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+def _leftovers(workspace: Path) -> list[Path]:
+    """Transaction directories no running transaction owns: this process's
+    that are not live, and those of processes that have exited."""
+    try:
+        entries = sorted(journal_dir(workspace).iterdir())
+    except OSError:
+        return []
+    with _live_lock:
+        mine = [d for d in entries if d.is_dir() and d not in _live]
+    return [d for d in mine if not _owned_elsewhere(d)]
+
+
+def _owned_elsewhere(tx_dir: Path) -> bool:
+    """True if *tx_dir* belongs to another process that is still running."""
+    try:
+        pid = int(tx_dir.name.split("-")[1])
+    except (IndexError, ValueError):
+        return False  # not a transaction id: nobody owns it
+    return pid != os.getpid() and _pid_alive(pid)
+
+
+def _pid_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            # ERROR_ACCESS_DENIED: it exists, it just is not ours
+            return ctypes.get_last_error() == 5
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _recover_one(workspace: Path, tx_dir: Path) -> None:
+    journal = tx_dir / JOURNAL_FILE
+    if not journal.is_file():
+        log.info("journal: discarding uncommitted transaction %s", tx_dir.name)
+        shutil.rmtree(tx_dir, ignore_errors=True)
+        return
+    record = json.loads(journal.read_text(encoding="utf-8"))
+    log.warning("journal: replaying interrupted %s (%s)", record.get("name"), tx_dir.name)
+    _apply(workspace, tx_dir, record["steps"])
+    shutil.rmtree(tx_dir, ignore_errors=True)
+
+def _apply(workspace: Path, tx_dir: Path, steps: list[dict]) -> None:
+    """Apply *steps* in order; safe to run again on a partly applied list."""
+    touched: set[Path] = set()
+    for step in steps:
+        op = step["op"]
+        if op == "replace":
+            path = workspace / step["path"]
+            staged = tx_dir / step["staged"]
+            if staged.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _move(staged, path)
+            touched.add(path.parent)
+        elif op == "rename":
+            src = workspace / step["src"]
+            dst = workspace / step["dst"]
+            if os.path.lexists(src):
+                # A leftover dst is either the old file being replaced or
+                # part of an interrupted cross-device move; src wins.
+                _remove(dst)
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                _move(src, dst)
+            touched.update((src.parent, dst.parent))
+        elif op == "splice":
+            path = workspace / step["path"]
+            if path.is_file():
+                data = (tx_dir / step["staged"]).read_bytes()
+                with open(path, "r+b") as fh:
+                    fh.seek(step["offset"])
+                    fh.write(data)
+                    fh.truncate()
+                    fh.flush()
+                    os.fsync(fh.fileno())
+        elif op == "delete":
+            path = workspace / step["path"]
+            _remove(path)
+            touched.add(path.parent)
+        else:
+            raise ValueError(f"unknown journal step {op!r}")
+    for directory in touched:
+        _fsync_dir(directory)
+
+
+def _move(src: Path, dst: Path) -> None:
+    try:
+        os.replace(src, dst)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        path.unlink()
+
+
+def _fsync_file(path: Path) -> None:
+    with open(path, "r+b") as fh:
+        os.fsync(fh.fileno())
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a directory's entries (renames); a no-op where directories
+    cannot be opened (Windows)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
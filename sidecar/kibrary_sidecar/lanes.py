@@ -0,0 +1,127 @@
+"""lanes.py — priority lanes for the RPC dispatcher.
+
+Every sync method belongs to one lane, and each lane has its own worker
+pool, so a slow ``library.backfill_icons`` or a ``library.list`` over a
+big workspace can never queue in front of ``system.ping`` or
+``parts.read_props``.
+
+    interactive — UI-latency-critical calls (the default for any method)
+    background  — heavier reads the UI waits on but can show a spinner for
+    bulk        — long-running batch work
+
+Configuration, highest precedence first:
+
+1. Environment: ``KIBRARY_SIDECAR_WORKERS`` (interactive pool size, as
+   before), ``KIBRARY_SIDECAR_BACKGROUND_WORKERS``,
+   ``KIBRARY_SIDECAR_BULK_WORKERS``, and ``KIBRARY_SIDECAR_LANES`` — a
+   comma-separated ``method=lane`` list of per-method overrides.
+2. The ``rpc_lanes`` key of the global settings.json::
+
+       "rpc_lanes": {"workers": {"bulk": 2}, "methods": {"library.list": "interactive"}}
+
+3. The defaults below.
+
+Public API
+----------
+LANES                  → lane names, highest priority first
+load_config()          → {"workers": {lane: int}, "methods": {method: lane}}
+lane_for(method, cfg)  → lane name for *method*
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+LANES = ("interactive", "background", "bulk")
+
+DEFAULT_WORKERS = {"interactive": 8, "background": 2, "bulk": 1}
+
+# Methods not listed here are interactive.
+DEFAULT_METHOD_LANES = {
+    "library.list": "background",
+    "library.list_components": "background",
+    "library.diff": "background",
+    "library.commit": "background",
+    "library.commit_many": "background",
+    "library.find_duplicates": "background",
+    "library.rename_library": "background",
+    "library.move_component": "background",
+    "kicad.detect": "background",
+    "kicad.refresh": "background",
+    "git.undo_last": "background",
+    "library.backfill_icons": "bulk",
+    "bootstrap.install": "bulk",
+}
+
+_WORKER_ENV = {
+    "interactive": "KIBRARY_SIDECAR_WORKERS",
+    "background": "KIBRARY_SIDECAR_BACKGROUND_WORKERS",
+    "bulk": "KIBRARY_SIDECAR_BULK_WORKERS",
+}
+_LANES_ENV = "KIBRARY_SIDECAR_LANES"
+
+
+def load_config() -> dict:
+    """Return the effective lane configuration (env > settings > defaults).
+
+    Invalid values are logged and ignored rather than failing startup.
+    """
+    workers = dict(DEFAULT_WORKERS)
+    methods = dict(DEFAULT_METHOD_LANES)
+
+    configured = _settings_config()
+    for lane, count in configured.get("workers", {}).items():
+        _set_workers(workers, lane, count, "settings")
+    for method, lane in configured.get("methods", {}).items():
+        _set_method(methods, method, lane, "settings")
+
+    for lane, var in _WORKER_ENV.items():
+        if os.environ.get(var):
+            _set_workers(workers, lane, os.environ[var], var)
+    for pair in os.environ.get(_LANES_ENV, "").split(","):
+        if "=" in pair:
+            method, lane = pair.split("=", 1)
+            _set_method(methods, method.strip(), lane.strip(), _LANES_ENV)
+
+    return {"workers": workers, "methods": methods}
+
+
+def lane_for(method: str, config: dict) -> str:
+    return config["methods"].get(method, "interactive")
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _settings_config() -> dict:
+    try:
+        from kibrary_sidecar import settings  # local import: keep startup lean
+
+        configured = settings.read_settings().get("rpc_lanes") or {}
+    except Exception as exc:
+        log.warning("lanes: ignoring unreadable settings: %s", exc)
+        return {}
+    return configured if isinstance(configured, dict) else {}
+
+
+def _set_workers(workers: dict, lane: str, count, source: str) -> None:
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        count = 0
+    if lane not in LANES or count < 1:
+        log.warning("lanes: ignoring %s workers %s=%r", source, lane, count)
+        return
+    workers[lane] = count
+
+
+def _set_method(methods: dict, method: str, lane: str, source: str) -> None:
+    if lane not in LANES:
+        log.warning("lanes: ignoring %s lane %r for %s", source, lane, method)
+        return
+    methods[method] = lane
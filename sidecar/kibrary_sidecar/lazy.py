@@ -0,0 +1,70 @@
+"""lazy.py — defer subsystem imports until a handler first needs them.
+
+``methods.py`` fronts every subsystem (GitPython, kiutils, httpx, keyring,
+JLC2KiCadLib via the downloader, ...).  Importing them all up front made
+the sidecar spend most of its cold start on modules the first request —
+always ``system.ping`` — never touches.  Handler modules instead bind
+their subsystems with :func:`module`; the real import runs on the first
+attribute access, i.e. the first call to a handler that uses it, and is
+cached from then on::
+
+    git_ops = lazy.module("kibrary_sidecar.git_ops")
+    ...
+    git_ops.auto_commit(...)   # imports kibrary_sidecar.git_ops here
+
+The import itself goes through ``importlib.import_module``, so concurrent
+first calls from several worker threads are serialised by the import
+system's per-module lock and all see the fully-initialised module.
+Attribute lookups are forwarded on every access, so tests that
+monkeypatch the real module are seen by the handlers.
+
+Public API
+----------
+module(name)     → proxy for module *name*, imported on first attribute access
+load(proxy)      → force the import now; returns the real module
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: ModuleType | None = None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        if attr in LazyModule.__slots__:
+            object.__setattr__(self, attr, value)
+        else:
+            setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+    def _load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return module
+
+
+def module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def load(proxy: LazyModule | ModuleType) -> ModuleType:
+    """Import *proxy*'s module now (e.g. to pre-warm it) and return it."""
+    if isinstance(proxy, LazyModule):
+        return proxy._load()
+    return proxy
@@ -0,0 +1,360 @@
+"""lib_index.py — persistent, workspace-level index of parsed libraries.
+
+Parsing a multi-megabyte ``<lib>.kicad_sym`` is by far the most expensive
+thing the Libraries room does, and the result only changes when the file
+does.  This module keeps one entry per library, keyed by the stat of the
+symbol file (mtime + size + inode) and of the ``.pretty`` / ``.3dshapes``
+directories, so unchanged libraries are served without a re-parse.
+
+The index lives at ``<workspace>/.kibrary/cache/lib_index.json`` and is
+only persisted for opened workspaces (those with a ``.kibrary/`` dir); for
+anything else it is kept in-process only.
+
+Public API
+----------
+get_library(lib_dir)        → {component_count, symbols: [...]}
+iter_library(lib_dir)       → the same symbols one by one, a stale library scanned lazily
+get_libraries(lib_dirs, workers) → {name: entry | None}, stale ones scanned in parallel
+peek(lib_dir)               → the entry if it is fresh, else None (never scans)
+stat_key(lib_dir)           → the stat-based key an entry is validated against
+prune(workspace, names)     → drop entries for libraries that no longer exist
+flush(workspace)            → write the index to disk if it changed
+
+Each entry in ``symbols`` is a dict with keys:
+    name            (str)            — symbol entryName
+    properties      (dict[str, str]) — top-level symbol properties
+    footprint_file  (str | None)     — file name inside ``<lib>.pretty/``
+    model3d_file    (str | None)     — file name inside ``<lib>.3dshapes/``
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+from kibrary_sidecar import journal, sexpr_scan
+
+log = logging.getLogger(__name__)
+
+# Bump when the entry layout changes; older index files are discarded.
+_INDEX_VERSION = 1
+
+_3D_EXTENSIONS = (".step", ".stp", ".wrl", ".glb")
+
+# Below this many stale libraries a process pool costs more to spin up
+# than it saves; scan them in-process instead.
+_PARALLEL_MIN_LIBS = 4
+
+# workspace path (str) → {"libraries": {name: entry}, "dirty": bool}
+_indexes: dict[str, dict] = {}
+_lock = threading.Lock()
+# Serialises flush() writes (taken before _lock, never inside it).
+_flush_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def get_library(lib_dir: Path, *, persist: bool = True) -> dict:
+    """Return the index entry for the library at *lib_dir*.
+
+    The entry is re-built from the ``.kicad_sym`` only when its stat key
+    differs from the cached one.  When *persist* is true a rebuilt entry is
+    written back to disk straight away; callers refreshing many libraries
+    at once pass ``persist=False`` and call :func:`flush` at the end.
+
+    Raises whatever the underlying parse raises (e.g. ``FileNotFoundError``
+    when the symbol file is missing).
+    """
+    lib_dir = Path(lib_dir)
+    workspace = lib_dir.parent
+    key = stat_key(lib_dir)
+
+    with _lock:
+        index = _load(workspace)
+        entry = index["libraries"].get(lib_dir.name)
+    if entry is not None and entry["key"] == key:
+        return entry
+
+    entry = build_entry(lib_dir)
+    entry["key"] = key
+    with _lock:
+        index["libraries"][lib_dir.name] = entry
+        index["dirty"] = True
+    if persist:
+        flush(workspace)
+    return entry
+
+
+def iter_library(lib_dir: Path) -> Iterator[dict]:
+    """Yield the ``symbols`` of :func:`get_library` one at a time.
+
+    A fresh entry is replayed from the index.  A stale one is scanned
+    lazily, each symbol yielded as soon as it is parsed, so the first
+    rows of a big library need not wait for the last; the entry is
+    stored (and flushed) once the scan completes.  Abandoning the
+    iteration early leaves the index as it was.
+    """
+    lib_dir = Path(lib_dir)
+    workspace = lib_dir.parent
+    key = stat_key(lib_dir)
+
+    with _lock:
+        index = _load(workspace)
+        entry = index["libraries"].get(lib_dir.name)
+    if entry is not None and entry["key"] == key:
+        yield from entry["symbols"]
+        return
+
+    symbols = []
+    for sym in _scan_symbols(lib_dir):
+        symbols.append(sym)
+        yield sym
+    with _lock:
+        index["libraries"][lib_dir.name] = {
+            "component_count": len(symbols), "symbols": symbols, "key": key,
+        }
+        index["dirty"] = True
+    flush(workspace)
+
+
+def peek(lib_dir: Path) -> dict | None:
+    """Return the cached entry for *lib_dir* if it is still fresh, else None.
+
+    Never scans the library — used by fast paths that would rather compute
+    something cheaper than refresh the index.
+    """
+    lib_dir = Path(lib_dir)
+    try:
+        key = stat_key(lib_dir)
+    except OSError:
+        return None
+    with _lock:
+        entry = _load(lib_dir.parent)["libraries"].get(lib_dir.name)
+    if entry is not None and entry["key"] == key:
+        return entry
+    return None
+
+
+def get_libraries(lib_dirs: list[Path], workers: int = 1) -> dict[str, dict | None]:
+    """Return index entries for several libraries of one workspace at once.
+
+    Fresh entries come straight from the index; stale ones are rebuilt,
+    fanned out over a process pool of up to *workers* processes when there
+    are enough of them to be worth it (scanning is CPU-bound and holds the
+    GIL, so threads would not help).  A library that fails to scan maps to
+    ``None``.  The index is flushed once at the end.
+    """
+    lib_dirs = [Path(d) for d in lib_dirs]
+    if not lib_dirs:
+        return {}
+    workspace = lib_dirs[0].parent
+
+    results: dict[str, dict | None] = {}
+    stale: list[tuple[Path, list[int]]] = []
+    with _lock:
+        index = _load(workspace)
+        for lib_dir in lib_dirs:
+            try:
+                key = stat_key(lib_dir)
+            except OSError:
+                results[lib_dir.name] = None
+                continue
+            entry = index["libraries"].get(lib_dir.name)
+            if entry is not None and entry["key"] == key:
+                results[lib_dir.name] = entry
+            else:
+                stale.append((lib_dir, key))
+
+    if workers > 1 and len(stale) >= _PARALLEL_MIN_LIBS:
+        built = _build_parallel([d for d, _ in stale], min(workers, len(stale)))
+    else:
+        built = [_try_build(d) for d, _ in stale]
+
+    with _lock:
+        for (lib_dir, key), entry in zip(stale, built):
+            if entry is not None:
+                entry["key"] = key
+                index["libraries"][lib_dir.name] = entry
+                index["dirty"] = True
+            results[lib_dir.name] = entry
+    flush(workspace)
+    return results
+
+
+def build_entry(lib_dir: Path) -> dict:
+    """Parse the library at *lib_dir* into a fresh (un-keyed) index entry."""
+    symbols = list(_scan_symbols(Path(lib_dir)))
+    return {"component_count": len(symbols), "symbols": symbols}
+
+
+def prune(workspace: Path, names: set[str]) -> None:
+    """Drop index entries for libraries not listed in *names*."""
+    with _lock:
+        index = _load(Path(workspace))
+        stale = set(index["libraries"]) - set(names)
+        for name in stale:
+            del index["libraries"][name]
+        if stale:
+            index["dirty"] = True
+
+
+def flush(workspace: Path) -> None:
+    """Persist the index for *workspace* if it has unsaved changes.
+
+    No-op for directories that are not opened workspaces.  Write failures
+    are logged and swallowed — the index is a cache, never the source of
+    truth.  The entries are snapshotted under ``_lock`` and written outside
+    it, so lookups never wait on the disk; ``_flush_lock`` keeps an older
+    snapshot from overwriting a newer one.
+    """
+    workspace = Path(workspace)
+    path = _index_path(workspace)
+    with _flush_lock:
+        with _lock:
+            index = _indexes.get(str(workspace))
+            if index is None or not index["dirty"]:
+                return
+            if not path.parent.parent.is_dir():
+                return
+            # Entries are replaced, never mutated, so a shallow copy is a
+            # consistent snapshot.
+            payload = {"version": _INDEX_VERSION, "libraries": dict(index["libraries"])}
+            index["dirty"] = False
+        try:
+            path.parent.mkdir(exist_ok=True)
+            journal.write_atomic(path, json.dumps(payload))
+        except OSError as exc:
+            log.warning("lib_index: failed to write %s: %s", path, exc)
+            with _lock:
+                index["dirty"] = True
+
+
+def invalidate(workspace: Path | None = None) -> None:
+    """Forget cached indexes (all of them, or just *workspace*'s).
+
+    Only clears the in-process copy; the on-disk file is re-validated
+    entry-by-entry on the next load anyway.
+    """
+    with _lock:
+        if workspace is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(str(Path(workspace)), None)
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _index_path(workspace: Path) -> Path:
+    return workspace / ".kibrary" / "cache" / "lib_index.json"
+
+
+def _load(workspace: Path) -> dict:
+    """Return the in-process index for *workspace*, reading it from disk
+    on first use.  Caller must hold ``_lock``."""
+    index = _indexes.get(str(workspace))
+    if index is not None:
+        return index
+
+    libraries: dict = {}
+    path = _index_path(workspace)
+    if path.is_file():
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if payload.get("version") == _INDEX_VERSION:
+                libraries = payload.get("libraries", {})
+        except (OSError, ValueError) as exc:
+            log.warning("lib_index: ignoring unreadable %s: %s", path, exc)
+
+    index = {"libraries": libraries, "dirty": False}
+    _indexes[str(workspace)] = index
+    return index
+
+
+def stat_key(lib_dir: Path) -> list[int]:
+    """Return the invalidation key for *lib_dir*.
+
+    ``.kicad_sym`` mtime/size/inode catch symbol edits; the directory
+    mtimes of ``.pretty`` and ``.3dshapes`` catch footprints and models
+    being added, removed or renamed (which changes the resolved paths).
+    """
+    st = (lib_dir / f"{lib_dir.name}.kicad_sym").stat()
+    key = [st.st_mtime_ns, st.st_size, st.st_ino]
+    for suffix in (".pretty", ".3dshapes"):
+        try:
+            key.append((lib_dir / f"{lib_dir.name}{suffix}").stat().st_mtime_ns)
+        except OSError:
+            key.append(0)
+    return key
+
+
+def _scan_symbols(lib_dir: Path) -> Iterator[dict]:
+    """Yield the index ``symbols`` of *lib_dir* as its file is scanned."""
+    footprints = _list_files(lib_dir / f"{lib_dir.name}.pretty")
+    models = _list_files(lib_dir / f"{lib_dir.name}.3dshapes")
+    for sym in sexpr_scan.iter_file(lib_dir / f"{lib_dir.name}.kicad_sym"):
+        yield {
+            "name": sym["name"],
+            "properties": sym["properties"],
+            "footprint_file": _match_footprint(footprints, sym["name"]),
+            "model3d_file": _match_model(models, sym["name"]),
+        }
+
+
+def _try_build(lib_dir: Path) -> dict | None:
+    try:
+        return build_entry(lib_dir)
+    except Exception as exc:
+        log.warning("lib_index: failed to scan %s: %s", lib_dir, exc)
+        return None
+
+
+def _build_parallel(lib_dirs: list[Path], workers: int) -> list[dict | None]:
+    """Run :func:`_try_build` for each of *lib_dirs* in a process pool.
+
+    Uses the ``spawn`` start method: forking a process that already runs
+    RPC worker threads can deadlock on locks held at fork time.  Falls
+    back to scanning in-process if the pool cannot be started.
+    """
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            return list(pool.map(_try_build, lib_dirs))
+    except Exception as exc:
+        log.warning("lib_index: parallel scan failed, scanning in-process: %s", exc)
+        return [_try_build(d) for d in lib_dirs]
+
+
+def _list_files(directory: Path) -> list[str]:
+    if not directory.is_dir():
+        return []
+    return sorted(f.name for f in directory.iterdir() if f.is_file())
+
+
+def _match_footprint(files: list[str], name: str) -> str | None:
+    target = f"{name}.kicad_mod"
+    return target if target in files else None
+
+
+def _match_model(files: list[str], name: str) -> str | None:
+    by_name = set(files)
+    for ext in _3D_EXTENSIONS:
+        if f"{name}{ext}" in by_name:
+            return f"{name}{ext}"
+    # Fallback: any supported extension with matching stem (case-insensitive ext)
+    for f in files:
+        stem, ext = os.path.splitext(f)
+        if stem == name and ext.lower() in _3D_EXTENSIONS:
+            return f
+    return None
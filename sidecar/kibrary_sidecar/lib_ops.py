@@ -6,16 +6,24 @@ Provides:
 - move_component     – move a symbol + footprint + 3D between libraries
 - rename_library     – rename a library folder and update all internal refs
 - update_library_metadata – merge-update lib_dir/metadata.json
+
+Each operation's file changes are one :func:`journal.transaction`, so a
+crash leaves the library as it was before or after — never half-moved.
+Libraries live directly under the workspace, so ``lib_dir.parent`` is the
+workspace the journal goes in.  Each operation holds the write lock
+(:mod:`locks`) of every library it touches, from its first read to the
+commit.
 """
 from __future__ import annotations
 
 import json
-import shutil
 from pathlib import Path
 from typing import Optional
 
 from kiutils.symbol import SymbolLib
 
+from kibrary_sidecar import journal, locks
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -73,42 +81,44 @@ def rename_component(lib_dir: Path, old_name: str, new_name: str) -> None:
     Updates the symbol's Footprint property to point at the new fp name.
     Raises KeyError if *old_name* doesn't exist.
     """
-    sym_file = _sym_path(lib_dir)
-    lib = SymbolLib.from_file(str(sym_file))
-    lib_name = lib_dir.name
-
-    # Find the symbol to rename
-    matching = [s for s in lib.symbols if s.entryName == old_name]
-    if not matching:
-        raise KeyError(f"Component {old_name!r} not found in {lib_dir}")
-
-    # Rename in-memory
-    for sym in matching:
-        sym.entryName = new_name
-        # Update Footprint property: e.g. "Resistors_KSL:R_10k_0402" → "...:R_10k_0402_NEW"
-        for prop in sym.properties:
-            if prop.key == "Footprint" and prop.value:
-                # Replace only the footprint name portion (after the colon)
-                if ":" in prop.value:
-                    lib_part, fp_part = prop.value.split(":", 1)
-                    if fp_part == old_name:
-                        prop.value = f"{lib_part}:{new_name}"
-                elif prop.value == old_name:
-                    prop.value = new_name
-
-    lib.to_file(str(sym_file))
-
-    # Rename .kicad_mod
-    pretty = _pretty_dir(lib_dir)
-    old_mod = pretty / f"{old_name}.kicad_mod"
-    if old_mod.exists():
-        old_mod.rename(pretty / f"{new_name}.kicad_mod")
-
-    # Rename 3D model file (any extension)
-    shapes = _shapes_dir(lib_dir)
-    old_model = _find_model_file(shapes, old_name)
-    if old_model is not None:
-        old_model.rename(old_model.parent / f"{new_name}{old_model.suffix}")
+    with locks.hold(lib_dir):
+        sym_file = _sym_path(lib_dir)
+        lib = SymbolLib.from_file(str(sym_file))
+        lib_name = lib_dir.name
+
+        # Find the symbol to rename
+        matching = [s for s in lib.symbols if s.entryName == old_name]
+        if not matching:
+            raise KeyError(f"Component {old_name!r} not found in {lib_dir}")
+
+        # Rename in-memory
+        for sym in matching:
+            sym.entryName = new_name
+            # Update Footprint property: e.g. "Resistors_KSL:R_10k_0402" → "...:R_10k_0402_NEW"
+            for prop in sym.properties:
+                if prop.key == "Footprint" and prop.value:
+                    # Replace only the footprint name portion (after the colon)
+                    if ":" in prop.value:
+                        lib_part, fp_part = prop.value.split(":", 1)
+                        if fp_part == old_name:
+                            prop.value = f"{lib_part}:{new_name}"
+                    elif prop.value == old_name:
+                        prop.value = new_name
+
+        with journal.transaction(lib_dir.parent, "rename_component") as tx:
+            tx.write(sym_file, lib.to_sexpr())
+
+            # Rename .kicad_mod
+            pretty = _pretty_dir(lib_dir)
+            old_mod = pretty / f"{old_name}.kicad_mod"
+            if old_mod.exists():
+                tx.rename(old_mod, pretty / f"{new_name}.kicad_mod")
+
+            # Rename 3D model file (any extension)
+            shapes = _shapes_dir(lib_dir)
+            old_model = _find_model_file(shapes, old_name)
+            if old_model is not None:
+                tx.rename(old_model, old_model.parent / f"{new_name}{old_model.suffix}")
 
 
 def delete_component(lib_dir: Path, component_name: str) -> None:
@@ -116,26 +126,29 @@ def delete_component(lib_dir: Path, component_name: str) -> None:
 
     Idempotent — does nothing if the component is absent.
     """
-    sym_file = _sym_path(lib_dir)
-    if not sym_file.exists():
-        return
+    with locks.hold(lib_dir):
+        sym_file = _sym_path(lib_dir)
+        if not sym_file.exists():
+            return
+
+        lib = SymbolLib.from_file(str(sym_file))
+        original_count = len(lib.symbols)
+        lib.symbols = [s for s in lib.symbols if s.entryName != component_name]
 
-    lib = SymbolLib.from_file(str(sym_file))
-    original_count = len(lib.symbols)
-    lib.symbols = [s for s in lib.symbols if s.entryName != component_name]
-    if len(lib.symbols) != original_count:
-        lib.to_file(str(sym_file))
+        with journal.transaction(lib_dir.parent, "delete_component") as tx:
+            if len(lib.symbols) != original_count:
+                tx.write(sym_file, lib.to_sexpr())
 
-    # Remove .kicad_mod
-    mod_file = _pretty_dir(lib_dir) / f"{component_name}.kicad_mod"
-    if mod_file.exists():
-        mod_file.unlink()
+            # Remove .kicad_mod
+            mod_file = _pretty_dir(lib_dir) / f"{component_name}.kicad_mod"
+            if mod_file.exists():
+                tx.delete(mod_file)
 
-    # Remove 3D model (any extension)
-    shapes = _shapes_dir(lib_dir)
-    model_file = _find_model_file(shapes, component_name)
-    if model_file is not None:
-        model_file.unlink()
+            # Remove 3D model (any extension)
+            shapes = _shapes_dir(lib_dir)
+            model_file = _find_model_file(shapes, component_name)
+            if model_file is not None:
+                tx.delete(model_file)
 
 
 def move_component(src_lib: Path, dst_lib: Path, component_name: str) -> None:
@@ -144,64 +157,61 @@ def move_component(src_lib: Path, dst_lib: Path, component_name: str) -> None:
     Updates internal Footprint refs (``SrcLib:name`` → ``DstLib:name``).
     Raises FileExistsError if *component_name* already exists in *dst_lib*.
     """
-    src_name = src_lib.name
-    dst_name = dst_lib.name
-
-    # Check for collision in dst
-    dst_sym_file = _sym_path(dst_lib)
-    if dst_sym_file.exists():
-        dst_lib_obj = SymbolLib.from_file(str(dst_sym_file))
-        existing_names = {s.entryName for s in dst_lib_obj.symbols}
-        if component_name in existing_names:
-            raise FileExistsError(
-                f"Component {component_name!r} already exists in {dst_lib}"
-            )
-    else:
-        dst_lib_obj = SymbolLib()
-        dst_lib_obj.filePath = str(dst_sym_file)
-
-    # Load source and extract the symbol(s)
-    src_sym_file = _sym_path(src_lib)
-    src_lib_obj = SymbolLib.from_file(str(src_sym_file))
-
-    to_move = [s for s in src_lib_obj.symbols if s.entryName == component_name]
-    if not to_move:
-        raise KeyError(f"Component {component_name!r} not found in {src_lib}")
-
-    # Update Footprint refs in the symbols being moved
-    for sym in to_move:
-        for prop in sym.properties:
-            if prop.key == "Footprint" and prop.value:
-                if ":" in prop.value:
-                    lib_part, fp_part = prop.value.split(":", 1)
-                    if lib_part == src_name:
-                        prop.value = f"{dst_name}:{fp_part}"
-                elif prop.value:
-                    prop.value = f"{dst_name}:{prop.value}"
-
-    # Mutate src (remove) and dst (add)
-    src_lib_obj.symbols = [s for s in src_lib_obj.symbols if s.entryName != component_name]
-    src_lib_obj.to_file(str(src_sym_file))
-
-    for sym in to_move:
-        dst_lib_obj.symbols.append(sym)
-    dst_lib_obj.to_file(str(dst_sym_file))
-
-    # Move .kicad_mod
-    src_pretty = _pretty_dir(src_lib)
-    dst_pretty = _pretty_dir(dst_lib)
-    dst_pretty.mkdir(exist_ok=True)
-    src_mod = src_pretty / f"{component_name}.kicad_mod"
-    if src_mod.exists():
-        shutil.move(str(src_mod), dst_pretty / src_mod.name)
-
-    # Move 3D model
-    src_shapes = _shapes_dir(src_lib)
-    src_model = _find_model_file(src_shapes, component_name)
-    if src_model is not None:
-        dst_shapes = dst_lib / f"{dst_name}.3dshapes"
-        dst_shapes.mkdir(exist_ok=True)
-        shutil.move(str(src_model), dst_shapes / src_model.name)
+    with locks.hold(src_lib, dst_lib):
+        src_name = src_lib.name
+        dst_name = dst_lib.name
+
+        # Check for collision in dst
+        dst_sym_file = _sym_path(dst_lib)
+        if dst_sym_file.exists():
+            dst_lib_obj = SymbolLib.from_file(str(dst_sym_file))
+            existing_names = {s.entryName for s in dst_lib_obj.symbols}
+            if component_name in existing_names:
+                raise FileExistsError(
+                    f"Component {component_name!r} already exists in {dst_lib}"
+                )
+        else:
+            dst_lib_obj = SymbolLib()
+            dst_lib_obj.filePath = str(dst_sym_file)
+
+        # Load source and extract the symbol(s)
+        src_sym_file = _sym_path(src_lib)
+        src_lib_obj = SymbolLib.from_file(str(src_sym_file))
+
+        to_move = [s for s in src_lib_obj.symbols if s.entryName == component_name]
+        if not to_move:
+            raise KeyError(f"Component {component_name!r} not found in {src_lib}")
+
+        # Update Footprint refs in the symbols being moved
+        for sym in to_move:
+            for prop in sym.properties:
+                if prop.key == "Footprint" and prop.value:
+                    if ":" in prop.value:
+                        lib_part, fp_part = prop.value.split(":", 1)
+                        if lib_part == src_name:
+                            prop.value = f"{dst_name}:{fp_part}"
+                    elif prop.value:
+                        prop.value = f"{dst_name}:{prop.value}"
+
+        # Mutate src (remove) and dst (add)
+        src_lib_obj.symbols = [s for s in src_lib_obj.symbols if s.entryName != component_name]
+        for sym in to_move:
+            dst_lib_obj.symbols.append(sym)
+
+        with journal.transaction(src_lib.parent, "move_component") as tx:
+            tx.write(src_sym_file, src_lib_obj.to_sexpr())
+            tx.write(dst_sym_file, dst_lib_obj.to_sexpr())
+
+            # Move .kicad_mod
+            src_mod = _pretty_dir(src_lib) / f"{component_name}.kicad_mod"
+            if src_mod.exists():
+                tx.rename(src_mod, _pretty_dir(dst_lib) / src_mod.name)
+
+            # Move 3D model
+            src_shapes = _shapes_dir(src_lib)
+            src_model = _find_model_file(src_shapes, component_name)
+            if src_model is not None:
+                tx.rename(src_model, dst_lib / f"{dst_name}.3dshapes" / src_model.name)
 
 
 def rename_library(workspace: Path, old: str, new: str) -> None:
@@ -214,53 +224,52 @@ def rename_library(workspace: Path, old: str, new: str) -> None:
     old_dir = workspace / old
     new_dir = workspace / new
 
-    if new_dir.exists():
-        raise FileExistsError(f"Library {new!r} already exists at {new_dir}")
-
-    # Rename directory
-    old_dir.rename(new_dir)
-
-    # Rename .kicad_sym
-    old_sym = new_dir / f"{old}.kicad_sym"
-    new_sym = new_dir / f"{new}.kicad_sym"
-    if old_sym.exists():
-        old_sym.rename(new_sym)
-
-    # Rename .pretty
-    old_pretty = new_dir / f"{old}.pretty"
-    new_pretty = new_dir / f"{new}.pretty"
-    if old_pretty.exists():
-        old_pretty.rename(new_pretty)
-
-    # Rename .3dshapes
-    old_shapes = new_dir / f"{old}.3dshapes"
-    new_shapes = new_dir / f"{new}.3dshapes"
-    if old_shapes.exists():
-        old_shapes.rename(new_shapes)
-
-    # Update Footprint refs in the .kicad_sym (OldLib:fp → NewLib:fp)
-    if new_sym.exists():
-        lib = SymbolLib.from_file(str(new_sym))
-        changed = _rewrite_footprint_refs(lib, old, new)
-        if changed:
-            lib.to_file(str(new_sym))
-
-    # Update metadata.json name field
-    meta_path = new_dir / "metadata.json"
-    if meta_path.exists():
-        meta = json.loads(meta_path.read_text())
-        meta["name"] = new
-        meta_path.write_text(json.dumps(meta, indent=2))
-
-    # Update repository.json
-    repo_path = workspace / "repository.json"
-    if repo_path.exists():
-        repo = json.loads(repo_path.read_text())
-        packages = repo.get("packages", [])
-        for entry in packages:
-            if entry.get("path") == f"{old}/metadata.json":
-                entry["path"] = f"{new}/metadata.json"
-        repo_path.write_text(json.dumps(repo, indent=2))
+    with locks.hold(old_dir, new_dir):
+        if new_dir.exists():
+            raise FileExistsError(f"Library {new!r} already exists at {new_dir}")
+
+        # Everything is read from the old paths up front; the transaction
+        # then renames and writes in one go.
+
+        # Footprint refs in the .kicad_sym (OldLib:fp → NewLib:fp)
+        sym_text = None
+        old_sym = old_dir / f"{old}.kicad_sym"
+        if old_sym.exists():
+            lib = SymbolLib.from_file(str(old_sym))
+            if _rewrite_footprint_refs(lib, old, new):
+                sym_text = lib.to_sexpr()
+
+        # metadata.json name field
+        meta = None
+        if (old_dir / "metadata.json").exists():
+            meta = json.loads((old_dir / "metadata.json").read_text())
+            meta["name"] = new
+
+        # repository.json is shared by every library: hold the workspace
+        # lock from reading it to the commit
+        with locks.hold(workspace):
+            repo_path = workspace / "repository.json"
+            repo = None
+            if repo_path.exists():
+                repo = json.loads(repo_path.read_text())
+                packages = repo.get("packages", [])
+                for entry in packages:
+                    if entry.get("path") == f"{old}/metadata.json":
+                        entry["path"] = f"{new}/metadata.json"
+
+            with journal.transaction(workspace, "rename_library") as tx:
+                # Rename directory, then its .kicad_sym / .pretty / .3dshapes
+                tx.rename(old_dir, new_dir)
+                for suffix in (".kicad_sym", ".pretty", ".3dshapes"):
+                    if (old_dir / f"{old}{suffix}").exists():
+                        tx.rename(new_dir / f"{old}{suffix}", new_dir / f"{new}{suffix}")
+
+                if sym_text is not None:
+                    tx.write(new_dir / f"{new}.kicad_sym", sym_text)
+                if meta is not None:
+                    tx.write(new_dir / "metadata.json", json.dumps(meta, indent=2))
+                if repo is not None:
+                    tx.write(repo_path, json.dumps(repo, indent=2))
 
 
 def update_library_metadata(lib_dir: Path, metadata: dict) -> None:
@@ -268,10 +277,11 @@ def update_library_metadata(lib_dir: Path, metadata: dict) -> None:
 
     Preserves unknown keys from the existing file; provided keys take priority.
     """
-    meta_path = lib_dir / "metadata.json"
-    if meta_path.exists():
-        existing = json.loads(meta_path.read_text())
-    else:
-        existing = {}
-    existing.update(metadata)
-    meta_path.write_text(json.dumps(existing, indent=2))
+    with locks.hold(lib_dir):
+        meta_path = lib_dir / "metadata.json"
+        if meta_path.exists():
+            existing = json.loads(meta_path.read_text())
+        else:
+            existing = {}
+        existing.update(metadata)
+        journal.write_atomic(meta_path, json.dumps(existing, indent=2))
@@ -2,16 +2,23 @@
 
 Public API
 ----------
-list_libraries(workspace)      → [{name, path, component_count, has_pretty, has_3dshapes}]
+list_libraries(workspace, workers, fast) → [{name, path, component_count, has_pretty, has_3dshapes}]
+library_dirs(workspace)        → [Path] of library directories, sorted
 list_components(lib_dir)       → [{name, description, reference, value, footprint}]
+iter_components(lib_dir)       → the same, one at a time as the library is scanned
 get_component(lib_dir, name)   → {properties, footprint_path, model3d_path}
+
+All three are served from :mod:`kibrary_sidecar.lib_index`, so a library
+is only re-parsed when its ``.kicad_sym`` (or footprint / 3D directory)
+changed since the last scan.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterator
 
-from kiutils.symbol import SymbolLib
+from kibrary_sidecar import lib_index, sexpr_scan
 
 
 # ---------------------------------------------------------------------------
@@ -19,7 +26,7 @@ from kiutils.symbol import SymbolLib
 # ---------------------------------------------------------------------------
 
 
-def list_libraries(workspace: Path) -> list[dict]:
+def list_libraries(workspace: Path, workers: int = 1, fast: bool = False) -> list[dict]:
     """Return a list of library descriptors found under *workspace*.
 
     A directory ``<workspace>/<name>/`` is considered a library when it
@@ -32,39 +39,44 @@ def list_libraries(workspace: Path) -> list[dict]:
         component_count (int)  — number of top-level symbols in the .kicad_sym
         has_pretty      (bool) — whether a ``<name>.pretty`` sub-directory exists
         has_3dshapes    (bool) — whether a ``<name>.3dshapes`` sub-directory exists
+
+    Libraries whose index entry is stale are re-scanned; with *workers* > 1
+    that happens in a process pool.  Results are always in sorted order.
+
+    With *fast* the index is neither refreshed nor written: stale libraries
+    get their ``component_count`` from :func:`sexpr_scan.count_symbols`, so
+    the UI can render the tree immediately and ask for details later.
     """
-    results: list[dict] = []
+    lib_dirs = library_dirs(workspace)
+    if fast:
+        return [_describe(entry, _fast_count(entry)) for entry in lib_dirs]
 
-    for entry in sorted(workspace.iterdir()):
-        if not entry.is_dir():
-            continue
-        sym_file = entry / f"{entry.name}.kicad_sym"
-        if not sym_file.is_file():
-            continue
-
-        try:
-            lib = SymbolLib.from_file(str(sym_file))
-            count = len(lib.symbols)
-        except Exception:
-            count = 0
-
-        results.append(
-            {
-                "name": entry.name,
-                "path": entry,
-                "component_count": count,
-                "has_pretty": (entry / f"{entry.name}.pretty").is_dir(),
-                "has_3dshapes": (entry / f"{entry.name}.3dshapes").is_dir(),
-            }
-        )
+    entries = lib_index.get_libraries(lib_dirs, workers=workers)
+
+    results: list[dict] = []
+    for entry in lib_dirs:
+        indexed = entries.get(entry.name)
+        results.append(_describe(entry, indexed["component_count"] if indexed else 0))
 
+    lib_index.prune(workspace, {lib["name"] for lib in results})
+    lib_index.flush(workspace)
     return results
 
 
+def library_dirs(workspace: Path) -> list[Path]:
+    """Return the library directories under *workspace*, sorted by name."""
+    return [
+        entry
+        for entry in sorted(workspace.iterdir())
+        if entry.is_dir() and (entry / f"{entry.name}.kicad_sym").is_file()
+    ]
+
+
 def list_components(lib_dir: Path) -> list[dict]:
     """Return metadata for every symbol in the library at *lib_dir*.
 
-    The ``<lib_dir.name>.kicad_sym`` file is read with kiutils.  Each symbol
+    The ``<lib_dir.name>.kicad_sym`` file is read through the library
+    index (re-scanned only when it changed).  Each symbol
     produces a dict with keys:
         name        (str) — symbol entryName
         description (str) — value of the "Description" property (empty string if absent)
@@ -72,22 +84,19 @@ def list_components(lib_dir: Path) -> list[dict]:
         value       (str) — value of the "Value" property
         footprint   (str) — value of the "Footprint" property
     """
-    sym_file = lib_dir / f"{lib_dir.name}.kicad_sym"
-    lib = SymbolLib.from_file(str(sym_file))
+    entry = lib_index.get_library(lib_dir)
+    return [_component(sym) for sym in entry["symbols"]]
 
-    results: list[dict] = []
-    for sym in lib.symbols:
-        props = {p.key: p.value for p in sym.properties}
-        results.append(
-            {
-                "name": sym.entryName,
-                "description": props.get("Description", ""),
-                "reference": props.get("Reference", ""),
-                "value": props.get("Value", ""),
-                "footprint": props.get("Footprint", ""),
-            }
-        )
-    return results
+
+def iter_components(lib_dir: Path) -> Iterator[dict]:
+    """Yield :func:`list_components`'s dicts one at a time.
+
+    A library whose index entry is stale is scanned lazily
+    (:func:`lib_index.iter_library`), so the first components are
+    available before the rest of the file has been read.
+    """
+    for sym in lib_index.iter_library(lib_dir):
+        yield _component(sym)
 
 
 def get_component(lib_dir: Path, component_name: str) -> dict:
@@ -114,28 +123,25 @@ def get_component(lib_dir: Path, component_name: str) -> dict:
     KeyError
         If no symbol with the given name exists in the library.
     """
-    sym_file = lib_dir / f"{lib_dir.name}.kicad_sym"
-    lib = SymbolLib.from_file(str(sym_file))
-
-    # Find the target symbol (top-level symbols only; skip unit sub-symbols)
-    symbol = None
-    for sym in lib.symbols:
-        if sym.entryName == component_name and sym.unitId is None:
-            symbol = sym
-            break
+    entry = lib_index.get_library(lib_dir)
 
+    # Index entries only hold top-level symbols (unit sub-symbols are nested)
+    symbol = next((s for s in entry["symbols"] if s["name"] == component_name), None)
     if symbol is None:
         raise KeyError(
             f"Component {component_name!r} not found in library {lib_dir.name!r}"
         )
 
-    properties = {p.key: p.value for p in symbol.properties}
+    properties = dict(symbol["properties"])
 
-    # Resolve footprint path
-    footprint_path: Path | None = _find_footprint(lib_dir, component_name)
+    # Resolve footprint / 3D model paths from the file names recorded at scan time
+    footprint_path: Path | None = None
+    if symbol["footprint_file"]:
+        footprint_path = lib_dir / f"{lib_dir.name}.pretty" / symbol["footprint_file"]
 
-    # Resolve 3D model path
-    model3d_path: Path | None = _find_3d_model(lib_dir, component_name)
+    model3d_path: Path | None = None
+    if symbol["model3d_file"]:
+        model3d_path = lib_dir / f"{lib_dir.name}.3dshapes" / symbol["model3d_file"]
 
     return {
         "properties": properties,
@@ -148,35 +154,34 @@ def get_component(lib_dir: Path, component_name: str) -> dict:
 # Private helpers
 # ---------------------------------------------------------------------------
 
-_3D_EXTENSIONS = (".step", ".stp", ".wrl", ".glb")
-
-
-def _find_footprint(lib_dir: Path, component_name: str) -> Path | None:
-    """Return the .kicad_mod file for *component_name* inside the .pretty dir, or None."""
-    pretty_dir = lib_dir / f"{lib_dir.name}.pretty"
-    if not pretty_dir.is_dir():
-        return None
-    candidate = pretty_dir / f"{component_name}.kicad_mod"
-    if candidate.is_file():
-        return candidate
-    # Fallback: search all .kicad_mod files in the .pretty dir
-    for fp in pretty_dir.glob("*.kicad_mod"):
-        if fp.stem == component_name:
-            return fp
-    return None
-
-
-def _find_3d_model(lib_dir: Path, component_name: str) -> Path | None:
-    """Return the first 3D model file for *component_name* inside .3dshapes, or None."""
-    shapes_dir = lib_dir / f"{lib_dir.name}.3dshapes"
-    if not shapes_dir.is_dir():
-        return None
-    for ext in _3D_EXTENSIONS:
-        candidate = shapes_dir / f"{component_name}{ext}"
-        if candidate.is_file():
-            return candidate
-    # Fallback: any supported extension with matching stem
-    for f in shapes_dir.iterdir():
-        if f.stem == component_name and f.suffix.lower() in _3D_EXTENSIONS:
-            return f
-    return None
+
+def _describe(lib_dir: Path, count: int) -> dict:
+    return {
+        "name": lib_dir.name,
+        "path": lib_dir,
+        "component_count": count,
+        "has_pretty": (lib_dir / f"{lib_dir.name}.pretty").is_dir(),
+        "has_3dshapes": (lib_dir / f"{lib_dir.name}.3dshapes").is_dir(),
+    }
+
+
+def _fast_count(lib_dir: Path) -> int:
+    """component_count from a fresh index entry, else a cheap symbol count."""
+    indexed = lib_index.peek(lib_dir)
+    if indexed is not None:
+        return indexed["component_count"]
+    try:
+        return sexpr_scan.count_symbols(lib_dir / f"{lib_dir.name}.kicad_sym")
+    except Exception:
+        return 0
+
+
+def _component(sym: dict) -> dict:
+    props = sym["properties"]
+    return {
+        "name": sym["name"],
+        "description": props.get("Description", ""),
+        "reference": props.get("Reference", ""),
+        "value": props.get("Value", ""),
+        "footprint": props.get("Footprint", ""),
+    }
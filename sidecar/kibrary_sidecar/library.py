@@ -3,24 +3,66 @@
 Ported from the legacy kibrary_automator.py (create_library / merge_into),
 using kiutils for clean symbol and footprint manipulation instead of raw
 regex hacks where possible.
+
+Only the incoming part is ever parsed: property overrides and the
+footprint-reference rewrite are applied to its (small) staging symbol
+file in memory, and on merge the result is spliced in before the
+destination library's closing paren.  The destination ``.kicad_sym`` —
+often megabytes — is neither parsed nor re-serialised, and its existing
+symbols stay byte-for-byte as they were.
+
+Every commit is one :func:`journal.transaction`: the symbol file, the
+footprints and 3D models, ``metadata.json`` and ``repository.json``
+change together or not at all, even across a crash.  Icons are copied or
+rendered after the commit, best-effort as before.  The library's write
+lock (:mod:`locks`) is held from the existence check to the commit, and
+the workspace's from the duplicate check to :func:`dup_index.record` (which
+covers each ``repository.json`` update), so parallel commits to one library
+serialise, and different libraries parse their parts and render icons at
+once but cannot both slip the same part past the duplicate check.
+
+Before anything is written the incoming symbol names and LCSC numbers are
+looked up in :mod:`dup_index`: a part already in the workspace raises
+:class:`dup_index.DuplicateComponentError` instead of being appended a
+second time.  ``allow_duplicates`` lets a part in anyway unless its name
+is already taken in the target library itself, which KiCad cannot hold.
+
+Footprints and 3D models reach the library without copying their bytes
+where possible (:mod:`transfer`): a new library takes over the staged
+directories by rename, and merged files are renamed too when the caller
+says staging is disposable (``consume_staging``), else reflinked or — 3D
+models only — hard-linked.  Commits report the bytes copied and linked.
+
+:func:`iter_commit_many` / :func:`commit_many` commit a batch of staged
+parts: they are grouped by target library, each library's symbol file is
+appended to once, ``repository.json`` is written once for the whole batch
+and icons are copied or rendered on a small thread pool.
 """
 from __future__ import annotations
 
 import json
 import logging
+import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Generator, Iterable
 
 from kiutils.symbol import SymbolLib
 
-from kibrary_sidecar.symfile import write_properties
+from kibrary_sidecar import cancellation, dup_index, journal, locks
+from kibrary_sidecar.symfile import apply_properties
 
 log = logging.getLogger(__name__)
 
 # The ${KSL_ROOT} environment-variable convention used for 3D model paths.
 _KSL_ROOT = "${KSL_ROOT}"
 
+# Icon copies/renders run concurrently in commit_many; rendering spawns
+# kicad-cli, so this also caps the number of concurrent subprocesses.
+ICON_WORKERS = 4
+
 
 # ---------------------------------------------------------------------------
 # Public API
@@ -32,6 +74,9 @@ def commit_to_library(
     staging_part: Path,
     target_lib: str,
     edits: dict,
+    allow_duplicates: bool = False,
+    consume_staging: bool = False,
+    transferred: dict | None = None,
 ) -> Path:
     """Commit a staged part into *target_lib* inside *workspace*.
 
@@ -48,36 +93,151 @@ def commit_to_library(
         Target library name, e.g. ``Resistors_KSL``.  The directory
         ``<workspace>/<target_lib>/`` will be created if it doesn't exist.
     edits:
-        Property overrides applied via :func:`symfile.write_properties`
-        (keys: ``Description``, ``Reference``, ``Value``, ``Datasheet``, …).
+        Property overrides for the incoming symbol, applied via
+        :func:`symfile.apply_properties` (keys: ``Description``,
+        ``Reference``, ``Value``, ``Datasheet``, …).
+    allow_duplicates:
+        Commit even if the symbol name or LCSC number is already in another
+        library (or the LCSC number in *target_lib*).
+    consume_staging:
+        The staged files may be moved into the library rather than copied
+        (a new library always takes over the staged directories).
+    transferred:
+        If given, ``copied`` and ``linked`` are set to the bytes of
+        footprints and 3D models brought in each way.
 
     Returns
     -------
     Path
         The library directory ``<workspace>/<target_lib>/``.
+
+    Raises
+    ------
+    dup_index.DuplicateComponentError
+        If the part is already in the workspace; nothing is written.
     """
     lib_dir = workspace / target_lib
-    if lib_dir.exists():
-        _merge_into(
-            workspace=workspace,
-            lcsc=lcsc,
-            staging_part=staging_part,
-            lib_dir=lib_dir,
-            target_lib=target_lib,
-            edits=edits,
-        )
-    else:
-        _create_new(
-            workspace=workspace,
-            lcsc=lcsc,
-            staging_part=staging_part,
-            lib_dir=lib_dir,
-            target_lib=target_lib,
-            edits=edits,
-        )
+    with locks.hold(lib_dir):
+        if lib_dir.exists():
+            counts = _merge_into(
+                workspace=workspace,
+                lcsc=lcsc,
+                staging_part=staging_part,
+                lib_dir=lib_dir,
+                target_lib=target_lib,
+                edits=edits,
+                allow_duplicates=allow_duplicates,
+                consume_staging=consume_staging,
+            )
+        else:
+            counts = _create_new(
+                workspace=workspace,
+                lcsc=lcsc,
+                staging_part=staging_part,
+                lib_dir=lib_dir,
+                target_lib=target_lib,
+                edits=edits,
+                allow_duplicates=allow_duplicates,
+            )
+    if transferred is not None:
+        transferred.update(counts)
     return lib_dir
 
 
+def iter_commit_many(
+    workspace: Path,
+    parts: list[dict],
+    allow_duplicates: bool = False,
+    consume_staging: bool = False,
+    summary: dict | None = None,
+) -> Generator[dict, None, dict]:
+    """Commit a batch of staged parts, yielding one result per part.
+
+    *parts* is a list of ``{lcsc, staging_part, target_lib, edits}`` dicts
+    (the arguments of :func:`commit_to_library`).  Parts are grouped by
+    target library in first-seen order and each group is committed in one
+    go: one append to the library's ``.kicad_sym`` (or one write, for a new
+    library), then its footprints and 3D models, then its icons in
+    parallel.  ``repository.json`` gets every new library in a single
+    write once all groups are done.
+
+    A part whose staged symbol cannot be read fails on its own; an error
+    while writing a library fails that library's parts and the batch moves
+    on to the next library.  Staging files are left in place unless
+    *consume_staging*, when they are moved into the libraries.  A part
+    already in the workspace — or earlier in the batch — fails as a
+    duplicate, subject to *allow_duplicates* as in :func:`commit_to_library`.
+
+    Yields ``{lcsc, target_lib, ok: True, component_name}`` or
+    ``{lcsc, target_lib, ok: False, error}`` as each library completes.
+    Returns ``{committed, failed, libraries, bytes_copied, bytes_linked}``
+    where ``libraries`` maps each library that received parts to
+    ``{new, parts: [{lcsc, description}]}``.  That dict is *summary*, if
+    given, kept up to date as each library completes — so a caller whose
+    batch is cancelled part-way still knows what was written.
+    """
+    groups: dict[str, list[dict]] = {}
+    for part in parts:
+        groups.setdefault(part["target_lib"], []).append(part)
+
+    if summary is None:
+        summary = {}
+    summary.update(committed=0, failed=0, libraries={}, bytes_copied=0, bytes_linked=0)
+    transferred = {"copied": 0, "linked": 0}
+    libraries = summary["libraries"]
+    new_libs: list[str] = []
+    with ThreadPoolExecutor(max_workers=ICON_WORKERS, thread_name_prefix="kibrary-icon") as pool:
+        try:
+            for target_lib, group in groups.items():
+                cancellation.check()
+                results, is_new = _commit_group(
+                    workspace, target_lib, group, pool, allow_duplicates, consume_staging, transferred
+                )
+                ok = [(part, r) for part, r in zip(group, results) if r["ok"]]
+                if ok:
+                    libraries[target_lib] = {
+                        "new": is_new,
+                        "parts": [
+                            {
+                                "lcsc": r["lcsc"],
+                                "description": part.get("edits", {}).get("Description", r["lcsc"]),
+                            }
+                            for part, r in ok
+                        ],
+                    }
+                    if is_new:
+                        new_libs.append(target_lib)
+                summary["committed"] += len(ok)
+                summary["failed"] += len(results) - len(ok)
+                summary["bytes_copied"] = transferred["copied"]
+                summary["bytes_linked"] = transferred["linked"]
+                yield from results
+        finally:
+            # Written even when cancelled part-way, so every library that
+            # did get created is registered.
+            if new_libs:
+                with locks.hold(workspace), journal.transaction(workspace, "commit_many") as tx:
+                    _append_repository(tx, workspace, *new_libs)
+
+    return summary
+
+
+def commit_many(
+    workspace: Path,
+    parts: list[dict],
+    allow_duplicates: bool = False,
+    consume_staging: bool = False,
+) -> dict:
+    """Non-streaming :func:`iter_commit_many`: its summary plus ``results``."""
+    results = []
+    gen = iter_commit_many(workspace, parts, allow_duplicates, consume_staging)
+    while True:
+        try:
+            results.append(next(gen))
+        except StopIteration as stop:
+            return {**stop.value, "results": results}
+
+
 # ---------------------------------------------------------------------------
 # CREATE-NEW path
 # ---------------------------------------------------------------------------
@@ -89,48 +249,47 @@ def _create_new(
     lib_dir: Path,
     target_lib: str,
     edits: dict,
-) -> None:
-    lib_dir.mkdir(parents=True, exist_ok=True)
-
-    # --- move symbol ---
+    allow_duplicates: bool,
+) -> dict:
     src_sym = staging_part / f"{lcsc}.kicad_sym"
-    dst_sym = lib_dir / f"{target_lib}.kicad_sym"
-    shutil.move(str(src_sym), dst_sym)
-
-    # --- move .pretty footprint dir ---
     src_pretty = staging_part / f"{lcsc}.pretty"
-    dst_pretty = lib_dir / f"{target_lib}.pretty"
-    shutil.move(str(src_pretty), dst_pretty)
-
-    # --- move .3dshapes dir (optional) ---
     src_3d = staging_part / f"{lcsc}.3dshapes"
-    dst_3d = lib_dir / f"{target_lib}.3dshapes" if src_3d.is_dir() else None
-    if src_3d.is_dir():
-        shutil.move(str(src_3d), dst_3d)
-
-    # --- apply edits ---
-    if edits:
-        write_properties(dst_sym, edits)
-
-    # --- update symbol's Footprint property (e.g. ".:C_0402" → "Resistors_KSL:C_0402") ---
-    _update_symbol_footprint_refs(dst_sym, target_lib)
-
-    # --- update 3D model paths in .kicad_mod files ---
-    if dst_3d is not None:
-        _update_footprint_3d_paths(dst_pretty, target_lib, target_lib + ".3dshapes")
+    dst_pretty = lib_dir / f"{target_lib}.pretty"
+    has_3d = src_3d.is_dir()
+
+    # --- symbol: edits + footprint refs applied in memory, written once ---
+    incoming = _load_incoming(src_sym, target_lib, edits)
+
+    # The workspace lock keeps the duplicate check true until record();
+    # repository.json is read and rewritten in the transaction.
+    with locks.hold(workspace):
+        keys = _check_duplicates(workspace, target_lib, lcsc, incoming, allow_duplicates)
+        with journal.transaction(workspace, "commit") as tx:
+            tx.write(lib_dir / f"{target_lib}.kicad_sym", incoming.to_sexpr())
+            tx.delete(src_sym)
+
+            # --- move .pretty footprint dir and .3dshapes dir (optional) ---
+            if not has_3d:
+                tx.move(src_pretty, dst_pretty)
+            else:
+                # the footprints are counted as the staged copies below
+                tx.rename(src_pretty, dst_pretty)
+                tx.move(src_3d, lib_dir / f"{target_lib}.3dshapes")
+                # --- 3D model paths are rewritten in staged copies, which
+                #     replace the moved footprints ---
+                for mod_file in src_pretty.glob("*.kicad_mod"):
+                    staged = tx.copy(mod_file, dst_pretty / mod_file.name)
+                    _rewrite_3d_in_kicad_mod(staged, target_lib, target_lib + ".3dshapes")
+
+            # --- generate metadata.json (PCM format), append to repository.json ---
+            _write_metadata(tx, lib_dir, target_lib, has_3d)
+            _append_repository(tx, workspace, target_lib)
+        dup_index.record(lib_dir, keys)
 
     # --- render / copy icon ---
-    try:
-        component_name = SymbolLib().from_file(str(dst_sym)).symbols[0].entryName
-    except Exception:
-        component_name = lcsc
+    component_name = incoming.symbols[0].entryName if incoming.symbols else lcsc
     _copy_or_render_icon(staging_part, lcsc, lib_dir, target_lib, dst_pretty, component_name)
-
-    # --- generate metadata.json (PCM format) ---
-    _write_metadata(lib_dir, target_lib, has_3d=dst_3d is not None)
-
-    # --- append to repository.json ---
-    _append_repository(workspace, target_lib)
+    return tx.transferred
 
 
 # ---------------------------------------------------------------------------
@@ -144,73 +303,293 @@ def _merge_into(
     lib_dir: Path,
     target_lib: str,
     edits: dict,
-) -> None:
+    allow_duplicates: bool,
+    consume_staging: bool,
+) -> dict:
     dst_sym = lib_dir / f"{target_lib}.kicad_sym"
     dst_pretty = lib_dir / f"{target_lib}.pretty"
 
-    # --- merge symbol via kiutils ---
+    # --- incoming symbol: edits + footprint refs in memory, then one
+    #     append before the destination's closing paren ---
     src_sym = staging_part / f"{lcsc}.kicad_sym"
-    existing_lib = SymbolLib().from_file(str(dst_sym))
-    new_lib = SymbolLib().from_file(str(src_sym))
-    for sym in new_lib.symbols:
-        existing_lib.symbols.append(sym)
-    existing_lib.to_file(str(dst_sym))
+    incoming = _load_incoming(src_sym, target_lib, edits)
+
+    # the workspace lock keeps the duplicate check true until record()
+    with locks.hold(workspace):
+        keys = _check_duplicates(workspace, target_lib, lcsc, incoming, allow_duplicates)
+        with journal.transaction(workspace, "commit") as tx:
+            _append_symbols(tx, dst_sym, incoming.symbols)
+            # --- copy footprints and 3D models into the existing dirs ---
+            _copy_part_assets(tx, staging_part, lcsc, lib_dir, target_lib, consume_staging)
+            if consume_staging:
+                tx.delete(src_sym)
+        dup_index.record(lib_dir, keys)
+
+    # --- render / copy icon (the newly merged symbol is the last one) ---
+    component_name = incoming.symbols[-1].entryName if incoming.symbols else lcsc
+    _copy_or_render_icon(staging_part, lcsc, lib_dir, target_lib, dst_pretty, component_name)
 
-    # --- copy .kicad_mod files into existing .pretty dir ---
-    src_pretty = staging_part / f"{lcsc}.pretty"
-    dst_pretty.mkdir(exist_ok=True)
-    for mod_file in src_pretty.glob("*.kicad_mod"):
-        shutil.copy2(str(mod_file), dst_pretty / mod_file.name)
+    # NOTE: repository.json is NOT re-appended on merge.
+    return tx.transferred
 
-    # --- copy 3D models if staging has them ---
-    src_3d = staging_part / f"{lcsc}.3dshapes"
-    if src_3d.is_dir():
-        dst_3d = lib_dir / f"{target_lib}.3dshapes"
-        dst_3d.mkdir(exist_ok=True)
-        for model_file in src_3d.iterdir():
-            shutil.copy2(str(model_file), dst_3d / model_file.name)
-        _update_footprint_3d_paths(dst_pretty, target_lib, target_lib + ".3dshapes")
 
-    # --- apply edits to the (now merged) sym file ---
-    if edits:
-        write_properties(dst_sym, edits)
+# ---------------------------------------------------------------------------
+# BATCH path
+# ---------------------------------------------------------------------------
 
-    # --- update footprint refs ---
-    _update_symbol_footprint_refs(dst_sym, target_lib)
+def _commit_group(
+    workspace: Path,
+    target_lib: str,
+    parts: list[dict],
+    pool: ThreadPoolExecutor,
+    allow_duplicates: bool,
+    consume_staging: bool,
+    transferred: dict,
+) -> tuple[list[dict], bool]:
+    """Commit every part in *parts* to *target_lib*.
+
+    Returns one result per part, in the order of *parts* (an LCSC may
+    appear more than once), and whether the library was created; the
+    bytes its files brought in are added to *transferred*.
+    Duplicates fail on their own; the library's writes form one
+    transaction, so an error leaves it as it was and fails all of the
+    group's other parts.
+    """
+    lib_dir = workspace / target_lib
+    # keyed by position in *parts*
+    results: dict[int, dict] = {}
+    prepared = []
+    for i, part in enumerate(parts):
+        lcsc = part["lcsc"]
+        try:
+            incoming = _load_incoming(
+                part["staging_part"] / f"{lcsc}.kicad_sym", target_lib, part.get("edits", {})
+            )
+        except Exception as exc:
+            results[i] = {"lcsc": lcsc, "target_lib": target_lib, "ok": False, "error": str(exc)}
+        else:
+            prepared.append((i, part, incoming))
+
+    # the workspace lock keeps the duplicate checks true until record()
+    with locks.hold(lib_dir), locks.hold(workspace):
+        is_new = not lib_dir.exists()
+        accepted, keys = [], []
+        for i, part, incoming in prepared:
+            try:
+                part_keys = _check_duplicates(
+                    workspace, target_lib, part["lcsc"], incoming, allow_duplicates, keys
+                )
+            except dup_index.DuplicateComponentError as exc:
+                results[i] = {
+                    "lcsc": part["lcsc"], "target_lib": target_lib, "ok": False, "error": str(exc),
+                }
+            else:
+                accepted.append((i, part, incoming))
+                keys.extend(part_keys)
+        prepared = accepted
+        try:
+            if prepared:
+                counts = _write_group(
+                    workspace, lib_dir, target_lib,
+                    [(part, incoming) for _, part, incoming in prepared],
+                    is_new, consume_staging,
+                )
+                dup_index.record(lib_dir, keys)
+                for way, size in counts.items():
+                    transferred[way] += size
+        except Exception as exc:
+            log.warning("commit_many: writing %s failed: %s", target_lib, exc)
+            for i, part, _ in prepared:
+                results[i] = {
+                    "lcsc": part["lcsc"], "target_lib": target_lib, "ok": False, "error": str(exc),
+                }
+            prepared = []
 
-    # --- render / copy icon ---
-    try:
-        # The newly merged symbol is the last one in the file
-        merged_lib = SymbolLib().from_file(str(dst_sym))
-        component_name = merged_lib.symbols[-1].entryName
-    except Exception:
-        component_name = lcsc
-    _copy_or_render_icon(staging_part, lcsc, lib_dir, target_lib, dst_pretty, component_name)
+    dst_pretty = lib_dir / f"{target_lib}.pretty"
+    icon_jobs = []
+    for i, part, incoming in prepared:
+        lcsc = part["lcsc"]
+        component_name = incoming.symbols[0].entryName if incoming.symbols else lcsc
+        icon_jobs.append(pool.submit(
+            _copy_or_render_icon,
+            part["staging_part"], lcsc, lib_dir, target_lib, dst_pretty, component_name,
+        ))
+        results[i] = {
+            "lcsc": lcsc, "target_lib": target_lib, "ok": True, "component_name": component_name,
+        }
+    for job in icon_jobs:
+        job.result()  # best-effort: never raises
+
+    return [results[i] for i in range(len(parts))], is_new
+
+
+def _write_group(
+    workspace: Path,
+    lib_dir: Path,
+    target_lib: str,
+    prepared: list[tuple[dict, SymbolLib]],
+    is_new: bool,
+    consume_staging: bool,
+) -> dict:
+    """Write the parsed parts of one :func:`_commit_group` as one transaction.
 
-    # NOTE: repository.json is NOT re-appended on merge.
+    Returns the transaction's ``transferred`` byte counts.
+    """
+    with journal.transaction(workspace, "commit_many") as tx:
+        symbols = [sym for _, incoming in prepared for sym in incoming.symbols]
+        dst_sym = lib_dir / f"{target_lib}.kicad_sym"
+        if is_new:
+            # The first part's header (version, generator) heads the new file.
+            lib = prepared[0][1]
+            lib.symbols = symbols
+            tx.write(dst_sym, lib.to_sexpr())
+        else:
+            _append_symbols(tx, dst_sym, symbols)
+
+        has_3d = False
+        for part, _ in prepared:
+            has_3d |= _copy_part_assets(
+                tx, part["staging_part"], part["lcsc"], lib_dir, target_lib, consume_staging
+            )
+            if consume_staging:
+                tx.delete(part["staging_part"] / f"{part['lcsc']}.kicad_sym")
+        if is_new:
+            _write_metadata(tx, lib_dir, target_lib, has_3d)
+    return tx.transferred
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _update_symbol_footprint_refs(sym_path: Path, target_lib: str) -> None:
-    """Rewrite Footprint property values like ``".:Foo"`` → ``"<target_lib>:Foo"``.
+def _load_incoming(src_sym: Path, target_lib: str, edits: dict) -> SymbolLib:
+    """Parse the staged symbol file and prepare it for *target_lib*.
 
+    *edits* go to the first symbol (the part being committed) and every
+    Footprint property like ``".:Foo"`` becomes ``"<target_lib>:Foo"``.
     kiutils stores property values as plain strings, so we update them
-    directly.  We use kiutils so that the write round-trips cleanly.
+    directly; serialising through kiutils keeps the output round-trippable.
     """
-    lib = SymbolLib().from_file(str(sym_path))
-    changed = False
+    lib = SymbolLib().from_file(str(src_sym))
+    if lib.symbols and edits:
+        apply_properties(lib.symbols[0], edits)
     for sym in lib.symbols:
         for prop in sym.properties:
             if prop.key == "Footprint" and prop.value:
-                new_val = _rewrite_footprint_ref(prop.value, target_lib)
-                if new_val != prop.value:
-                    prop.value = new_val
-                    changed = True
-    if changed:
-        lib.to_file(str(sym_path))
+                prop.value = _rewrite_footprint_ref(prop.value, target_lib)
+    return lib
+
+
+def _check_duplicates(
+    workspace: Path,
+    target_lib: str,
+    lcsc: str,
+    incoming: SymbolLib,
+    allow_duplicates: bool,
+    pending: Iterable[tuple[str, str | None]] = (),
+) -> list[tuple[str, str | None]]:
+    """Raise :class:`dup_index.DuplicateComponentError` if *incoming* is
+    already in the workspace, or among *pending* — ``(name, lcsc)`` pairs
+    about to be written to *target_lib* alongside it.
+
+    Returns the incoming symbols' ``(name, lcsc)`` pairs for
+    :func:`dup_index.record`.
+    """
+    keys = [
+        (sym.entryName, dup_index.symbol_lcsc({p.key: p.value for p in sym.properties}))
+        for sym in incoming.symbols
+    ]
+    names = {name for name, _ in keys}
+    lcscs = {lcsc.upper()} | {value for _, value in keys if value}
+    matches = dup_index.find(workspace, names, lcscs)
+    for name, value in pending:
+        if name in names:
+            matches.append({"kind": "name", "value": name, "library": target_lib, "component": name})
+        if value in lcscs:
+            matches.append({"kind": "lcsc", "value": value, "library": target_lib, "component": name})
+
+    blocking = [
+        m for m in matches
+        if not allow_duplicates or (m["kind"] == "name" and m["library"] == target_lib)
+    ]
+    if blocking:
+        found = ", ".join(
+            f"{m['library']}:{m['component']} (same {'name' if m['kind'] == 'name' else 'LCSC'})"
+            for m in blocking
+        )
+        raise dup_index.DuplicateComponentError(f"{lcsc} is already in the workspace: {found}", blocking)
+    if matches:
+        log.info("commit: %s duplicates %d existing symbol(s), allowed", lcsc, len(matches))
+    return keys
+
+
+def _append_symbols(tx: journal.Transaction, sym_path: Path, symbols: list) -> None:
+    """Insert *symbols* before the closing paren of the library at *sym_path*.
+
+    Only the file's tail is rewritten, as one journal splice: the text
+    goes where the final ``)`` was and a new ``)`` closes the file.
+    """
+    if not symbols:
+        return
+    text = "".join(sym.to_sexpr() for sym in symbols).encode("utf-8")
+    with open(sym_path, "rb") as fh:
+        size = fh.seek(0, os.SEEK_END)
+        tail_start = max(0, size - 4096)
+        fh.seek(tail_start)
+        tail = fh.read()
+    close = tail.rfind(b")")
+    if close < 0:
+        raise ValueError(f"{sym_path} is not a KiCad symbol library")
+    if not tail[:close].rstrip(b" \t").endswith(b"\n"):
+        text = b"\n" + text
+    tx.splice(sym_path, tail_start + close, text + b")\n")
+
+
+def _copy_part_assets(
+    tx: journal.Transaction,
+    staging_part: Path,
+    lcsc: str,
+    lib_dir: Path,
+    target_lib: str,
+    consume_staging: bool = False,
+) -> bool:
+    """Bring a staged part's footprints and 3D models into *lib_dir* as part of *tx*.
+
+    With *consume_staging* the staged files are moved; otherwise footprints
+    are cloned — they get edited in place (3D paths, offsets), so never
+    hard-linked — and 3D models, which are only ever replaced, linked.
+    Returns True if the part had 3D models.
+    """
+    src_pretty = staging_part / f"{lcsc}.pretty"
+    dst_pretty = lib_dir / f"{target_lib}.pretty"
+    src_3d = staging_part / f"{lcsc}.3dshapes"
+    has_3d = src_3d.is_dir()
+
+    staged_mods = []
+    for mod_file in src_pretty.glob("*.kicad_mod"):
+        dst = dst_pretty / mod_file.name
+        if has_3d:
+            staged_mods.append(tx.copy(mod_file, dst))  # rewritten below
+            if consume_staging:
+                tx.delete(mod_file)
+        elif consume_staging:
+            tx.move(mod_file, dst)
+        else:
+            tx.copy(mod_file, dst)
+
+    if not has_3d:
+        return False
+    dst_3d = lib_dir / f"{target_lib}.3dshapes"
+    for model_file in src_3d.iterdir():
+        if consume_staging:
+            tx.move(model_file, dst_3d / model_file.name)
+        else:
+            tx.link(model_file, dst_3d / model_file.name)
+    # Only the footprints being added can still carry staging-relative
+    # model paths; the library's existing ones were rewritten on commit.
+    for staged in staged_mods:
+        _rewrite_3d_in_kicad_mod(staged, target_lib, target_lib + ".3dshapes")
+    return True
 
 
 def _rewrite_footprint_ref(value: str, target_lib: str) -> str:
@@ -229,28 +608,6 @@ def _rewrite_footprint_ref(value: str, target_lib: str) -> str:
     return value
 
 
-def _update_footprint_3d_paths(
-    pretty_dir: Path,
-    target_lib: str,
-    shapes_dir_name: str,
-) -> None:
-    """Rewrite 3D model paths inside each ``.kicad_mod`` file.
-
-    Uses kiutils ``Footprint`` / ``Model`` to update paths cleanly for
-    footprints that parse correctly.  Falls back to a regex line-rewrite
-    for files that kiutils cannot parse (e.g. bare-token paths without
-    the full offset/scale/rotate sub-expressions).
-
-    The resulting paths follow the ``${KSL_ROOT}/<target_lib>/<shapes_dir_name>/<file>``
-    convention.
-    """
-    if not pretty_dir.is_dir():
-        return
-
-    for mod_path in pretty_dir.glob("*.kicad_mod"):
-        _rewrite_3d_in_kicad_mod(mod_path, target_lib, shapes_dir_name)
-
-
 def _rewrite_3d_in_kicad_mod(
     mod_path: Path,
     target_lib: str,
@@ -258,7 +615,10 @@ def _rewrite_3d_in_kicad_mod(
 ) -> None:
     """Update 3D model paths in a single ``.kicad_mod`` file.
 
-    Tries kiutils first; falls back to regex line rewriting.
+    Tries kiutils first; falls back to regex line rewriting for files
+    kiutils cannot parse (e.g. bare-token paths without the full
+    offset/scale/rotate sub-expressions).  The resulting paths follow the
+    ``${KSL_ROOT}/<target_lib>/<shapes_dir_name>/<file>`` convention.
     """
     try:
         from kiutils.footprint import Footprint
@@ -338,7 +698,7 @@ def _copy_or_render_icon(
         log.warning("Icon copy/render failed for %s (non-fatal): %s", component_name, exc)
 
 
-def _write_metadata(lib_dir: Path, target_lib: str, has_3d: bool) -> None:
+def _write_metadata(tx: journal.Transaction, lib_dir: Path, target_lib: str, has_3d: bool) -> None:
     """Write a PCM-format ``metadata.json`` for the library."""
     meta = {
         "$schema": "https://go.kicad.org/pcm/schemas/v1",
@@ -358,15 +718,18 @@ def _write_metadata(lib_dir: Path, target_lib: str, has_3d: bool) -> None:
             {"version": "1.0.0", "status": "stable", "kicad_version": "9.0"}
         ],
     }
-    (lib_dir / "metadata.json").write_text(json.dumps(meta, indent=2))
+    tx.write(lib_dir / "metadata.json", json.dumps(meta, indent=2))
 
 
-def _append_repository(workspace: Path, target_lib: str) -> None:
-    """Append ``{"path": "<target_lib>/metadata.json"}`` to ``repository.json``."""
+def _append_repository(tx: journal.Transaction, workspace: Path, *target_libs: str) -> None:
+    """Append ``{"path": "<target_lib>/metadata.json"}`` to ``repository.json``
+    for each of *target_libs*, in one write."""
     repo_path = workspace / "repository.json"
     if repo_path.is_file():
         repo = json.loads(repo_path.read_text())
     else:
         repo = {"packages": []}
-    repo.setdefault("packages", []).append({"path": f"{target_lib}/metadata.json"})
-    repo_path.write_text(json.dumps(repo, indent=2))
+    packages = repo.setdefault("packages", [])
+    for target_lib in target_libs:
+        packages.append({"path": f"{target_lib}/metadata.json"})
+    tx.write(repo_path, json.dumps(repo, indent=2))
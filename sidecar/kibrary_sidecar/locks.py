@@ -0,0 +1,144 @@
+"""locks.py — per-library write locks.
+
+Sync RPC handlers run on several threads, so two ``library.commit`` calls
+for the same library could interleave their read-modify-write of
+``<lib>.kicad_sym`` and lose a symbol.  Every library mutation holds the
+library's write lock for its read-modify-write:
+
+* in-process, a re-entrant lock per directory, so writes to one library
+  serialise while different libraries commit in parallel;
+* across processes (a second app instance, a script), an advisory lock on
+  ``<user cache>/kibrary/locks/<hash of the path>.lock`` — ``flock`` on
+  POSIX, ``msvcrt.locking`` on Windows — taken by the outermost holder.
+  The lock files live outside the workspace so they never show up in its
+  git status.
+
+``repository.json`` is shared by all libraries; it is guarded by the
+workspace directory's lock.
+
+Lock order, to rule out deadlocks: take every library lock an operation
+needs in one :func:`hold` call (they are acquired in sorted order), and
+the workspace lock last, on its own, never taking a library lock while
+holding it.
+
+Public API
+----------
+hold(*dirs)  → context manager holding the write lock of each directory
+               (a library directory, or a workspace for repository.json)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+from kibrary_sidecar import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class _DirLock:
+    """A re-entrant in-process lock plus the file lock of its outermost holder."""
+
+    __slots__ = ("rlock", "depth", "fh")
+
+    def __init__(self) -> None:
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fh = None
+
+
+_locks: dict[str, _DirLock] = {}
+_locks_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def hold(*dirs: Path) -> Iterator[None]:
+    """Hold the write lock of each of *dirs* for the duration of the block.
+
+    Re-entrant: a thread already holding a lock may take it again.
+    """
+    keys = sorted({_key(d) for d in dirs})
+    with contextlib.ExitStack() as stack:
+        for key in keys:
+            stack.enter_context(_acquire(key))
+        yield
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+def _key(path: Path) -> str:
+    return os.path.normcase(str(Path(path).resolve()))
+
+
+@contextlib.contextmanager
+def _acquire(key: str) -> Iterator[None]:
+    with _locks_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = _DirLock()
+    with lock.rlock:
+        if lock.depth == 0:
+            lock.fh = _lock_file(key)
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0:
+                _unlock_file(lock.fh)
+                lock.fh = None
+
+
+def _lock_path(key: str) -> Path:
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return settings.user_cache_root() / "kibrary" / "locks" / f"{digest}.lock"
+
+
+def _lock_file(key: str):
+    path = _lock_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fh = open(path, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            while True:
+                try:
+                    # LK_LOCK itself retries for ~10 s before giving up
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as exc:
+                    if exc.errno != errno.EDEADLOCK:
+                        raise
+    except BaseException:
+        fh.close()
+        raise
+    return fh
+
+
+def _unlock_file(fh) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        fh.close()
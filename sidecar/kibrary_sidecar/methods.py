@@ -6,39 +6,81 @@ from pathlib import Path
 log = logging.getLogger(__name__)
 
 from kibrary_sidecar import __version__
-from kibrary_sidecar import workspace as ws
-from kibrary_sidecar import settings as st
-from kibrary_sidecar import parser as parsemod
-from kibrary_sidecar import staging
-from kibrary_sidecar import symfile
-from kibrary_sidecar import category_map
-from kibrary_sidecar import library
-from kibrary_sidecar import git_ops
-from kibrary_sidecar import git_undo
-from kibrary_sidecar import search_client
-from kibrary_sidecar import files
-from kibrary_sidecar import kicad_install
-from kibrary_sidecar import kicad_register
-from kibrary_sidecar import editor as kicad_editor
-from kibrary_sidecar import lib_scanner
-from kibrary_sidecar import lib_ops
-from kibrary_sidecar import sexpr_diff
-from kibrary_sidecar import model3d_ops
-from kibrary_sidecar import bootstrap
-from kibrary_sidecar import secrets
-from kibrary_sidecar import icons as icons_mod
+from kibrary_sidecar import cancellation
+from kibrary_sidecar import blobs
+from kibrary_sidecar import lazy
+from kibrary_sidecar import streaming
+from kibrary_sidecar import metrics
+from kibrary_sidecar import prewarm
+from kibrary_sidecar import profiling
+
+# Subsystems are imported on a handler's first use (see lazy.py) so the
+# sidecar can answer system.ping without loading GitPython, kiutils, httpx
+# or keyring first.
+ws = lazy.module("kibrary_sidecar.workspace")
+st = lazy.module("kibrary_sidecar.settings")
+parsemod = lazy.module("kibrary_sidecar.parser")
+staging = lazy.module("kibrary_sidecar.staging")
+symfile = lazy.module("kibrary_sidecar.symfile")
+category_map = lazy.module("kibrary_sidecar.category_map")
+library = lazy.module("kibrary_sidecar.library")
+git_ops = lazy.module("kibrary_sidecar.git_ops")
+git_undo = lazy.module("kibrary_sidecar.git_undo")
+search_client = lazy.module("kibrary_sidecar.search_client")
+files = lazy.module("kibrary_sidecar.files")
+kicad_install = lazy.module("kibrary_sidecar.kicad_install")
+kicad_register = lazy.module("kibrary_sidecar.kicad_register")
+kicad_editor = lazy.module("kibrary_sidecar.editor")
+lib_scanner = lazy.module("kibrary_sidecar.lib_scanner")
+dup_index = lazy.module("kibrary_sidecar.dup_index")
+lib_ops = lazy.module("kibrary_sidecar.lib_ops")
+sexpr_diff = lazy.module("kibrary_sidecar.sexpr_diff")
+model3d_ops = lazy.module("kibrary_sidecar.model3d_ops")
+bootstrap = lazy.module("kibrary_sidecar.bootstrap")
+secrets = lazy.module("kibrary_sidecar.secrets")
+icons_mod = lazy.module("kibrary_sidecar.icons")
 
 
 def system_ping(_: dict) -> dict:
     return {"pong": True}
 
 
+def system_metrics(p: dict) -> dict:
+    """Per-method RPC timing counters (see ``metrics.snapshot``).
+    ``reset: true`` clears them after reading."""
+    snap = metrics.snapshot()
+    if p.get("reset"):
+        metrics.reset()
+    return snap
+
+
+def system_profile_start(p: dict) -> dict:
+    """Start profiling handler calls; output goes to
+    ``<workspace>/.kibrary/cache/profiles/``.  ``mode`` is ``"sample"``
+    (default, collapsed stacks) or ``"cprofile"`` (pstats)."""
+    return profiling.start(
+        Path(p["workspace"]),
+        mode=p.get("mode", "sample"),
+        interval_ms=p.get("interval_ms", profiling.DEFAULT_INTERVAL_MS),
+    )
+
+
+def system_profile_stop(_: dict) -> dict:
+    """Stop profiling and return ``{path, ...}`` of the written profile."""
+    result = profiling.stop()
+    if result is None:
+        raise RuntimeError("No profiling session is running")
+    return result
+
+
 def system_version(_: dict) -> dict:
     return {"version": __version__}
 
 
 def workspace_open(p: dict) -> dict:
-    return ws.open_workspace(p["root"])
+    result = ws.open_workspace(p["root"])
+    prewarm.workspace_opened(result["root"])
+    return result
 
 
 def workspace_settings(p: dict) -> dict:
@@ -82,6 +124,14 @@ def parts_write_props(p: dict) -> dict:
 
 
 def parts_read_file(p: dict) -> dict:
+    """Return a staged part file's text, or with ``as_file`` just its path.
+
+    ``as_file`` keeps multi-megabyte STEP models off the RPC pipe: the file
+    is already on disk, so the shell can serve it to the webview directly.
+    """
+    if p.get("as_file"):
+        path = files.part_file_path(Path(p["staging_dir"]), p["lcsc"], p["kind"])
+        return {"path": str(path), "size": path.stat().st_size}
     content = files.read_part_file(Path(p["staging_dir"]), p["lcsc"], p["kind"])
     return {"content": content}
 
@@ -151,6 +201,12 @@ def library_suggest(p: dict) -> dict:
 def library_commit(p: dict) -> dict:
     """Commit a staged part to a target library, then optionally git-commit
     the change per the workspace's git settings.
+
+    A part already in the workspace fails with a "already in the workspace"
+    error unless ``allow_duplicates`` is true (see :mod:`dup_index`).
+    ``consume_staging: true`` lets the staged files be moved into the
+    library instead of copied; the result reports the bytes copied and
+    linked either way.
     """
     workspace = Path(p["workspace"])
     lcsc = p["lcsc"]
@@ -158,8 +214,12 @@ def library_commit(p: dict) -> dict:
     target_lib = p["target_lib"]
     edits = p.get("edits", {})
 
+    transferred: dict = {}
     committed_path = library.commit_to_library(
-        workspace, lcsc, staging_part, target_lib, edits
+        workspace, lcsc, staging_part, target_lib, edits,
+        allow_duplicates=bool(p.get("allow_duplicates")),
+        consume_staging=bool(p.get("consume_staging")),
+        transferred=transferred,
     )
 
     settings_data = ws.read_workspace_settings(str(workspace))
@@ -180,7 +240,107 @@ def library_commit(p: dict) -> dict:
         ]
         sha = git_ops.auto_commit(workspace, message, paths_to_stage, enabled=True)
 
-    return {"committed_path": str(committed_path), "git_sha": sha}
+    return {
+        "committed_path": str(committed_path),
+        "git_sha": sha,
+        "bytes_copied": transferred.get("copied", 0),
+        "bytes_linked": transferred.get("linked", 0),
+    }
+
+
+def library_commit_many(p: dict) -> dict | streaming.Stream:
+    """Commit several staged parts in one call.
+
+    ``parts`` is a list of ``{lcsc, target_lib, edits?}``, all staged under
+    ``staging_dir``.  Each target library is written once (see
+    :func:`library.iter_commit_many`) and, per the workspace's git
+    settings, the batch becomes one commit — or one per library with
+    ``git_commit: "per_library"``.  ``stream: true`` sends each part's
+    result as a one-item ``stream.chunk`` as its library completes;
+    otherwise they come back together as ``results``.  Duplicates fail
+    per part, as in ``library.commit``, unless ``allow_duplicates``;
+    ``consume_staging`` works as there too.
+    """
+    workspace = Path(p["workspace"])
+    staging_dir = Path(p["staging_dir"])
+    parts = [
+        {
+            "lcsc": part["lcsc"],
+            "staging_part": staging_dir / part["lcsc"],
+            "target_lib": part["target_lib"],
+            "edits": part.get("edits", {}),
+        }
+        for part in p["parts"]
+    ]
+    per_library = p.get("git_commit") == "per_library"
+    allow_duplicates = bool(p.get("allow_duplicates"))
+    consume_staging = bool(p.get("consume_staging"))
+
+    def run():
+        summary: dict = {}
+        try:
+            yield from library.iter_commit_many(
+                workspace, parts, allow_duplicates, consume_staging, summary
+            )
+        finally:
+            # Also on cancellation: libraries already written get their
+            # commit now rather than riding along in an unrelated one.
+            summary["git_shas"] = _git_commit_batch(
+                workspace, summary.get("libraries", {}), per_library
+            )
+        return summary
+
+    if p.get("stream"):
+        return streaming.Stream(streaming.singles(run()))
+    results = []
+    gen = run()
+    while True:
+        try:
+            results.append(next(gen))
+        except StopIteration as stop:
+            return {**stop.value, "results": results}
+
+
+def library_find_duplicates(p: dict) -> dict:
+    """Look symbol names and/or LCSC numbers up across every library of the
+    workspace, e.g. to warn before a commit that would be rejected."""
+    duplicates = dup_index.find(
+        Path(p["workspace"]), p.get("names") or [], p.get("lcscs") or []
+    )
+    return {"duplicates": duplicates}
+
+
+def _git_commit_batch(workspace: Path, libraries: dict, per_library: bool) -> list[str]:
+    """Auto-commit a :func:`library_commit_many` batch; returns the new SHAs."""
+    settings_data = ws.read_workspace_settings(str(workspace))
+    git_cfg = settings_data.get("git", {}) if settings_data else {}
+    if not libraries or not (git_cfg.get("enabled") and git_cfg.get("auto_commit")):
+        return []
+    template = git_cfg.get("commit_template", "Add {lcsc} ({description}) to {library}")
+
+    def message(parts: list[dict], target: str) -> str:
+        if len(parts) == 1:
+            part = parts[0]
+            return template.format(lcsc=part["lcsc"], description=part["description"], library=part["library"])
+        body = "\n".join(f"- {part['lcsc']} ({part['description']}) to {part['library']}" for part in parts)
+        return f"Add {len(parts)} parts to {target}\n\n{body}"
+
+    tagged = {
+        lib: [{**part, "library": lib} for part in info["parts"]]
+        for lib, info in libraries.items()
+    }
+    if per_library:
+        commits = [(message(parts, lib), [lib]) for lib, parts in tagged.items()]
+        # repository.json goes with the first library it lists
+        first_new = next((i for i, info in enumerate(libraries.values()) if info["new"]), None)
+        if first_new is not None:
+            commits[first_new][1].append("repository.json")
+    else:
+        all_parts = [part for parts in tagged.values() for part in parts]
+        target = next(iter(libraries)) if len(libraries) == 1 else f"{len(libraries)} libraries"
+        commits = [(message(all_parts, target), [*libraries, "repository.json"])]
+    shas = git_ops.auto_commit_many(workspace, commits, enabled=True)
+    return [sha for sha in shas if sha]
 
 
 def git_init(p: dict) -> dict:
@@ -267,12 +427,30 @@ def editor_open(p: dict) -> dict:
     return kicad_editor.open_editor(install, kind, file_path)
 
 
-def library_list(p: dict) -> dict:
-    return {"libraries": lib_scanner.list_libraries(Path(p["workspace"]))}
+def library_list(p: dict) -> dict | streaming.Stream:
+    """List workspace libraries.  ``fast: true`` skips refreshing the library
+    index and only counts symbols — callers render that first, then issue a
+    normal call to fill in the details.  ``stream: true`` sends the list as
+    ``stream.chunk`` pages."""
+    workspace = Path(p["workspace"])
+    if p.get("fast"):
+        libraries = lib_scanner.list_libraries(workspace, fast=True)
+    else:
+        workers = ws.scan_workers(p["workspace"])
+        libraries = lib_scanner.list_libraries(workspace, workers=workers)
+    stream, page_size = streaming.wants_stream(p)
+    if stream:
+        return streaming.Stream(streaming.paged(libraries, page_size))
+    return {"libraries": libraries}
 
 
-def library_list_components(p: dict) -> dict:
-    return {"components": lib_scanner.list_components(Path(p["lib_dir"]))}
+def library_list_components(p: dict) -> dict | streaming.Stream:
+    lib_dir = Path(p["lib_dir"])
+    stream, page_size = streaming.wants_stream(p)
+    if stream:
+        # pages go out while a stale library is still being scanned
+        return streaming.Stream(streaming.paged(lib_scanner.iter_components(lib_dir), page_size))
+    return {"components": lib_scanner.list_components(lib_dir)}
 
 
 def library_get_component(p: dict) -> dict:
@@ -373,11 +551,14 @@ def _search_settings() -> tuple[str, str]:
 
 def search_query(p: dict) -> dict:
     api_key, base_url = _search_settings()
+    # A newer keystroke may already have superseded this query.
+    cancellation.check()
     return search_client.search(p["q"], api_key=api_key, base_url=base_url)
 
 
 def search_get_part(p: dict) -> dict:
     api_key, base_url = _search_settings()
+    cancellation.check()
     part = search_client.get_part(p["lcsc"], api_key=api_key, base_url=base_url)
     return {"part": part}
 
@@ -386,7 +567,10 @@ def search_fetch_photo(p: dict) -> dict:
     """Proxy the auth-gated photo fetch through Python (bypasses webview CORS).
 
     See ``search_client.fetch_photo`` for the rationale. Returns either
-    ``{'data_url': 'data:image/...'}`` or ``{'error': '...'}``.
+    ``{'data_url': 'data:image/...'}`` or ``{'error': '...'}``.  With
+    ``as_file`` the photo goes to the blob store (the workspace's
+    ``.kibrary/cache/blobs`` when ``workspace`` is given) and the result
+    carries its ``path`` instead of a data URL.
     """
     api_key, base_url = _search_settings()
     # Diagnostic for the recurring "thumbnails don't load" bug.  An empty
@@ -399,7 +583,13 @@ def search_fetch_photo(p: dict) -> dict:
         file=sys.stderr,
         flush=True,
     )
-    return search_client.fetch_photo(p["lcsc"], api_key=api_key, base_url=base_url)
+    cancellation.check()
+    blob_root = None
+    if p.get("as_file"):
+        blob_root = blobs.store_root(Path(p["workspace"]) if p.get("workspace") else None)
+    return search_client.fetch_photo(
+        p["lcsc"], api_key=api_key, base_url=base_url, blob_root=blob_root
+    )
 
 
 def secrets_get(p: dict) -> dict:
@@ -429,14 +619,23 @@ def library_get_component_icon(p: dict) -> dict:
     return {"svg": icon_path.read_text() if icon_path.is_file() else None}
 
 
-def library_backfill_icons(p: dict) -> dict:
-    """Walk workspace's _KSL libs and render missing icons."""
+def library_backfill_icons(p: dict) -> dict | streaming.Stream:
+    """Walk workspace's _KSL libs and render missing icons.  With
+    ``stream: true`` each library's result is sent as a one-item
+    ``stream.chunk`` as soon as it is done; the totals come last."""
+    if p.get("stream"):
+        return streaming.Stream(
+            streaming.singles(icons_mod.iter_backfill_icons(Path(p["workspace"])))
+        )
     return icons_mod.backfill_icons(Path(p["workspace"]))
 
 
 REGISTRY = {
     "system.ping": system_ping,
     "system.version": system_version,
+    "system.metrics": system_metrics,
+    "system.profile_start": system_profile_start,
+    "system.profile_stop": system_profile_stop,
     "workspace.open": workspace_open,
     "workspace.settings": workspace_settings,
     "workspace.set_settings": workspace_set_settings,
@@ -451,6 +650,8 @@ REGISTRY = {
     "parts.list_dir": parts_list_dir,
     "library.suggest": library_suggest,
     "library.commit": library_commit,
+    "library.commit_many": library_commit_many,
+    "library.find_duplicates": library_find_duplicates,
     "git.init": git_init,
     "git.is_safe": git_is_safe,
     "git.undo_last": git_undo_last,
@@ -0,0 +1,228 @@
+"""metrics.py — per-method request timing for the RPC server.
+
+The RPC server reports every dispatched call here: when it was queued,
+when a worker (or the event loop) picked it up, and how it ended.  From
+that we keep, per method:
+
+    count, errors, cancelled, in_flight
+    latency_ms     — handler run time histogram (start → response)
+    queue_wait_ms  — time spent queued in the worker pool before running
+
+``system.metrics`` returns :func:`snapshot`.  Setting
+``KIBRARY_SIDECAR_METRICS_FILE`` additionally appends a snapshot line to
+that JSONL file every ``KIBRARY_SIDECAR_METRICS_INTERVAL`` seconds
+(default 60) and once more on shutdown, so regressions on big workspaces
+can be read off a user's machine after the fact.
+
+Public API
+----------
+queued(method)        → Call; then ``call.start()`` and ``call.finish(outcome)``
+snapshot()            → dict of all counters (see module docstring)
+in_flight()           → number of calls running right now
+reset()               → clear all counters
+start_dumper()        → background JSONL dumper if configured, else None
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds; a final overflow bucket
+# catches everything slower.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_FILE_ENV = "KIBRARY_SIDECAR_METRICS_FILE"
+_INTERVAL_ENV = "KIBRARY_SIDECAR_METRICS_INTERVAL"
+
+_lock = threading.Lock()
+_methods: dict[str, dict] = {}
+_started_at = time.time()
+
+
+class Call:
+    """Timing handle for one dispatched call."""
+
+    __slots__ = ("method", "queued_at", "started_at")
+
+    def __init__(self, method: str) -> None:
+        self.method = method
+        self.queued_at = time.perf_counter()
+        self.started_at: float | None = None
+
+    def start(self) -> None:
+        """Mark the handler as running; records the queue wait."""
+        self.started_at = time.perf_counter()
+        wait_ms = (self.started_at - self.queued_at) * 1000
+        with _lock:
+            stats = _stats(self.method)
+            _observe(stats["queue_wait_ms"], wait_ms)
+            stats["in_flight"] += 1
+
+    def finish(self, outcome: str) -> None:
+        """Record the end of the call; *outcome* is ok / error / cancelled."""
+        now = time.perf_counter()
+        with _lock:
+            stats = _stats(self.method)
+            stats["count"] += 1
+            if outcome == "error":
+                stats["errors"] += 1
+            elif outcome == "cancelled":
+                stats["cancelled"] += 1
+            if self.started_at is None:
+                # Dropped while still queued: it only ever waited
+                _observe(stats["queue_wait_ms"], (now - self.queued_at) * 1000)
+            else:
+                stats["in_flight"] -= 1
+                _observe(stats["latency_ms"], (now - self.started_at) * 1000)
+
+
+def queued(method: str) -> Call:
+    return Call(method)
+
+
+def snapshot() -> dict:
+    """Return all counters as a JSON-ready dict.
+
+    Histograms are reported as ``{count, sum, max, p50, p90, p99, buckets}``
+    where the percentiles are bucket upper bounds capped at ``max`` (an
+    estimate, never an under-estimate) and ``buckets`` maps each non-empty
+    bucket's upper bound (``"inf"`` for the overflow bucket) to its count.
+    """
+    with _lock:
+        methods = {
+            name: {
+                "count": s["count"],
+                "errors": s["errors"],
+                "cancelled": s["cancelled"],
+                "in_flight": s["in_flight"],
+                "latency_ms": _summary(s["latency_ms"]),
+                "queue_wait_ms": _summary(s["queue_wait_ms"]),
+            }
+            for name, s in sorted(_methods.items())
+        }
+    return {
+        "uptime_s": round(time.time() - _started_at, 3),
+        "in_flight": sum(m["in_flight"] for m in methods.values()),
+        "methods": methods,
+    }
+
+
+def in_flight() -> int:
+    """Number of handler calls currently running (cheaper than snapshot())."""
+    with _lock:
+        return sum(s["in_flight"] for s in _methods.values())
+
+
+def reset() -> None:
+    """Clear all counters.  In-flight counts survive: those calls are still
+    running and will report their finish."""
+    with _lock:
+        running = {name: st["in_flight"] for name, st in _methods.items() if st["in_flight"]}
+        _methods.clear()
+        for name, n in running.items():
+            _stats(name)["in_flight"] = n
+
+
+def start_dumper() -> "_Dumper | None":
+    """Start the periodic JSONL dumper if ``KIBRARY_SIDECAR_METRICS_FILE``
+    is set.  The caller stops it with ``.stop()`` on shutdown."""
+    path = os.environ.get(_FILE_ENV)
+    if not path:
+        return None
+    try:
+        interval = float(os.environ.get(_INTERVAL_ENV, "60"))
+    except ValueError:
+        interval = 60.0
+    return _Dumper(Path(path), max(interval, 1.0))
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+class _Dumper:
+    def __init__(self, path: Path, interval: float) -> None:
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.dump()
+
+    def dump(self) -> None:
+        line = json.dumps({"ts": round(time.time(), 3), **snapshot()})
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        except OSError as exc:
+            log.warning("metrics: failed to write %s: %s", self._path, exc)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.dump()
+
+
+def _new_histogram() -> dict:
+    return {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _stats(method: str) -> dict:
+    """Return the counters for *method*, creating them.  Caller holds _lock."""
+    stats = _methods.get(method)
+    if stats is None:
+        stats = _methods[method] = {
+            "count": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "in_flight": 0,
+            "latency_ms": _new_histogram(),
+            "queue_wait_ms": _new_histogram(),
+        }
+    return stats
+
+
+def _observe(hist: dict, value_ms: float) -> None:
+    hist["count"] += 1
+    hist["sum"] += value_ms
+    if value_ms > hist["max"]:
+        hist["max"] = value_ms
+    hist["buckets"][bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+
+
+def _percentile(hist: dict, q: float) -> float | None:
+    if not hist["count"]:
+        return None
+    rank = q * hist["count"]
+    seen = 0
+    for i, n in enumerate(hist["buckets"]):
+        seen += n
+        if seen >= rank and i < len(BUCKETS_MS):
+            return round(min(BUCKETS_MS[i], hist["max"]), 3)
+    return round(hist["max"], 3)
+
+
+def _summary(hist: dict) -> dict:
+    bounds = [str(b) for b in BUCKETS_MS] + ["inf"]
+    return {
+        "count": hist["count"],
+        "sum": round(hist["sum"], 3),
+        "max": round(hist["max"], 3),
+        "p50": _percentile(hist, 0.50),
+        "p90": _percentile(hist, 0.90),
+        "p99": _percentile(hist, 0.99),
+        "buckets": {b: n for b, n in zip(bounds, hist["buckets"]) if n},
+    }
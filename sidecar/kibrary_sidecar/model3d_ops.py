@@ -3,6 +3,9 @@
 Task P13 (P2 plan, Phase 2C — External STEP browse/replace).
 
 Supported 3D model formats: .step, .stp, .wrl, .glb
+
+Both operations hold the library's write lock (:mod:`locks`) while they
+change its ``.3dshapes`` folder and footprint.
 """
 from __future__ import annotations
 
@@ -11,6 +14,8 @@ from pathlib import Path
 
 from kiutils.footprint import Footprint, Model
 
+from kibrary_sidecar import locks
+
 # The ${KSL_ROOT} environment-variable convention used for 3D model paths.
 _KSL_ROOT = "${KSL_ROOT}"
 
@@ -47,26 +52,27 @@ def replace_3d_model(lib_dir: Path, component_name: str, new_step_path: Path) ->
         If the source file's extension is not in the supported set
         (``.step``, ``.stp``, ``.wrl``, ``.glb``).
     """
-    _validate_inputs(lib_dir, new_step_path)
+    with locks.hold(lib_dir):
+        _validate_inputs(lib_dir, new_step_path)
 
-    ext = new_step_path.suffix.lower()
-    lib_name = lib_dir.name
+        ext = new_step_path.suffix.lower()
+        lib_name = lib_dir.name
 
-    # Ensure 3dshapes directory exists.
-    shapes_dir = lib_dir / f"{lib_name}.3dshapes"
-    shapes_dir.mkdir(exist_ok=True)
+        # Ensure 3dshapes directory exists.
+        shapes_dir = lib_dir / f"{lib_name}.3dshapes"
+        shapes_dir.mkdir(exist_ok=True)
 
-    # Remove any existing 3D model files for this component (any extension).
-    _remove_existing_models(shapes_dir, component_name)
+        # Remove any existing 3D model files for this component (any extension).
+        _remove_existing_models(shapes_dir, component_name)
 
-    # Copy the new source file to the destination.
-    dst = shapes_dir / f"{component_name}{ext}"
-    shutil.copy2(str(new_step_path), dst)
+        # Copy the new source file to the destination.
+        dst = shapes_dir / f"{component_name}{ext}"
+        shutil.copy2(str(new_step_path), dst)
 
-    # Update the .kicad_mod model path.
-    _update_kicad_mod(lib_dir, lib_name, component_name, ext)
+        # Update the .kicad_mod model path.
+        _update_kicad_mod(lib_dir, lib_name, component_name, ext)
 
-    return dst
+        return dst
 
 
 def set_3d_offset(
@@ -89,20 +95,21 @@ def set_3d_offset(
     ValueError
         If the footprint has no ``(model ...)`` block to update.
     """
-    pretty = lib_dir / f"{lib_dir.name}.pretty"
-    mod_path = pretty / f"{component_name}.kicad_mod"
-    if not mod_path.exists():
-        raise FileNotFoundError(str(mod_path))
+    with locks.hold(lib_dir):
+        pretty = lib_dir / f"{lib_dir.name}.pretty"
+        mod_path = pretty / f"{component_name}.kicad_mod"
+        if not mod_path.exists():
+            raise FileNotFoundError(str(mod_path))
 
-    fp = Footprint().from_file(str(mod_path))
-    if not fp.models:
-        raise ValueError(f"no 3D model block in {mod_path}")
+        fp = Footprint().from_file(str(mod_path))
+        if not fp.models:
+            raise ValueError(f"no 3D model block in {mod_path}")
 
-    m = fp.models[0]
-    m.pos.X, m.pos.Y, m.pos.Z = offset
-    m.rotate.X, m.rotate.Y, m.rotate.Z = rotation
-    m.scale.X, m.scale.Y, m.scale.Z = scale
-    fp.to_file(str(mod_path))
+        m = fp.models[0]
+        m.pos.X, m.pos.Y, m.pos.Z = offset
+        m.rotate.X, m.rotate.Y, m.rotate.Z = rotation
+        m.scale.X, m.scale.Y, m.scale.Z = scale
+        fp.to_file(str(mod_path))
 
 
 def add_3d_model(lib_dir: Path, component_name: str, src_path: Path) -> Path:
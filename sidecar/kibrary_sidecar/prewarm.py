@@ -0,0 +1,208 @@
+"""prewarm.py — background warm-up after sidecar start-up.
+
+Lazy imports (:mod:`kibrary_sidecar.lazy`) make the first ``system.ping``
+fast, but only by moving the cost onto the first real request: the first
+``library.list`` after opening a workspace would still import kiutils,
+load the category map, look for KiCad installs and parse every stale
+library.  This module pays those costs on a background thread while the
+UI is still drawing:
+
+1. import the heavy handler modules (kiutils, GitPython, httpx, keyring);
+2. load :mod:`category_map` and ``kicad_install.cached_installs()``;
+3. build the shared ``search_client`` HTTP client (SSL context, CA bundle);
+4. finish any library operation a crash cut short (:mod:`journal`), then
+   refresh the library index (:mod:`lib_index`) of the last-opened
+   workspace, one library at a time.
+
+Every step is best-effort — a failure is logged and the next step runs.
+The thread runs at low priority in the only way that matters under the
+GIL: before each step and each library it waits while any RPC call is in
+flight (up to ``_MAX_DEFER_S``), so a user action never queues behind it.
+
+``__main__.main`` calls :func:`start`; ``workspace.open`` calls
+:func:`workspace_opened`, which records the workspace for the next launch
+and queues its pre-scan.  ``KIBRARY_SIDECAR_PREWARM=0`` turns it all off.
+
+Public API
+----------
+start()                  → start the warm-up thread; False if disabled
+workspace_opened(root)   → remember *root* as last-opened, queue its pre-scan
+last_workspace()         → the last-opened workspace Path, or None
+warm_modules()           → steps 1–3, synchronously
+warm_workspace(root)     → step 4 for *root*, synchronously; returns libraries scanned
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from kibrary_sidecar import metrics
+
+log = logging.getLogger(__name__)
+
+HEAVY_MODULES = (
+    "kibrary_sidecar.symfile",       # kiutils
+    "kibrary_sidecar.library",
+    "kibrary_sidecar.lib_scanner",
+    "kibrary_sidecar.lib_ops",
+    "kibrary_sidecar.model3d_ops",
+    "kibrary_sidecar.git_ops",       # GitPython
+    "kibrary_sidecar.search_client", # httpx
+    "kibrary_sidecar.secrets",       # keyring
+)
+
+_ENV = "KIBRARY_SIDECAR_PREWARM"
+
+# Longest a step waits for in-flight RPC calls before running anyway, so a
+# long download does not postpone the warm-up indefinitely.
+_MAX_DEFER_S = 5.0
+_POLL_S = 0.05
+
+_MODULES = object()  # queue item: run warm_modules()
+
+_queue: "queue.SimpleQueue[object]" = queue.SimpleQueue()
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def start() -> bool:
+    """Queue the start-up warm-up (modules, then the last-opened workspace)
+    and start the thread.  Returns False when disabled by the environment."""
+    if not _enabled():
+        return False
+    _queue.put(_MODULES)
+    last = last_workspace()
+    if last is not None:
+        _queue.put(last)
+    _ensure_thread()
+    return True
+
+
+def workspace_opened(root: str | Path) -> None:
+    """Record *root* as the last-opened workspace and queue its pre-scan."""
+    root = Path(root)
+    _remember(root)
+    if _enabled():
+        _queue.put(root)
+        _ensure_thread()
+
+
+def last_workspace() -> Path | None:
+    """The workspace recorded by the last :func:`workspace_opened`, if it
+    still exists."""
+    try:
+        root = json.loads(_state_path().read_text(encoding="utf-8")).get("root")
+    except (OSError, ValueError, AttributeError):
+        return None
+    if not root or not Path(root).is_dir():
+        return None
+    return Path(root)
+
+
+def warm_modules() -> None:
+    for name in HEAVY_MODULES:
+        _yield_to_requests()
+        _step(f"import {name}", importlib.import_module, name)
+
+    from kibrary_sidecar import category_map, kicad_install, search_client
+
+    _yield_to_requests()
+    _step("category_map", category_map.load_map)
+    _yield_to_requests()
+    _step("kicad installs", kicad_install.cached_installs)
+    _yield_to_requests()
+    _step("search client", search_client.warm)
+
+
+def warm_workspace(root: str | Path) -> int:
+    """Bring *root*'s library index up to date; returns how many libraries
+    were checked.  Fresh entries cost one ``stat`` each.
+
+    An operation interrupted by a crash is finished (see :mod:`journal`)
+    first, so the index sees the libraries as they end up."""
+    from kibrary_sidecar import journal, lib_index, lib_scanner
+
+    root = Path(root)
+    _step("journal recovery", journal.recover, root)
+    try:
+        lib_dirs = lib_scanner.library_dirs(root)
+    except OSError as exc:
+        log.warning("prewarm: cannot list %s: %s", root, exc)
+        return 0
+    for lib_dir in lib_dirs:
+        _yield_to_requests()
+        _step(f"index {lib_dir.name}", lib_index.get_library, lib_dir, persist=False)
+    lib_index.flush(root)
+    return len(lib_dirs)
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _enabled() -> bool:
+    return os.environ.get(_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _state_path() -> Path:
+    from kibrary_sidecar import settings
+
+    return settings.settings_path().parent / "last-workspace.json"
+
+
+def _remember(root: Path) -> None:
+    path = _state_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"root": str(root)}), encoding="utf-8")
+    except OSError as exc:
+        log.warning("prewarm: failed to record last workspace: %s", exc)
+
+
+def _ensure_thread() -> None:
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="prewarm", daemon=True)
+            _thread.start()
+
+
+def _run() -> None:
+    while True:
+        item = _queue.get()
+        started = time.perf_counter()
+        if item is _MODULES:
+            warm_modules()
+            log.info("prewarm: modules warm in %.0f ms", (time.perf_counter() - started) * 1000)
+        else:
+            count = warm_workspace(item)
+            log.info(
+                "prewarm: %d libraries of %s indexed in %.0f ms",
+                count, item, (time.perf_counter() - started) * 1000,
+            )
+
+
+def _yield_to_requests() -> None:
+    deadline = time.monotonic() + _MAX_DEFER_S
+    while metrics.in_flight() and time.monotonic() < deadline:
+        time.sleep(_POLL_S)
+
+
+def _step(label: str, fn, *args, **kwargs) -> None:
+    try:
+        fn(*args, **kwargs)
+    except Exception as exc:  # warm-up is an optimisation, never fatal
+        log.warning("prewarm: %s failed: %s", label, exc)
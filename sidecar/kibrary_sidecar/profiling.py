@@ -0,0 +1,214 @@
+"""profiling.py — on-demand profiler for RPC handlers.
+
+``system.profile_start`` / ``system.profile_stop`` wrap every handler that
+runs in between, so hot paths can be captured on a user's own workspace
+without a debug build.  Two modes:
+
+``sample`` (default)
+    A background thread snapshots the stacks of threads that are running
+    a handler every ``interval_ms`` (default 5 ms) via
+    ``sys._current_frames()``.  Overhead is a few percent and independent
+    of how much Python code the handler runs.  Output is a collapsed-stack
+    file (``method;frame;frame;... count`` per line) that flamegraph.pl and
+    speedscope read directly.
+
+``cprofile``
+    Each sync handler call runs under its own ``cProfile.Profile`` and the
+    results are merged into one ``.pstats`` file.  Exact call counts, but
+    much higher overhead.  Async handlers are not instrumented in this mode
+    (their coroutines interleave on one thread).
+
+Files go to ``<workspace>/.kibrary/cache/profiles/``.
+
+Public API
+----------
+start(workspace, mode, interval_ms) → {mode, started}
+stop()                              → {path, mode, ...} (or None if not running)
+handler(method, cprofile=True)      → context manager the RPC server wraps
+                                      around each handler call
+is_active()                         → bool
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterator
+
+MODES = ("sample", "cprofile")
+DEFAULT_INTERVAL_MS = 5.0
+
+_lock = threading.Lock()
+_seq = itertools.count(1)
+_session: "_Session | None" = None
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def start(workspace: Path, mode: str = "sample", interval_ms: float = DEFAULT_INTERVAL_MS) -> dict:
+    """Start profiling handler calls.
+
+    Raises ``ValueError`` for an unknown *mode* and ``RuntimeError`` if a
+    session is already running.
+    """
+    global _session
+    if mode not in MODES:
+        raise ValueError(f"Unsupported profile mode {mode!r}; expected one of {MODES}")
+    out_dir = Path(workspace) / ".kibrary" / "cache" / "profiles"
+    with _lock:
+        if _session is not None:
+            raise RuntimeError("A profiling session is already running")
+        _session = _Session(out_dir, mode, max(float(interval_ms), 0.5) / 1000)
+    return {"mode": mode, "started": True}
+
+
+def stop() -> dict | None:
+    """Stop the running session and write its output file.
+
+    Returns ``{path, mode, duration_s, ...}`` — ``samples`` for sample mode,
+    ``calls`` for cprofile mode — or None if nothing was running.
+    """
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is None:
+        return None
+    return session.finish()
+
+
+def is_active() -> bool:
+    return _session is not None
+
+
+@contextlib.contextmanager
+def handler(method: str, cprofile: bool = True) -> Iterator[None]:
+    """Attribute the enclosed handler call to *method* in the running session.
+
+    A no-op (one global read) when no session is active.
+    """
+    session = _session
+    if session is None:
+        yield
+        return
+    with session.track(method, cprofile):
+        yield
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+class _Session:
+    def __init__(self, out_dir: Path, mode: str, interval: float) -> None:
+        self.out_dir = out_dir
+        self.mode = mode
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # thread id → [method, depth]; depth counts nested/overlapping calls
+        self._threads: dict[int, list] = {}
+        self._stacks: Counter = Counter()
+        self._stats: pstats.Stats | None = None
+        self._calls = 0
+        self._stop = threading.Event()
+        self._sampler = None
+        if mode == "sample":
+            self._interval = interval
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="profile-sampler", daemon=True
+            )
+            self._sampler.start()
+
+    @contextlib.contextmanager
+    def track(self, method: str, cprofile: bool) -> Iterator[None]:
+        tid = threading.get_ident()
+        with self._lock:
+            slot = self._threads.setdefault(tid, [method, 0])
+            slot[1] += 1
+        prof = None
+        if self.mode == "cprofile" and cprofile:
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:  # another profiler already owns this thread
+                prof = None
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+                with self._lock:
+                    if self._stats is None:
+                        self._stats = pstats.Stats(prof)
+                    else:
+                        self._stats.add(prof)
+                    self._calls += 1
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    self._threads.pop(tid, None)
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            with self._lock:
+                tracked = {tid: slot[0] for tid, slot in self._threads.items()}
+            if not tracked:
+                continue
+            frames = sys._current_frames()
+            for tid, method in tracked.items():
+                frame = frames.get(tid)
+                if frame is None:
+                    continue
+                labels = []
+                while frame is not None:
+                    code = frame.f_code
+                    labels.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                labels.append(method)
+                self._stacks[";".join(reversed(labels))] += 1
+
+    def finish(self) -> dict:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        # pid + sequence number: sessions ending in the same second (or in
+        # two sidecars) must not overwrite each other's file
+        stamp = "{}-{}-{}".format(
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started)), os.getpid(), next(_seq)
+        )
+        result = {"mode": self.mode, "duration_s": round(time.time() - self.started, 3)}
+
+        if self.mode == "sample":
+            path = self.out_dir / f"profile-{stamp}.collapsed"
+            with open(path, "w", encoding="utf-8") as fh:
+                for stack, count in self._stacks.most_common():
+                    fh.write(f"{stack} {count}\n")
+            result["samples"] = sum(self._stacks.values())
+        else:
+            path = self.out_dir / f"profile-{stamp}.pstats"
+            with self._lock:
+                stats = self._stats
+            if stats is not None:
+                stats.dump_stats(str(path))
+            else:
+                # No handler ran; still leave an (empty) file behind so the
+                # caller's path is valid.
+                cProfile.Profile().dump_stats(str(path))
+            result["calls"] = self._calls
+
+        result["path"] = str(path)
+        return result
@@ -20,6 +20,17 @@ class Notification(BaseModel):
     event: str
     params: dict[str, Any] = {}
 
+class BatchParams(BaseModel):
+    """Params of a ``$/batch`` request: N sub-requests in one line.
+
+    Results come back as one response whose ``result.responses`` holds the
+    N sub-responses in request order, or — with ``stream`` — as one
+    ``batch.item`` notification per sub-response as each completes,
+    followed by a response carrying only ``result.count``.
+    """
+    requests: list[Request]
+    stream: bool = False
+
 class ParsedRow(BaseModel):
     lcsc: str
     qty: int
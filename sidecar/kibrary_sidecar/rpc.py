@@ -4,102 +4,386 @@ responses (and notifications) to stdout.
 
 Sync methods   → kibrary_sidecar.methods.REGISTRY
 Async methods  → kibrary_sidecar.downloader.ASYNC_REGISTRY
+``$/batch``    → N sub-requests in one line, handled here (see below)
+``$/cancel``   → cancel an in-flight request by id, handled here (see below)
 
 Threading note
 --------------
-Sync handlers are dispatched on a small ``ThreadPoolExecutor`` so that
+Sync handlers are dispatched on small ``ThreadPoolExecutor`` pools so that
 many in-flight calls (e.g. N parallel ``search.fetch_photo`` requests
 fired by the SearchPanel) overlap their I/O instead of serialising
 behind a single read-eval-respond loop.  Frontend-perceived latency for
 N thumbnails drops from ``N × roundtrip`` to ``~max(roundtrip)`` when N
 is below the worker count.
 
-Async handlers (run via asyncio.run on the dispatcher thread) may call
+There is one pool per priority lane (interactive / background / bulk, see
+:mod:`kibrary_sidecar.lanes`), so bulk work such as
+``library.backfill_icons`` never sits in the queue ahead of interactive
+calls like ``system.ping`` or ``parts.read_props``.
+
+Async handlers all run on one long-lived event loop hosted by a
+dedicated thread (:class:`_EventLoopThread`), so a ``parts.download``
+batch never ties up a sync worker, concurrent downloads share one loop
+(and its default ``to_thread`` executor), and handlers can keep async
+resources — clients, semaphores — alive across requests.  They may call
 the emit callback multiple times before returning.  Both notification
 writes and the final response write go through the same
-``_stdout_lock`` so that lines are never interleaved on stdout.
+stdout writer (:mod:`kibrary_sidecar.wire`) so that lines are never
+interleaved on stdout.  Responses are plain dicts encoded straight to
+JSON there — pydantic is only used to parse incoming requests.
+
+Batches
+-------
+``{"id": 9, "method": "$/batch", "params": {"requests": [...]}}`` fans its
+sub-requests out over the same worker pool and answers with a single
+line, ``{"id": 9, "ok": true, "result": {"responses": [...]}}``, once the
+last one finishes.  List views use it to hydrate hundreds of rows
+(icons, 3D info, meta) in one round trip instead of one line each.  With
+``"stream": true`` each sub-response is instead written as a
+``batch.item`` notification as soon as it is ready.  No thread ever
+blocks waiting for a batch — the last sub-request to finish writes it.
+
+Streaming
+---------
+A sync handler may return a :class:`~kibrary_sidecar.streaming.Stream`
+(``library.list``, ``library.list_components`` and
+``library.backfill_icons`` do when called with ``"stream": true``).  Its
+pages are written as ``stream.chunk`` notifications carrying the request
+id, followed by the final response — see :mod:`kibrary_sidecar.streaming`.
+
+Cancellation
+------------
+``{"id": 10, "method": "$/cancel", "params": {"id": 7}}`` cancels request
+7.  If it is still queued its future is dropped; if it is an async handler
+its task is cancelled on the event loop; a running sync handler sees its
+:class:`~kibrary_sidecar.cancellation.CancelToken` set and may stop early
+via ``cancellation.check()``.  Either way request 7 is answered exactly
+once, with a ``CANCELLED`` error — whatever the handler returns after the
+cancel is discarded.  The ``$/cancel`` itself answers
+``{"cancelled": true}``, or ``false`` if request 7 had already finished.
 """
 
 import asyncio
-import json
-import os
 import sys
 import threading
 import traceback
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 
+from kibrary_sidecar import cancellation, lanes, metrics, profiling, streaming, wire
 from kibrary_sidecar.methods import REGISTRY
 from kibrary_sidecar.downloader import ASYNC_REGISTRY
-from kibrary_sidecar.protocol import ErrorBody, Notification, Request, Response
+from kibrary_sidecar.protocol import BatchParams, Request
+
+# Response / notification dicts, shaped like protocol.Response / Notification.
+Response = dict
 
-# One lock guards all stdout writes (sync responses AND async notifications).
+# Writer thread owning stdout while serve() runs.  Outside serve() lines
+# are written synchronously under _stdout_lock.
+_writer: wire.StdoutWriter | None = None
 _stdout_lock = threading.Lock()
 
-# Worker pool for sync handlers.  8 is enough to overlap a typical
-# search-result page (≤6 thumbnails) without hammering the upstream
-# server.  Override via env var for stress tests.
-_MAX_WORKERS = int(os.environ.get("KIBRARY_SIDECAR_WORKERS", "8"))
+BATCH_METHOD = "$/batch"
+CANCEL_METHOD = "$/cancel"
+
+# request id → CancelToken for every request that has not been answered
+# yet.  Whoever pops an entry writes that request's response, which is
+# what makes it exactly-once.
+_inflight: dict[int, cancellation.CancelToken] = {}
+_inflight_lock = threading.Lock()
+
+
+class _LanePools:
+    """One ``ThreadPoolExecutor`` per priority lane.
+
+    The interactive pool defaults to 8 workers — enough to overlap a
+    typical search-result page (≤6 thumbnails) without hammering the
+    upstream server.  Sizes and method → lane mapping come from
+    :func:`lanes.load_config`.
+    """
+
+    def __init__(self, config: dict) -> None:
+        self._config = config
+        self._pools = {
+            lane: ThreadPoolExecutor(
+                max_workers=config["workers"][lane], thread_name_prefix=f"rpc-{lane}"
+            )
+            for lane in lanes.LANES
+        }
+
+    def submit(self, method: str, fn, *args) -> Future:
+        return self._pools[lanes.lane_for(method, self._config)].submit(fn, *args)
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+
+
+class _EventLoopThread:
+    """One asyncio event loop running forever on a daemon thread.
+
+    Every ``ASYNC_REGISTRY`` handler is scheduled onto it with
+    ``run_coroutine_threadsafe``; the returned concurrent future is
+    treated exactly like a sync handler's executor future.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="rpc-async", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self) -> None:
+        """Wait for running handlers to finish, then stop the loop."""
+
+        async def drain() -> None:
+            while True:
+                tasks = asyncio.all_tasks() - {asyncio.current_task()}
+                if not tasks:
+                    break
+                await asyncio.gather(*tasks, return_exceptions=True)
+            await self.loop.shutdown_default_executor()
 
+        self.submit(drain()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
 
-def _write_line(line: str) -> None:
-    """Write *line* + newline to stdout, serialised by _stdout_lock."""
+
+def _write_line(line: bytes) -> None:
+    """Queue one encoded JSON line (without newline) for stdout."""
+    writer = _writer
+    if writer is not None:
+        writer.write(line)
+        return
     with _stdout_lock:
-        sys.stdout.write(line + "\n")
-        sys.stdout.flush()
+        wire.write_lines([line])
+
+
+def _write_response(resp: Response) -> None:
+    _write_line(wire.encode(resp))
+
+
+def _notify(event: str, params: dict) -> None:
+    _write_line(wire.encode({"event": event, "params": params}))
 
 
-def _handle_sync(req: Request) -> None:
-    """Dispatch a sync handler and write its response.
+def _ok(req_id: int, result) -> Response:
+    if result is None:
+        return {"id": req_id, "ok": True}
+    return {"id": req_id, "ok": True, "result": result}
+
+
+def _error(req_id: int, code: str, message: str) -> Response:
+    return {"id": req_id, "ok": False, "error": {"code": code, "message": message}}
+
+
+def _cancelled(req_id: int) -> Response:
+    return _error(req_id, "CANCELLED", "request cancelled")
+
+
+def _run_sync(
+    req: Request, token: cancellation.CancelToken, call: metrics.Call
+) -> Response:
+    """Run a sync handler and return its response (never raises).
 
     Runs on a worker thread; safe because handler I/O is independent
-    per request and `_write_line` is locked.
+    per request.
     """
+    if token.cancelled:
+        return _cancelled(req.id)
+    call.start()
     handler = REGISTRY[req.method]
     try:
-        result = handler(req.params)
-        resp = Response(id=req.id, ok=True, result=result)
+        with cancellation.bind(token), profiling.handler(req.method):
+            result = handler(req.params)
+            if isinstance(result, streaming.Stream):
+                result = _drain_stream(req.id, result, token)
+        return _ok(req.id, result)
+    except cancellation.Cancelled:
+        return _cancelled(req.id)
     except Exception as exc:
         print(traceback.format_exc(), file=sys.stderr)
-        resp = Response(
-            id=req.id,
-            ok=False,
-            error=ErrorBody(code="HANDLER_ERROR", message=str(exc)),
-        )
-    _write_line(resp.model_dump_json(exclude_none=True))
+        return _error(req.id, "HANDLER_ERROR", str(exc))
+
+
+def _drain_stream(
+    req_id: int, stream: streaming.Stream, token: cancellation.CancelToken
+) -> dict:
+    """Send a handler's :class:`~kibrary_sidecar.streaming.Stream` as
+    ``stream.chunk`` notifications and return its final result."""
 
+    def emit(seq: int, items: list) -> None:
+        token.raise_if_cancelled()
+        _notify("stream.chunk", {"id": req_id, "seq": seq, "items": items})
 
-def _handle_async(req: Request) -> None:
-    """Dispatch an async handler and write its response.
+    return stream.drain(emit)
 
-    asyncio.run owns its own event loop per call, so multiple concurrent
-    async handlers from the worker pool don't conflict.
+
+async def _run_async(
+    req: Request, token: cancellation.CancelToken, call: metrics.Call
+) -> Response:
+    """Run an async handler on the shared loop and return its response.
+
+    Cancellation surfaces as ``CancelledError`` and is left to propagate,
+    so the wrapping future ends up cancelled.
     """
+    call.start()
     async_handler = ASYNC_REGISTRY[req.method]
 
     async def emit(ev: dict) -> None:
-        notif = Notification(
-            event=ev["event"],
-            params=ev.get("params", {}),
-        )
-        _write_line(notif.model_dump_json())
+        _notify(ev["event"], ev.get("params", {}))
 
     try:
-        result = asyncio.run(async_handler(req.params, emit))
-        resp = Response(id=req.id, ok=True, result=result)
+        with cancellation.bind(token), profiling.handler(req.method, cprofile=False):
+            result = await async_handler(req.params, emit)
+        return _ok(req.id, result)
+    except cancellation.Cancelled:
+        return _cancelled(req.id)
     except Exception as exc:
         print(traceback.format_exc(), file=sys.stderr)
-        resp = Response(
-            id=req.id,
-            ok=False,
-            error=ErrorBody(code="HANDLER_ERROR", message=str(exc)),
-        )
-    _write_line(resp.model_dump_json(exclude_none=True))
+        return _error(req.id, "HANDLER_ERROR", str(exc))
+
+
+def _start(
+    req: Request,
+    token: cancellation.CancelToken,
+    pools: _LanePools,
+    aio: _EventLoopThread,
+    on_done: Callable[[Response], None],
+) -> Future:
+    """Schedule *req* (sync or async) and call *on_done* with its response.
+
+    Cancelling *token* cancels the future: a queued sync handler never
+    runs, an async handler's task is cancelled.  *on_done* runs on
+    whichever thread completes (or cancels) the future.  Timing goes to
+    :mod:`kibrary_sidecar.metrics`.
+    """
+    call = metrics.queued(req.method)
+    if req.method in REGISTRY:
+        future = pools.submit(req.method, _run_sync, req, token, call)
+    else:
+        future = aio.submit(_run_async(req, token, call))
+
+    def done(f: Future) -> None:
+        if f.cancelled():
+            resp = _cancelled(req.id)
+        else:
+            try:
+                resp = f.result()
+            except Exception as exc:  # pragma: no cover — runners never raise
+                resp = _error(req.id, "HANDLER_ERROR", str(exc))
+        call.finish(_outcome(resp, token))
+        on_done(resp)
+
+    future.add_done_callback(done)
+    token.on_cancel(future.cancel)
+    return future
+
+
+def _outcome(resp: Response, token: cancellation.CancelToken) -> str:
+    if token.cancelled or resp.get("error", {}).get("code") == "CANCELLED":
+        return "cancelled"
+    return "ok" if resp["ok"] else "error"
+
+
+def _is_handler(method: str) -> bool:
+    return method in REGISTRY or method in ASYNC_REGISTRY
+
+
+def _track(req_id: int) -> cancellation.CancelToken:
+    token = cancellation.CancelToken()
+    with _inflight_lock:
+        _inflight[req_id] = token
+    return token
+
+
+def _finish(req_id: int, token: cancellation.CancelToken, resp: Response) -> None:
+    """Write *resp* for a tracked request unless it was already answered.
+
+    A cancelled request always answers ``CANCELLED``, even if its handler
+    ran to completion after the cancel.
+    """
+    with _inflight_lock:
+        if _inflight.get(req_id) is not token:
+            return
+        del _inflight[req_id]
+    if token.cancelled:
+        resp = _cancelled(req_id)
+    _write_response(resp)
+
+
+def _cancel(req: Request) -> None:
+    """Handle ``$/cancel``: cancel the request whose id is in ``params.id``."""
+    target = req.params.get("id")
+    with _inflight_lock:
+        token = _inflight.get(target)
+    if token is None:
+        _write_response(_ok(req.id, {"cancelled": False}))
+        return
+    # Drops the future if still queued, which answers the request right here.
+    token.cancel()
+    _write_response(_ok(req.id, {"cancelled": True}))
+
+
+def _dispatch_batch(req: Request, pools: _LanePools, aio: _EventLoopThread) -> None:
+    """Fan the sub-requests of a ``$/batch`` request out over the pools.
+
+    Each sub-request goes to its own method's lane.  Sub-responses are
+    collected in request order; whichever handler
+    finishes the last one writes the batch response.  Unknown (or nested
+    ``$/batch``) sub-methods fail individually without failing the batch.
+    Cancelling the batch id cancels every sub-request that has not run yet.
+    """
+    try:
+        batch = BatchParams.model_validate(req.params)
+    except Exception as exc:
+        _write_response(_error(req.id, "BAD_REQUEST", str(exc)))
+        return
+
+    subs = batch.requests
+    if not subs:
+        result = {"count": 0} if batch.stream else {"responses": []}
+        _write_response(_ok(req.id, result))
+        return
+
+    token = _track(req.id)
+    responses: list[dict | None] = [None] * len(subs)
+    remaining = [len(subs)]
+    lock = threading.Lock()
+
+    def complete(index: int, resp: Response) -> None:
+        if batch.stream:
+            _notify("batch.item", {"batch_id": req.id, "index": index, "response": resp})
+        with lock:
+            responses[index] = resp
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            result = {"count": len(subs)} if batch.stream else {"responses": responses}
+            _finish(req.id, token, _ok(req.id, result))
+
+    for index, sub in enumerate(subs):
+        if not _is_handler(sub.method):
+            complete(index, _error(sub.id, "UNKNOWN_METHOD", sub.method))
+            continue
+        _start(sub, token, pools, aio, lambda resp, i=index: complete(i, resp))
 
 
 def serve() -> None:
-    executor = ThreadPoolExecutor(
-        max_workers=_MAX_WORKERS, thread_name_prefix="rpc-worker"
-    )
+    global _writer
+    _writer = wire.StdoutWriter()
+    dumper = metrics.start_dumper()
+    pools = _LanePools(lanes.load_config())
+    aio = _EventLoopThread()
     try:
         for raw in sys.stdin:
             line = raw.strip()
@@ -110,35 +394,36 @@ def serve() -> None:
             try:
                 req = Request.model_validate_json(line)
             except Exception as exc:
-                _write_line(
-                    json.dumps(
-                        {
-                            "id": 0,
-                            "ok": False,
-                            "error": {"code": "BAD_REQUEST", "message": str(exc)},
-                        }
-                    )
-                )
+                _write_response(_error(0, "BAD_REQUEST", str(exc)))
                 continue
 
             # --- dispatch ----------------------------------------------------
-            if req.method in REGISTRY:
-                executor.submit(_handle_sync, req)
+            if _is_handler(req.method):
+                token = _track(req.id)
+                _start(
+                    req, token, pools, aio,
+                    lambda resp, rid=req.id, tok=token: _finish(rid, tok, resp),
+                )
+                continue
+
+            if req.method == BATCH_METHOD:
+                _dispatch_batch(req, pools, aio)
                 continue
 
-            if req.method in ASYNC_REGISTRY:
-                executor.submit(_handle_async, req)
+            if req.method == CANCEL_METHOD:
+                _cancel(req)
                 continue
 
             # --- unknown method ----------------------------------------------
-            resp = Response(
-                id=req.id,
-                ok=False,
-                error=ErrorBody(code="UNKNOWN_METHOD", message=req.method),
-            )
-            _write_line(resp.model_dump_json(exclude_none=True))
+            _write_response(_error(req.id, "UNKNOWN_METHOD", req.method))
     finally:
         # Wait for in-flight handlers so their responses make it to stdout
-        # before the process exits.  shutdown(wait=True) is the default but
-        # being explicit makes the contract obvious.
-        executor.shutdown(wait=True)
+        # before the process exits.
+        pools.shutdown()
+        aio.close()
+        if dumper is not None:
+            dumper.stop()
+        # Don't lose a capture if the shell quits mid-session.
+        profiling.stop()
+        writer, _writer = _writer, None
+        writer.close()
@@ -11,14 +11,19 @@ to ``search.raph.io`` is amortised across N parallel ``fetch_photo`` calls
 thread-safe for concurrent ``get()`` calls; the connection pool is the win.
 
 A small LRU cache on ``fetch_photo`` covers the "user re-types the same
-query" case — the upstream JPEG hasn't changed, no point re-fetching and
-re-base64-encoding 50 KB.
+query" case — the upstream JPEG hasn't changed, no point re-fetching it.
+
+``fetch_photo`` can also skip base64 entirely: given a ``blob_root`` it
+stores the image in the content-addressed blob store (:mod:`blobs`) and
+returns the file path, keeping the RPC line small.
 """
 from __future__ import annotations
 
 import base64
+import mimetypes
 import threading
 from collections import OrderedDict
+from pathlib import Path
 
 import httpx
 
@@ -49,18 +54,25 @@ def _client() -> httpx.Client:
     return _CLIENT
 
 
+def warm() -> None:
+    """Build the shared client now (SSL context, CA bundle) so the first
+    search does not pay for it.  Opens no connection."""
+    _client()
+
+
 # ---------------------------------------------------------------------------
-# Photo LRU cache (lcsc → data_url).
+# Photo LRU cache (lcsc → (content_type, raw bytes)).
 #
-# Cap to PHOTO_CACHE_MAX entries to bound memory; each entry is ~70 KB
-# (50 KB JPEG + 33% base64 overhead) so 256 entries ≈ 18 MB worst case.
+# Cap to PHOTO_CACHE_MAX entries to bound memory; each entry is ~50 KB
+# (the raw JPEG — base64 is applied per response) so 256 entries ≈ 13 MB
+# worst case.
 # ---------------------------------------------------------------------------
 PHOTO_CACHE_MAX = 256
-_photo_cache: "OrderedDict[str, str]" = OrderedDict()
+_photo_cache: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
 _photo_cache_lock = threading.Lock()
 
 
-def _cache_get(lcsc: str) -> str | None:
+def _cache_get(lcsc: str) -> tuple[str, bytes] | None:
     with _photo_cache_lock:
         if lcsc in _photo_cache:
             _photo_cache.move_to_end(lcsc)
@@ -68,9 +80,9 @@ def _cache_get(lcsc: str) -> str | None:
     return None
 
 
-def _cache_put(lcsc: str, data_url: str) -> None:
+def _cache_put(lcsc: str, photo: tuple[str, bytes]) -> None:
     with _photo_cache_lock:
-        _photo_cache[lcsc] = data_url
+        _photo_cache[lcsc] = photo
         _photo_cache.move_to_end(lcsc)
         while len(_photo_cache) > PHOTO_CACHE_MAX:
             _photo_cache.popitem(last=False)
@@ -119,6 +131,7 @@ def fetch_photo(
     api_key: str,
     base_url: str = "https://search.raph.io",
     timeout: float = 10.0,
+    blob_root: Path | None = None,
 ) -> dict:
     """Fetch the auth-gated thumbnail for *lcsc* and return it as a data URL.
 
@@ -131,6 +144,10 @@ def fetch_photo(
     Returns ``{'data_url': '...'}`` on success, ``{'error': '...'}`` on
     failure, or ``{'data_url': None}`` if *api_key* is empty.
 
+    With *blob_root* the image is written to the blob store instead and the
+    success result is ``{'path': '...', 'content_type': '...', 'size': n}``
+    (failures and "no photo" are reported the same way as above).
+
     A successful fetch is cached in-process (LRU, 256 entries) so re-typing
     the same query doesn't re-hit the upstream.
     """
@@ -139,7 +156,7 @@ def fetch_photo(
 
     cached = _cache_get(lcsc)
     if cached is not None:
-        return {"data_url": cached}
+        return _photo_result(cached, blob_root)
 
     headers = {"Authorization": f"Bearer {api_key}"}
     try:
@@ -151,15 +168,30 @@ def fetch_photo(
         if response.status_code == 404:
             return {"data_url": None}
         response.raise_for_status()
-        content_type = response.headers.get("content-type", "image/jpeg")
-        b64 = base64.b64encode(response.content).decode("ascii")
-        data_url = f"data:{content_type};base64,{b64}"
-        _cache_put(lcsc, data_url)
-        return {"data_url": data_url}
+        photo = (response.headers.get("content-type", "image/jpeg"), response.content)
+        _cache_put(lcsc, photo)
+        return _photo_result(photo, blob_root)
     except httpx.HTTPError as exc:
         return {"error": str(exc)}
 
 
+def _photo_result(photo: tuple[str, bytes], blob_root: Path | None) -> dict:
+    content_type, content = photo
+    if blob_root is None:
+        b64 = base64.b64encode(content).decode("ascii")
+        return {"data_url": f"data:{content_type};base64,{b64}"}
+
+    from kibrary_sidecar import blobs  # local import: only needed in file mode
+
+    mime = content_type.split(";", 1)[0].strip()
+    suffix = mimetypes.guess_extension(mime) or ""
+    try:
+        blob = blobs.put(content, blob_root, suffix)
+    except OSError as exc:
+        return {"error": f"could not store photo: {exc}"}
+    return {"path": blob["path"], "content_type": content_type, "size": blob["size"]}
+
+
 def get_part(
     lcsc: str,
     api_key: str,
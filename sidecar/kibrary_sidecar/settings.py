@@ -17,6 +17,15 @@ def _config_root() -> Path:
         return Path(os.environ.get("APPDATA", str(Path.home())))
     return Path(os.environ.get("XDG_CONFIG_HOME", str(Path.home() / ".config")))
 
+def user_cache_root() -> Path:
+    """The per-user cache directory (``~/.cache`` and its equivalents);
+    the sidecar's files go in its ``kibrary`` subdirectory."""
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches"
+    if sys.platform == "win32":
+        return Path(os.environ.get("LOCALAPPDATA", str(Path.home())))
+    return Path(os.environ.get("XDG_CACHE_HOME", str(Path.home() / ".cache")))
+
 def settings_path() -> Path:
     return _config_root() / "kibrary" / "settings.json"
 
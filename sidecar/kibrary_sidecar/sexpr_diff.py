@@ -6,37 +6,19 @@ at the symbol and property level.
 
 from __future__ import annotations
 
-import tempfile
-import os
-from typing import Any
-
-from kiutils.symbol import SymbolLib
-
-
-def _parse(content: str) -> SymbolLib:
-    """Parse a .kicad_sym content string into a SymbolLib by writing to a temp file."""
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".kicad_sym", delete=False, encoding="utf-8"
-    ) as fh:
-        fh.write(content)
-        tmp_path = fh.name
-    try:
-        lib = SymbolLib.from_file(tmp_path)
-    finally:
-        os.unlink(tmp_path)
-    return lib
-
-
-def _symbol_map(lib: SymbolLib) -> dict[str, dict[str, str]]:
-    """Build {symbol_name: {property_key: property_value}} for every top-level symbol."""
-    result: dict[str, dict[str, str]] = {}
-    for sym in lib.symbols:
-        # Only index top-level symbols (unitId is None for top-level)
-        if sym.unitId is not None:
-            continue
-        name = sym.entryName
-        result[name] = {p.key: p.value for p in sym.properties}
-    return result
+from kibrary_sidecar import sexpr_scan
+
+
+def _symbol_map(content: str) -> dict[str, dict[str, str]]:
+    """Build {symbol_name: {property_key: property_value}} for every top-level symbol.
+
+    Uses the read-only scanner; unit sub-symbols are never reported as
+    top-level entries.
+    """
+    return {
+        sym["name"]: sym["properties"]
+        for sym in sexpr_scan.iter_symbols(content.encode("utf-8"))
+    }
 
 
 def diff_kicad_sym(before: str, after: str) -> list[dict]:
@@ -55,11 +37,8 @@ def diff_kicad_sym(before: str, after: str) -> list[dict]:
     if before == after:
         return []
 
-    lib_before = _parse(before)
-    lib_after = _parse(after)
-
-    map_before = _symbol_map(lib_before)
-    map_after = _symbol_map(lib_after)
+    map_before = _symbol_map(before)
+    map_after = _symbol_map(after)
 
     changes: list[dict] = []
 
@@ -0,0 +1,248 @@
+"""sexpr_scan.py — fast, read-only scanner for ``.kicad_sym`` files.
+
+kiutils builds a full object graph (pins, graphics, units) for every
+symbol, which is wasted work when all we want is a handful of
+``(property "Key" "Value")`` nodes.  This module walks the raw bytes with
+a single regex that only stops on parentheses, quoted strings and the few
+node heads we care about (``symbol``, ``property``, ``extends``); graphic
+bodies are stepped over paren-by-paren without building anything.
+
+It is strictly read-only — anything that writes a library still goes
+through kiutils so the output round-trips cleanly.
+
+Public API
+----------
+iter_symbols(data)   → yields one dict per top-level ``(symbol ...)``
+iter_file(path)      → iter_symbols(<mmap of path>), the file kept open meanwhile
+scan_file(path)      → list(iter_file(path))
+read_header(data)    → {version, generator}
+count_symbols(path)  → number of top-level symbols, without extracting anything
+offset_table(path)   → {header, symbols: {name: (start, end, parent)}, extends}
+
+Each yielded symbol is a dict with keys:
+    name        (str)            — symbol entryName
+    properties  (dict[str, str]) — top-level ``(property ...)`` nodes
+    extends     (str | None)     — parent name for derived symbols
+    start, end  (int)            — byte range of the whole ``(symbol ...)`` node
+    units       (list[dict])     — nested ``_N_M`` unit sub-symbols, each
+                                   ``{name, start, end}``
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator
+
+_STR = rb'"(?:[^"\\]|\\.)*"'
+_ATOM = rb'[^\s()"]+'
+_VAL = rb"(" + _STR + rb"|" + _ATOM + rb")"
+
+# One token per match.  Alternatives are tried in order at each position:
+# the interesting node heads first (capturing their leading arguments),
+# then bare parens, then strings — so a ")" inside a quoted value is never
+# mistaken for structure.  Plain atoms (numbers, keywords) are skipped by
+# finditer without producing a match.
+_TOKEN = re.compile(
+    rb"\(\s*symbol\s+" + _VAL
+    + rb"|\(\s*property\s+" + _VAL + rb"\s+" + _VAL
+    + rb"|\(\s*extends\s+" + _VAL
+    + rb"|[()]"
+    + rb"|" + _STR
+)
+
+# Counting only needs paren depth at each ``(symbol`` head, so it works on
+# whole segments with C-level bytes.count() instead of token by token.
+_STRING = re.compile(_STR)
+_SYMBOL_HEAD = re.compile(rb"\(\s*symbol\s")
+
+_HEADER_VERSION = re.compile(rb"\(\s*version\s+([^\s()]+)\s*\)")
+_HEADER_GENERATOR = re.compile(rb"\(\s*generator\s+(" + _STR + rb"|" + _ATOM + rb")\s*\)")
+
+# Offset-table cache, keyed by (path, mtime_ns, size, inode) so a rewritten
+# file gets a fresh table.  Each table is a few dozen bytes per symbol.
+OFFSET_CACHE_MAX = 64
+_offset_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_offset_cache_lock = threading.Lock()
+
+_OPEN = ord("(")
+_CLOSE = ord(")")
+
+
+def _text(raw: bytes) -> str:
+    """Decode a captured atom or quoted string the same way kiutils does."""
+    if raw[:1] == b'"':
+        raw = raw[1:-1]
+    return raw.decode("utf-8", errors="replace").replace('\\"', '"')
+
+
+def iter_symbols(data: bytes | mmap.mmap) -> Iterator[dict]:
+    """Yield every top-level ``(symbol ...)`` entry in *data*.
+
+    *data* is the raw content of a ``.kicad_sym`` file (``bytes`` or an
+    ``mmap``).  Unit sub-symbols are reported inside their parent's
+    ``units`` list, never as separate entries.
+    """
+    depth = 0
+    current: dict | None = None
+    unit: dict | None = None
+
+    for m in _TOKEN.finditer(data):
+        first = m.group(0)[0]
+        if first == _CLOSE:
+            if unit is not None and depth == 3:
+                unit["end"] = m.end()
+                current["units"].append(unit)
+                unit = None
+            elif current is not None and depth == 2:
+                current["end"] = m.end()
+                yield current
+                current = None
+            depth -= 1
+            continue
+        if first != _OPEN:
+            continue  # quoted string outside any node we care about
+
+        depth += 1
+        if m.group(1) is not None:  # (symbol NAME
+            if depth == 2:
+                current = {
+                    "name": _text(m.group(1)),
+                    "properties": {},
+                    "extends": None,
+                    "start": m.start(),
+                    "end": -1,
+                    "units": [],
+                }
+            elif depth == 3 and current is not None:
+                unit = {"name": _text(m.group(1)), "start": m.start(), "end": -1}
+        elif m.group(2) is not None:  # (property KEY VALUE
+            if depth == 3 and current is not None and unit is None:
+                current["properties"][_text(m.group(2))] = _text(m.group(3))
+        elif m.group(4) is not None:  # (extends PARENT
+            if depth == 3 and current is not None:
+                current["extends"] = _text(m.group(4))
+
+
+def iter_file(path: Path) -> Iterator[dict]:
+    """Yield :func:`iter_symbols` for the file at *path*, read via mmap,
+    each symbol as soon as it has been scanned.
+
+    Raises ``FileNotFoundError`` if *path* does not exist.
+    """
+    with open(path, "rb") as fh:
+        if fh.seek(0, 2) == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_symbols(mm)
+
+
+def scan_file(path: Path) -> list[dict]:
+    """Return :func:`iter_symbols` for the file at *path*, read via mmap.
+
+    Raises ``FileNotFoundError`` if *path* does not exist.
+    """
+    return list(iter_file(path))
+
+
+def count_symbols(path: Path) -> int:
+    """Return the number of top-level ``(symbol ...)`` nodes in *path*.
+
+    Works on a memory-mapped file: quoted strings are blanked first (so
+    parens or ``(symbol`` text inside property values don't count), then
+    the text is split at every ``(symbol`` head and paren depth is carried
+    across the segments with ``bytes.count``.  Only heads directly under
+    the library root are counted — unit sub-symbols sit one level deeper.
+    Several times cheaper than :func:`scan_file` when only
+    ``component_count`` is needed.
+    """
+    with open(path, "rb") as fh:
+        if fh.seek(0, 2) == 0:
+            return 0
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            stripped = _STRING.sub(b'""', mm)
+
+    depth = 0
+    count = 0
+    for i, segment in enumerate(_SYMBOL_HEAD.split(stripped)):
+        if i:
+            # Every segment after the first starts right after a "(symbol" head
+            depth += 1
+            if depth == 2:
+                count += 1
+        depth += segment.count(b"(") - segment.count(b")")
+    return count
+
+
+def read_header(data: bytes | mmap.mmap) -> dict:
+    """Return ``{version, generator}`` from the ``(kicad_symbol_lib ...)`` header.
+
+    Only the first few hundred bytes are inspected; missing fields are None.
+    """
+    head = bytes(data[:512])
+    version = _HEADER_VERSION.search(head)
+    generator = _HEADER_GENERATOR.search(head)
+    return {
+        "version": version.group(1).decode("ascii", errors="replace") if version else None,
+        "generator": _text(generator.group(1)) if generator else None,
+    }
+
+
+def offset_table(path: Path) -> dict:
+    """Return the byte-offset table for the ``.kicad_sym`` at *path*.
+
+    The result is::
+
+        {
+            "header":  {"version": ..., "generator": ...},
+            "symbols": {name: (start, end, parent)},
+            "extends": {derived_name: base_name},
+            "stat":    (mtime_ns, size, inode),   # file version the table describes
+        }
+
+    Top-level symbols have ``parent`` None; ``_N_M`` unit sub-symbols map
+    to their own byte range with ``parent`` set to the owning symbol.  The
+    table is built once per file version and cached in-process.
+
+    Raises ``FileNotFoundError`` if *path* does not exist.
+    """
+    path = Path(path)
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+    with _offset_cache_lock:
+        cached = _offset_cache.get(key)
+        if cached is not None:
+            _offset_cache.move_to_end(key)
+            return cached
+
+    symbols: dict[str, tuple[int, int, str | None]] = {}
+    extends: dict[str, str] = {}
+    header = {"version": None, "generator": None}
+    with open(path, "rb") as fh:
+        if st.st_size:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header = read_header(mm)
+                for sym in iter_symbols(mm):
+                    # First definition wins, matching kiutils-era lookups
+                    symbols.setdefault(sym["name"], (sym["start"], sym["end"], None))
+                    for unit in sym["units"]:
+                        symbols.setdefault(
+                            unit["name"], (unit["start"], unit["end"], sym["name"])
+                        )
+                    if sym["extends"] is not None:
+                        extends.setdefault(sym["name"], sym["extends"])
+
+    table = {
+        "header": header,
+        "symbols": symbols,
+        "extends": extends,
+        "stat": key[1:],
+    }
+    with _offset_cache_lock:
+        _offset_cache[key] = table
+        while len(_offset_cache) > OFFSET_CACHE_MAX:
+            _offset_cache.popitem(last=False)
+    return table
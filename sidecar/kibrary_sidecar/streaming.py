@@ -0,0 +1,111 @@
+"""streaming.py — chunked results for RPC handlers.
+
+A sync handler normally returns one dict that goes out as one JSON line;
+for a 3,000-symbol ``library.list_components`` the UI then waits for the
+whole list to be built, encoded and parsed before it can draw a row.  A
+handler may instead return a :class:`Stream`, and the RPC server sends
+each page as it is produced::
+
+    {"event": "stream.chunk", "params": {"id": 42, "seq": 0, "items": [...]}}
+    {"event": "stream.chunk", "params": {"id": 42, "seq": 1, "items": [...]}}
+    {"id": 42, "ok": true, "result": {"count": 3000, "chunks": 2}}
+
+``id`` is the request id; ``seq`` counts from 0.  The final result is the
+page generator's return value (if any) plus ``count`` (items sent) and
+``chunks``.  Streaming is opt-in per call (``"stream": true`` in params),
+so existing callers keep getting a single response.
+
+Public API
+----------
+Stream(pages)               → wrap a generator of pages (lists)
+paged(items, size)          → generator slicing *items* into pages
+singles(gen)                → one-item pages, keeping *gen*'s return value
+wants_stream(params)        → (bool, page_size) from request params
+DEFAULT_PAGE_SIZE
+"""
+
+from __future__ import annotations
+
+from typing import Generator, Iterable, Iterator
+
+DEFAULT_PAGE_SIZE = 200
+
+
+class Stream:
+    """A handler result delivered as ``stream.chunk`` notifications.
+
+    *pages* yields lists of JSON-ready items; a ``return`` value from the
+    generator (a dict) is merged into the final response.
+    """
+
+    def __init__(self, pages: Iterator[list]) -> None:
+        self.pages = pages
+
+    def drain(self, emit) -> dict:
+        """Call ``emit(seq, items)`` for each non-empty page; return the final result.
+
+        Called by the RPC server between cancellation checks, so *emit* may
+        raise to abort the stream; the pages generator is then closed at
+        once, so its ``finally`` blocks run before the error is answered.
+        """
+        seq = 0
+        count = 0
+        it = iter(self.pages)
+        try:
+            while True:
+                try:
+                    page = next(it)
+                except StopIteration as stop:
+                    final = dict(stop.value or {})
+                    break
+                if not page:
+                    continue
+                emit(seq, page)
+                seq += 1
+                count += len(page)
+        except BaseException:
+            if hasattr(it, "close"):
+                it.close()
+            raise
+        final.update(count=count, chunks=seq)
+        return final
+
+
+def paged(items: Iterable, size: int = DEFAULT_PAGE_SIZE) -> Generator[list, None, None]:
+    """Yield *items* in lists of at most *size*."""
+    page: list = []
+    for item in items:
+        page.append(item)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def singles(items: Iterator) -> Generator[list, None, dict | None]:
+    """Yield each item of *items* as its own page.
+
+    If *items* is a generator, its return value is passed through so it
+    still ends up in the final response.
+    """
+    it = iter(items)
+    try:
+        while True:
+            try:
+                item = next(it)
+            except StopIteration as stop:
+                return stop.value
+            yield [item]
+    finally:
+        if hasattr(it, "close"):
+            it.close()
+
+
+def wants_stream(params: dict) -> tuple[bool, int]:
+    """Return ``(stream, page_size)`` requested by the caller's params."""
+    try:
+        size = int(params.get("page_size") or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return bool(params.get("stream")), max(1, size)
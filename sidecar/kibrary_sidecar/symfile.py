@@ -1,27 +1,38 @@
 from pathlib import Path
 
-from kiutils.symbol import SymbolLib, Property
+from kiutils.symbol import Property, Symbol, SymbolLib
+
+from kibrary_sidecar import locks, sexpr_scan
 
 
 def read_properties(path: Path) -> dict[str, str]:
-    """Return a dict of property key→value for the first symbol in a .kicad_sym file."""
-    lib = SymbolLib().from_file(str(path))
-    if not lib.symbols:
-        return {}
-    sym = lib.symbols[0]
-    return {p.key: p.value for p in sym.properties}
+    """Return a dict of property key→value for the first symbol in a .kicad_sym file.
+
+    Read-only, so it uses the fast scanner rather than a full kiutils parse.
+    """
+    first = next(sexpr_scan.iter_symbols(Path(path).read_bytes()), None)
+    return first["properties"] if first is not None else {}
 
 
 def write_properties(path: Path, edits: dict[str, str]) -> None:
-    """Update (or add) properties on the first symbol in a .kicad_sym file, then save."""
-    lib = SymbolLib().from_file(str(path))
-    if not lib.symbols:
-        return
-    sym = lib.symbols[0]
+    """Update (or add) properties on the first symbol in a .kicad_sym file, then save.
+
+    Holds the write lock of the file's directory (the library, for a
+    committed part) across the read-modify-write.
+    """
+    with locks.hold(Path(path).parent):
+        lib = SymbolLib().from_file(str(path))
+        if not lib.symbols:
+            return
+        apply_properties(lib.symbols[0], edits)
+        lib.to_file(str(path))
+
+
+def apply_properties(sym: Symbol, edits: dict[str, str]) -> None:
+    """Update (or add) properties on an already-parsed kiutils *sym*."""
     by_key = {p.key: p for p in sym.properties}
     for k, v in edits.items():
         if k in by_key:
             by_key[k].value = v
         else:
             sym.properties.append(Property(key=k, value=v))
-    lib.to_file(str(path))
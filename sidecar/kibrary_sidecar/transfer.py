@@ -0,0 +1,130 @@
+"""transfer.py — put a file somewhere without copying its bytes when possible.
+
+Committing a part copied every footprint and 3D model out of staging with
+``shutil.copy2``, although staging lives inside the workspace, on the same
+filesystem, and STEP models are often 5–30 MB.  These helpers try, in
+order:
+
+1. a reflink (``FICLONE`` on Linux: btrfs, XFS, bcachefs, …) — the new
+   file shares the source's blocks copy-on-write, so it is independent of
+   the source and safe to edit;
+2. a hard link — the same file under a second name, so only for files
+   neither side rewrites in place;
+3. a plain copy.
+
+Moving a disposable source (``os.rename``, see ``journal.Transaction.move``)
+beats all three and is the caller's decision.
+
+Public API
+----------
+clone(src, dst)      → "reflink" | "copy"              (dst may be edited)
+link(src, dst)       → "reflink" | "hardlink" | "copy" (dst must not be)
+same_device(a, b)    → whether a rename from a to b's directory stays on one filesystem
+tree_size(path)      → bytes in a file, or in every file under a directory
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem / pair of files cannot do that", after
+# which the next method is tried.  Anything else is a real failure.
+_UNSUPPORTED = {
+    errno.EXDEV, errno.EPERM, errno.EINVAL, errno.ENOTTY, errno.EOPNOTSUPP,
+    errno.ENOSYS, errno.EMLINK, errno.EACCES, errno.EBADF,
+}
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def clone(src: Path, dst: Path) -> str:
+    """Copy *src* to *dst* (which must not exist), by reflink if possible."""
+    if _reflink(src, dst):
+        return "reflink"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def link(src: Path, dst: Path) -> str:
+    """Make *dst* (which must not exist) hold *src*'s content by reflink,
+    hard link or copy.  A hard-linked *dst* is the same file as *src*:
+    replace it, never edit it in place."""
+    if _reflink(src, dst):
+        return "reflink"
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError as exc:
+        if exc.errno not in _UNSUPPORTED:
+            raise
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def same_device(src: Path, dst: Path) -> bool:
+    """True if renaming *src* to *dst* moves no data (same filesystem).
+
+    *dst* need not exist yet; its nearest existing ancestor is used.
+    """
+    target = Path(dst)
+    while not target.exists() and target.parent != target:
+        target = target.parent
+    try:
+        return os.stat(src).st_dev == os.stat(target).st_dev
+    except OSError:
+        return False
+
+
+def tree_size(path: Path) -> int:
+    """Bytes in *path*, or in all files below it if it is a directory."""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    if not path.is_dir():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone *src* to a new *dst* with ``FICLONE``; False if unsupported."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            except OSError as exc:
+                if exc.errno not in _UNSUPPORTED:
+                    raise
+                cloned = False
+            else:
+                cloned = True
+    except BaseException:
+        Path(dst).unlink(missing_ok=True)
+        raise
+    if not cloned:
+        Path(dst).unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
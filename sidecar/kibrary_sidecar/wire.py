@@ -0,0 +1,122 @@
+"""wire.py — JSON encoding and buffered stdout for the RPC server.
+
+Responses used to be built as ``Response`` models and dumped with
+``model_dump_json()``.  Handler results are already plain JSON-shaped
+dicts, so they are now encoded directly: with ``orjson`` when it is
+installed (the ``fast`` extra), else with pydantic-core's serializer —
+both well ahead of the stdlib ``json`` module on megabyte-sized strings.
+``benchmarks/bench_json_encoding.py`` compares the paths.
+
+Lines are written by a single writer thread that drains everything queued
+since its last write and flushes once per drain, so a burst of N progress
+notifications costs one flush instead of N.  An idle sidecar still flushes
+each line as soon as it is queued — there is no timer.
+
+Public API
+----------
+encode(obj)            → one JSON line as bytes (no trailing newline)
+StdoutWriter           → the writer thread; ``write(line)``, ``close()``
+"""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+from pathlib import PurePath
+
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see the ``fast`` extra
+    orjson = None
+
+_ANY = TypeAdapter(object)
+
+_STOP = object()
+
+
+def _default(obj):
+    """Encode the few non-JSON types handlers are known to return."""
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode(obj) -> bytes:
+    """Return *obj* as compact UTF-8 JSON.
+
+    Types orjson cannot encode even with :func:`_default` (e.g.
+    ``Decimal``) go through pydantic.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default)
+        except TypeError:
+            pass
+    return _ANY.dump_json(obj)
+
+
+class StdoutWriter:
+    """Background thread that owns ``sys.stdout`` while the server runs.
+
+    ``write`` never blocks on the pipe; lines are written in the order they
+    were queued.  ``close`` writes whatever is still queued and stops.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.SimpleQueue[bytes | object]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="rpc-stdout", daemon=True)
+        self._thread.start()
+
+    def write(self, line: bytes) -> None:
+        self._queue.put(line)
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            chunk = [self._queue.get()]
+            while True:
+                try:
+                    chunk.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in chunk:
+                chunk = chunk[: chunk.index(_STOP)]
+                stop = True
+            if chunk:
+                try:
+                    write_lines(chunk)
+                except (OSError, ValueError) as exc:
+                    # The shell closed our stdout; nothing left to talk to.
+                    print(f"[sidecar] stdout write failed: {exc}", file=sys.stderr)
+
+
+def write_lines(lines: list[bytes]) -> None:
+    """Write *lines* (each without newline) to stdout and flush once.
+
+    Lines are written one by one rather than joined: responses can be
+    megabytes each, and joining would copy them all again.
+    """
+    out = sys.stdout
+    buffer = getattr(out, "buffer", None)
+    if buffer is not None:
+        out.flush()  # anything printed through the text layer goes first
+        for line in lines:
+            buffer.write(line)
+            buffer.write(b"\n")
+        buffer.flush()
+    else:
+        for line in lines:
+            out.write(line.decode("utf-8"))
+            out.write("\n")
+        out.flush()
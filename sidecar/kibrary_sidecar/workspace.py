@@ -1,7 +1,11 @@
 import json
+import logging
+import os
 from pathlib import Path
 from typing import Any
 
+log = logging.getLogger(__name__)
+
 DEFAULT_SETTINGS: dict[str, Any] = {
     "version": 1,
     "kicad_target": None,
@@ -11,8 +15,15 @@ DEFAULT_SETTINGS: dict[str, Any] = {
         "commit_template": "Add {lcsc} ({description}) to {library}",
     },
     "concurrency": 4,
+    # Processes used to re-scan stale libraries in library.list; 0 = auto
+    # (one per CPU core, at most AUTO_SCAN_WORKERS), 1 = scan in-process.
+    "scan_workers": 0,
 }
 
+# Cap for scan_workers = 0: every worker is a fresh interpreter importing
+# kiutils, so past a few the start-up cost outweighs the parallel scan.
+AUTO_SCAN_WORKERS = 4
+
 def _settings_path(root: Path) -> Path:
     return root / ".kibrary" / "workspace.json"
 
@@ -22,6 +33,16 @@ def read_workspace_settings(root: str) -> dict:
         return DEFAULT_SETTINGS
     return json.loads(p.read_text())
 
+def write_workspace_settings(root: str, settings: dict) -> None:
+    p = _settings_path(Path(root))
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(settings, indent=2))
+
+def scan_workers(root: str) -> int:
+    """Resolve the ``scan_workers`` setting to a concrete process count."""
+    n = int(read_workspace_settings(root).get("scan_workers", 0) or 0)
+    return n if n > 0 else min(AUTO_SCAN_WORKERS, os.cpu_count() or 1)
+
 def open_workspace(root: str) -> dict:
     rp = Path(root)
     if not rp.is_dir():
@@ -30,6 +51,14 @@ def open_workspace(root: str) -> dict:
     kdir.mkdir(exist_ok=True)
     (kdir / "staging").mkdir(exist_ok=True)
     (kdir / "cache").mkdir(exist_ok=True)
+    # Finish (or discard) a library operation cut short by a crash.  A
+    # journal that will not replay is reported but does not block opening
+    # the workspace; the next library change raises it again.
+    from kibrary_sidecar import journal
+    try:
+        journal.recover(rp)
+    except Exception as exc:
+        log.error("workspace: journal recovery failed in %s: %s", rp, exc)
     sp = _settings_path(rp)
     first_run = not sp.is_file()
     if first_run:
@@ -0,0 +1,118 @@
+"""Fixtures shared across the sidecar tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from kiutils.symbol import Symbol, SymbolLib
+
+from kibrary_sidecar import dup_index, lib_index, settings
+
+
+@pytest.fixture(autouse=True)
+def user_cache(tmp_path, monkeypatch):
+    """Point the per-user cache (lock files, blobs) at ``tmp_path``, for
+    sidecar subprocesses too, so no test writes into the real one.  macOS
+    has no variable for it, so there ``HOME`` moves as well."""
+    root = tmp_path / "user-cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(root))
+    monkeypatch.setenv("LOCALAPPDATA", str(root))
+    if sys.platform == "darwin":
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        root = settings.user_cache_root()
+    return root
+
+
+@pytest.fixture
+def make_lib():
+    """Factory: ``make_lib(workspace, lib_name, names)`` writes a library
+    ``<workspace>/<lib_name>/`` holding one symbol per name and returns its
+    directory.  Calling it again rewrites the symbol file."""
+
+    def make(workspace: Path, lib_name: str, names: list[str]) -> Path:
+        lib_dir = workspace / lib_name
+        lib_dir.mkdir(parents=True, exist_ok=True)
+        lib = SymbolLib()
+        for name in names:
+            lib.symbols.append(Symbol.create_new(id=name, reference="R", value=name))
+        lib.to_file(str(lib_dir / f"{lib_name}.kicad_sym"))
+        return lib_dir
+
+    return make
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    """Count calls to lib_index.build_entry (i.e. real re-parses)."""
+    calls: list[str] = []
+    real = lib_index.build_entry
+
+    def counting(lib_dir):
+        calls.append(Path(lib_dir).name)
+        return real(lib_dir)
+
+    monkeypatch.setattr(lib_index, "build_entry", counting)
+    return calls
+
+
+@pytest.fixture
+def fresh_index():
+    """Start and end with empty library and duplicate indexes."""
+    lib_index.invalidate()
+    dup_index.invalidate()
+    yield
+    lib_index.invalidate()
+    dup_index.invalidate()
+
+
+@pytest.fixture
+def staged_part():
+    """Factory: ``staged_part(base, lcsc, name=None, lcsc_prop=None,
+    model=None)`` stages ``<base>/<lcsc>/`` as the downloaders leave it —
+    a symbol and footprint named *name* (default: *lcsc*), the symbol
+    optionally with an ``LCSC`` property, and with *model* bytes a
+    ``.3dshapes/<lcsc>.step`` the footprint references — and returns it."""
+
+    def make(
+        base: Path,
+        lcsc: str,
+        name: str | None = None,
+        lcsc_prop: str | None = None,
+        model: bytes | None = None,
+    ) -> Path:
+        name = name or lcsc
+        part = base / lcsc
+        (part / f"{lcsc}.pretty").mkdir(parents=True)
+        prop = f'    (property "LCSC" "{lcsc_prop}" (id 4) (at 0.0 0.0 0))\n' if lcsc_prop else ""
+        (part / f"{lcsc}.kicad_sym").write_text(
+            f'(kicad_symbol_lib (version 20211014) (generator None)\n'
+            f'  (symbol "{name}" (in_bom yes) (on_board yes)\n'
+            f'    (property "Reference" "R" (id 0) (at 0.0 0.0 0))\n'
+            f'    (property "Value" "{name}" (id 1) (at 0.0 0.0 0))\n'
+            f'    (property "Footprint" ".:{name}" (id 2) (at 0.0 0.0 0))\n'
+            f'{prop}'
+            f'  )\n'
+            f')\n'
+        )
+        model_ref = ""
+        if model is not None:
+            (part / f"{lcsc}.3dshapes").mkdir()
+            (part / f"{lcsc}.3dshapes" / f"{lcsc}.step").write_bytes(model)
+            model_ref = (
+                f'  (model ./{lcsc}.step\n'
+                f'    (offset (xyz 0 0 0))\n'
+                f'    (scale (xyz 1 1 1))\n'
+                f'    (rotate (xyz 0 0 0))\n'
+                f'  )\n'
+            )
+        (part / f"{lcsc}.pretty" / f"{name}.kicad_mod").write_text(
+            f'(footprint "{name}"\n'
+            f'  (version 20211014)\n'
+            f'  (generator pcbnew)\n'
+            f'  (layer "F.Cu")\n'
+            f'{model_ref}'
+            f')\n'
+        )
+        return part
+
+    return make
@@ -0,0 +1,54 @@
+"""Tests for blobs.py — the content-addressed blob store."""
+
+import os
+from pathlib import Path
+
+from kibrary_sidecar import blobs, settings
+
+
+def test_put_is_content_addressed_and_idempotent(tmp_path: Path):
+    first = blobs.put(b"\xff\xd8jpeg", tmp_path, ".jpg")
+    second = blobs.put(b"\xff\xd8jpeg", tmp_path, ".jpg")
+
+    path = Path(first["path"])
+    assert first == second
+    assert path.read_bytes() == b"\xff\xd8jpeg"
+    assert path.name == f"{first['sha256']}.jpg"
+    assert path.parent.name == first["sha256"][:2]
+    assert first["size"] == 6
+    # No temp files left behind
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+def test_store_root_prefers_workspace_cache(tmp_path: Path, monkeypatch):
+    assert blobs.store_root(tmp_path) == tmp_path / ".kibrary" / "cache" / "blobs"
+    monkeypatch.setattr(settings.sys, "platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert blobs.store_root() == tmp_path / "xdg" / "kibrary" / "blobs"
+
+
+def test_prune_drops_oldest_first(tmp_path: Path):
+    paths = []
+    for i in range(4):
+        path = Path(blobs.put(bytes([i]) * 100, tmp_path)["path"])
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(path)
+
+    freed = blobs.prune(tmp_path, max_bytes=250)
+
+    assert freed == 200
+    assert [p.exists() for p in paths] == [False, False, True, True]
+
+
+def test_prune_spares_blobs_handed_out_again(tmp_path: Path):
+    old = Path(blobs.put(b"a" * 100, tmp_path)["path"])
+    newer = Path(blobs.put(b"b" * 100, tmp_path)["path"])
+    os.utime(old, (1000, 1000))
+    os.utime(newer, (2000, 2000))
+
+    # Stored long ago, but just returned to a caller again
+    assert blobs.put(b"a" * 100, tmp_path)["path"] == str(old)
+    blobs.prune(tmp_path, max_bytes=0)
+
+    assert old.exists()
+    assert not newer.exists()
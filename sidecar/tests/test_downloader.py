@@ -194,3 +194,29 @@ def test_parts_download_handler(tmp_path: Path, monkeypatch):
     assert set(result["results"].keys()) == {"C1", "C2"}
     types = [e["event"] for e in events]
     assert "download.done" in types
+
+
+def test_concurrent_batches_share_the_download_limit(tmp_path: Path, monkeypatch):
+    """Two batches on one event loop never exceed MAX_ACTIVE_DOWNLOADS together."""
+    from kibrary_sidecar import downloader
+
+    monkeypatch.setattr(downloader, "MAX_ACTIVE_DOWNLOADS", 3)
+    active = 0
+    peak = 0
+
+    async def counting(lcsc: str, target: Path) -> tuple[bool, str | None]:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return False, "skip post-processing"
+
+    async def both():
+        await asyncio.gather(
+            run_batch([f"C{i}" for i in range(6)], tmp_path / "a", concurrency=6, dl=counting),
+            run_batch([f"C{i}" for i in range(6)], tmp_path / "b", concurrency=6, dl=counting),
+        )
+
+    asyncio.run(both())
+    assert peak == 3
@@ -0,0 +1,198 @@
+"""Tests for dup_index.py — duplicate detection across a workspace's libraries."""
+
+from pathlib import Path
+
+import pytest
+
+from kibrary_sidecar import dup_index, lib_index
+from kibrary_sidecar.library import commit_many, commit_to_library
+
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_find_matches_names_and_lcsc_properties_across_libraries(tmp_path: Path, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", "R_1k", "C1"), "Res_KSL", {})
+    commit_to_library(ws, "C2", staged_part(tmp_path / "s", "C2", "C_1u"), "Cap_KSL", {})
+
+    assert dup_index.find(ws, ["R_1k", "C_1u", "R_2k"], [" c1 ", "C2"]) == [
+        {"kind": "lcsc", "value": "C1", "library": "Res_KSL", "component": "R_1k"},
+        {"kind": "name", "value": "C_1u", "library": "Cap_KSL", "component": "C_1u"},
+        {"kind": "name", "value": "R_1k", "library": "Res_KSL", "component": "R_1k"},
+    ]
+
+    # Libraries edited or removed behind the index's back are picked up
+    sym = ws / "Cap_KSL" / "Cap_KSL.kicad_sym"
+    sym.write_text(sym.read_text().replace('"C_1u"', '"C_2u2"'))
+    assert dup_index.find(ws, ["C_1u"]) == []
+    assert dup_index.find(ws, ["C_2u2"])[0]["library"] == "Cap_KSL"
+    (ws / "Res_KSL" / "Res_KSL.kicad_sym").unlink()
+    assert dup_index.find(ws, ["R_1k"], ["C1"]) == []
+
+
+def test_recommit_is_rejected_before_anything_is_written(tmp_path: Path, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "a", "C1", "R_1k", "C1"), "Res_KSL", {})
+    sym = ws / "Res_KSL" / "Res_KSL.kicad_sym"
+    before = sym.read_bytes()
+
+    with pytest.raises(dup_index.DuplicateComponentError) as exc:
+        commit_to_library(ws, "C1", staged_part(tmp_path / "b", "C1", "R_1k", "C1"), "Res_KSL", {})
+    assert {d["kind"] for d in exc.value.duplicates} == {"name", "lcsc"}
+    assert "Res_KSL:R_1k" in str(exc.value)
+    assert sym.read_bytes() == before
+    assert (tmp_path / "b" / "C1" / "C1.kicad_sym").is_file()
+
+    # Same LCSC in another library: rejected, unless allowed
+    with pytest.raises(dup_index.DuplicateComponentError):
+        commit_to_library(ws, "C1", staged_part(tmp_path / "c", "C1", "R_1k_alt", "C1"), "Other_KSL", {})
+    assert not (ws / "Other_KSL").exists()
+    commit_to_library(
+        ws, "C1", tmp_path / "c" / "C1", "Other_KSL", {}, allow_duplicates=True
+    )
+    assert (ws / "Other_KSL" / "Other_KSL.kicad_sym").is_file()
+
+    # A name the target library already has is never allowed
+    with pytest.raises(dup_index.DuplicateComponentError):
+        commit_to_library(
+            ws, "C9", staged_part(tmp_path / "d", "C9", "R_1k"), "Res_KSL", {}, allow_duplicates=True
+        )
+    assert sym.read_bytes() == before
+
+
+def test_commits_keep_the_index_fresh_without_reparsing(tmp_path: Path, parse_counter, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", "R_1k"), "Res_KSL", {})
+    for i in range(2, 6):
+        commit_to_library(ws, f"C{i}", staged_part(tmp_path / "s", f"C{i}", f"R_{i}k"), "Res_KSL", {})
+    assert dup_index.find(ws, ["R_5k"])[0]["library"] == "Res_KSL"
+    assert parse_counter == []
+
+
+def test_commit_many_fails_duplicates_within_the_batch_and_workspace(tmp_path: Path, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", "R_1k", "C1"), "Res_KSL", {})
+
+    result = commit_many(ws, [
+        {"lcsc": "C1", "staging_part": staged_part(tmp_path / "t", "C1", "R_1k_b", "C1"),
+         "target_lib": "Other_KSL", "edits": {}},
+        {"lcsc": "C2", "staging_part": staged_part(tmp_path / "t", "C2", "R_2k", "C2"),
+         "target_lib": "Res_KSL", "edits": {}},
+        {"lcsc": "C3", "staging_part": staged_part(tmp_path / "t", "C3", "R_2k", "C3"),
+         "target_lib": "Res_KSL", "edits": {}},
+        {"lcsc": "C4", "staging_part": staged_part(tmp_path / "t", "C4", "R_4k", "C2"),
+         "target_lib": "Cap_KSL", "edits": {}},
+    ])
+
+    assert [(r["lcsc"], r["ok"]) for r in result["results"]] == [
+        ("C1", False), ("C2", True), ("C3", False), ("C4", False),
+    ]
+    assert result["committed"] == 1
+    assert not (ws / "Other_KSL").exists() and not (ws / "Cap_KSL").exists()
+
+
+def test_commit_many_reports_a_repeated_lcsc_once_committed(tmp_path: Path, staged_part):
+    from kiutils.symbol import SymbolLib
+
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    part = staged_part(tmp_path / "s", "C1", "R_1k", "C1")
+
+    result = commit_many(ws, [
+        {"lcsc": "C1", "staging_part": part, "target_lib": "Res_KSL", "edits": {}},
+        {"lcsc": "C1", "staging_part": part, "target_lib": "Res_KSL", "edits": {}},
+    ])
+
+    assert [(r["lcsc"], r["ok"]) for r in result["results"]] == [("C1", True), ("C1", False)]
+    assert result["committed"] == 1 and result["failed"] == 1
+    sym = ws / "Res_KSL" / "Res_KSL.kicad_sym"
+    assert [s.entryName for s in SymbolLib().from_file(str(sym)).symbols] == ["R_1k"]
+
+
+def test_parallel_commits_of_one_lcsc_to_two_libraries_let_one_through(
+    tmp_path: Path, monkeypatch, staged_part
+):
+    import threading
+    import time
+
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    for lib in ("Res_KSL", "Other_KSL"):
+        commit_to_library(ws, lib, staged_part(tmp_path / "s", lib, f"{lib}_seed"), lib, {})
+
+    # Widen the gap between the duplicate check and the write
+    real_find = dup_index.find
+
+    def slow_find(*args):
+        matches = real_find(*args)
+        time.sleep(0.2)
+        return matches
+
+    monkeypatch.setattr(dup_index, "find", slow_find)
+    outcomes = []
+
+    def commit(lib, base):
+        try:
+            commit_to_library(ws, "C1", staged_part(tmp_path / base, "C1", f"R_{lib}", "C1"), lib, {})
+        except dup_index.DuplicateComponentError:
+            outcomes.append("duplicate")
+        else:
+            outcomes.append("ok")
+
+    threads = [
+        threading.Thread(target=commit, args=(lib, base))
+        for lib, base in (("Res_KSL", "a"), ("Other_KSL", "b"))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(outcomes) == ["duplicate", "ok"]
+    assert len(real_find(ws, (), ["C1"])) == 1
+
+
+def test_refresh_rereads_libraries_outside_the_lock(tmp_path: Path, monkeypatch, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", "R_1k", "C1"), "Res_KSL", {})
+    dup_index.invalidate()
+
+    real = lib_index.get_libraries
+    lock_free = []
+
+    def checking(lib_dirs, *args):
+        lock_free.append(dup_index._lock.acquire(blocking=False))
+        if lock_free[-1]:
+            dup_index._lock.release()
+        return real(lib_dirs, *args)
+
+    monkeypatch.setattr(lib_index, "get_libraries", checking)
+    assert dup_index.find(ws, ["R_1k"])[0]["library"] == "Res_KSL"
+    assert lock_free == [True]
+
+
+def test_workspace_is_only_relisted_when_its_mtime_changes(tmp_path: Path, monkeypatch, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", "R_1k"), "Res_KSL", {})
+
+    real = dup_index._subdirs
+    listings = []
+    monkeypatch.setattr(dup_index, "_subdirs", lambda w: listings.append(w) or real(w))
+    dup_index.find(ws, ["R_1k"])
+    dup_index.find(ws, ["R_1k"])
+    assert len(listings) == 1
+
+    commit_to_library(ws, "C2", staged_part(tmp_path / "s", "C2", "C_1u"), "Cap_KSL", {})
+    assert dup_index.find(ws, ["C_1u"])[0]["library"] == "Cap_KSL"
+    assert len(listings) == 2
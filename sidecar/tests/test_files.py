@@ -259,3 +259,76 @@ def test_read_library_file_invalid_kind_raises(tmp_path):
 
     with pytest.raises(ValueError, match="Unsupported kind"):
         read_library_file(lib_dir, "A", "3d")
+
+
+def test_read_library_file_sym_returns_original_bytes(tmp_path):
+    lib_dir = _make_library_layout(tmp_path)
+    raw = (lib_dir / "Lib_KSL.kicad_sym").read_text(encoding="utf-8")
+
+    content = read_library_file(lib_dir, "B", "sym")
+
+    # Everything from B's opening paren up to the library's closing paren
+    start = raw.index('(symbol "B"')
+    body = raw[start:raw.rstrip().rindex(")")].rstrip()
+    assert body in content
+    assert content.startswith("(kicad_symbol_lib (version ")
+
+
+def test_read_library_file_sym_unit_name_resolves_to_owner(tmp_path):
+    from kiutils.symbol import Symbol, SymbolLib
+
+    lib_dir = tmp_path / "Lib_KSL"
+    lib_dir.mkdir()
+    lib = SymbolLib()
+    dual = Symbol.create_new(id="U_DUAL", reference="U", value="dual")
+    dual.units.append(Symbol.create_new(id="U_DUAL_1_1", reference="U", value="a"))
+    lib.symbols.append(dual)
+    lib.to_file(str(lib_dir / "Lib_KSL.kicad_sym"))
+
+    content = read_library_file(lib_dir, "U_DUAL_1_1", "sym")
+
+    assert '(symbol "U_DUAL"' in content
+    assert '(symbol "U_DUAL_1_1"' in content
+
+
+def test_read_library_file_sym_includes_base_of_derived_symbol(tmp_path):
+    lib_dir = tmp_path / "Lib_KSL"
+    lib_dir.mkdir()
+    (lib_dir / "Lib_KSL.kicad_sym").write_text(
+        '(kicad_symbol_lib (version 20231120) (generator "kicad_symbol_editor")\n'
+        '  (symbol "Base" (property "Reference" "U"))\n'
+        '  (symbol "Other" (property "Reference" "X"))\n'
+        '  (symbol "Derived" (extends "Base") (property "Value" "D"))\n'
+        ")\n",
+        encoding="utf-8",
+    )
+
+    content = read_library_file(lib_dir, "Derived", "sym")
+
+    assert '(symbol "Base"' in content
+    assert '(symbol "Derived"' in content
+    assert '"Other"' not in content
+
+
+def test_read_library_file_sym_sees_rewritten_library(tmp_path):
+    from kiutils.symbol import Symbol, SymbolLib
+
+    lib_dir = _make_library_layout(tmp_path)
+    assert '"alpha"' in read_library_file(lib_dir, "A", "sym")
+
+    lib = SymbolLib()
+    lib.symbols.append(Symbol.create_new(id="A", reference="A", value="alpha-renamed"))
+    lib.to_file(str(lib_dir / "Lib_KSL.kicad_sym"))
+
+    assert '"alpha-renamed"' in read_library_file(lib_dir, "A", "sym")
+
+
+def test_part_file_path_returns_3d_model_without_reading(tmp_path: Path):
+    from kibrary_sidecar.files import part_file_path
+
+    shapes = tmp_path / LCSC / f"{LCSC}.3dshapes"
+    shapes.mkdir(parents=True)
+    (shapes / "model.wrl").write_text("#VRML")
+    (shapes / "model.step").write_text("ISO-10303-21;")
+
+    assert part_file_path(tmp_path, LCSC, "3d") == shapes / "model.step"
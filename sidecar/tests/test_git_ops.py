@@ -6,6 +6,7 @@ import pytest
 
 from kibrary_sidecar.git_ops import (
     auto_commit,
+    auto_commit_many,
     init_repo,
     is_clean_repo,
     is_safe_to_commit,
@@ -189,3 +190,38 @@ def test_auto_commit_returns_none_when_unsafe(tmp_path: Path):
     (tmp_path / "f.txt").write_text("data")
     result = auto_commit(tmp_path, "should not commit", ["f.txt"])
     assert result is None
+
+
+def test_auto_commit_covers_files_below_directory_paths(tmp_path: Path):
+    repo = _make_repo(tmp_path)
+    _initial_commit(repo, tmp_path)
+    (tmp_path / "Lib").mkdir()
+    (tmp_path / "Lib" / "Lib.kicad_sym").write_text("(kicad_symbol_lib)")
+    sha = auto_commit(tmp_path, "add lib", ["Lib"])
+    assert sha is not None
+    assert "Lib/Lib.kicad_sym" in [b.path for b in repo.head.commit.tree.traverse()]
+
+
+def test_auto_commit_many_creates_one_commit_per_entry(tmp_path: Path):
+    repo = _make_repo(tmp_path)
+    _initial_commit(repo, tmp_path)
+    for name in ("A", "B"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "x.txt").write_text(name)
+    (tmp_path / "repository.json").write_text("{}")
+
+    shas = auto_commit_many(tmp_path, [("add A", ["A", "repository.json"]), ("add B", ["B"])])
+
+    assert len(shas) == 2 and all(shas)
+    assert [c.message for c in repo.iter_commits(max_count=2)] == ["add B", "add A"]
+    assert is_clean_repo(tmp_path)
+
+
+def test_auto_commit_many_skips_everything_when_dirty_elsewhere(tmp_path: Path):
+    repo = _make_repo(tmp_path)
+    _initial_commit(repo, tmp_path)
+    (tmp_path / "A").mkdir()
+    (tmp_path / "A" / "x.txt").write_text("A")
+    (tmp_path / "wip.txt").write_text("unrelated")
+
+    assert auto_commit_many(tmp_path, [("add A", ["A"])]) == [None]
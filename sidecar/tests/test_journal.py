@@ -0,0 +1,238 @@
+"""Tests for journal — atomic multi-file transactions and crash recovery."""
+import json
+from pathlib import Path
+
+import pytest
+
+from kibrary_sidecar import journal
+
+
+SYM = b"(kicad_symbol_lib\n  (symbol \"A\")\n)\n"
+CLOSE = SYM.rindex(b")")
+
+
+def _ws(tmp_path: Path) -> Path:
+    ws = tmp_path / "ws"
+    (ws / "Lib").mkdir(parents=True)
+    (ws / "Lib" / "Lib.kicad_sym").write_bytes(SYM)
+    (ws / "Lib" / "old.txt").write_text("old")
+    (ws / "repository.json").write_text('{"packages": []}')
+    return ws
+
+
+def _stage_all(tx: journal.Transaction, ws: Path) -> None:
+    tx.splice(ws / "Lib" / "Lib.kicad_sym", CLOSE, b"  (symbol \"B\")\n)\n")
+    tx.write(ws / "Lib" / "metadata.json", '{"name": "Lib"}')
+    tx.rename(ws / "Lib" / "old.txt", ws / "Lib" / "new.txt")
+    tx.write(ws / "repository.json", '{"packages": [{"path": "Lib/metadata.json"}]}')
+    tx.delete(ws / "Lib" / "new.txt")
+
+
+def _assert_applied(ws: Path) -> None:
+    assert (ws / "Lib" / "Lib.kicad_sym").read_bytes() == (
+        b"(kicad_symbol_lib\n  (symbol \"A\")\n  (symbol \"B\")\n)\n"
+    )
+    assert json.loads((ws / "Lib" / "metadata.json").read_text()) == {"name": "Lib"}
+    assert not (ws / "Lib" / "old.txt").exists()
+    assert not (ws / "Lib" / "new.txt").exists()
+    assert json.loads((ws / "repository.json").read_text())["packages"]
+    assert list(journal.journal_dir(ws).iterdir()) == []
+
+
+def test_transaction_applies_every_step_and_cleans_up(tmp_path):
+    ws = _ws(tmp_path)
+    with journal.transaction(ws, "test") as tx:
+        _stage_all(tx, ws)
+        # Nothing changes before the commit
+        assert not (ws / "Lib" / "metadata.json").exists()
+    _assert_applied(ws)
+
+
+def test_error_in_body_leaves_workspace_untouched(tmp_path):
+    ws = _ws(tmp_path)
+    before = {p: p.read_bytes() for p in ws.rglob("*") if p.is_file()}
+    with pytest.raises(RuntimeError):
+        with journal.transaction(ws, "test") as tx:
+            _stage_all(tx, ws)
+            raise RuntimeError("boom")
+    assert {p: p.read_bytes() for p in ws.rglob("*") if p.is_file()} == before
+
+
+def test_recover_finishes_a_transaction_interrupted_after_commit(tmp_path, monkeypatch):
+    ws = _ws(tmp_path)
+    real_move = journal._move
+    calls = []
+
+    def crash_on_second_move(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError("simulated crash")
+        real_move(src, dst)
+
+    monkeypatch.setattr(journal, "_move", crash_on_second_move)
+    with pytest.raises(OSError):
+        with journal.transaction(ws, "test") as tx:
+            _stage_all(tx, ws)
+    monkeypatch.setattr(journal, "_move", real_move)
+
+    # Half applied: the splice and metadata landed, the rename did not
+    assert not (ws / "Lib" / "new.txt").exists() and (ws / "Lib" / "old.txt").exists()
+    assert journal.recover(ws) == 1
+    _assert_applied(ws)
+    # Replaying a finished journal again is harmless
+    assert journal.recover(ws) == 0
+
+
+def test_recover_discards_uncommitted_transaction(tmp_path):
+    ws = _ws(tmp_path)
+    tx = journal.Transaction(ws, "test")
+    tx.write(ws / "repository.json", "garbage")  # staged, never committed
+    assert journal.recover(ws) == 1
+    assert not tx.dir.exists()
+    assert json.loads((ws / "repository.json").read_text()) == {"packages": []}
+
+
+def test_concurrent_recover_replays_a_leftover_once(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    ws = _ws(tmp_path)
+
+    def crash(*_args):
+        raise OSError("simulated crash")
+
+    real_move = journal._move
+    monkeypatch.setattr(journal, "_move", crash)
+    with pytest.raises(OSError):
+        with journal.transaction(ws, "test") as tx:
+            _stage_all(tx, ws)
+    monkeypatch.setattr(journal, "_move", real_move)
+
+    real_apply = journal._apply
+    applied = []
+
+    def slow_apply(*args):
+        applied.append(args[1])
+        time.sleep(0.1)
+        real_apply(*args)
+
+    monkeypatch.setattr(journal, "_apply", slow_apply)
+    found = []
+    threads = [threading.Thread(target=lambda: found.append(journal.recover(ws))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(applied) == 1
+    assert sorted(found) == [0, 1]
+    _assert_applied(ws)
+
+
+_CHILD_TX = """
+import sys
+from pathlib import Path
+from kibrary_sidecar import journal
+
+ws = Path(sys.argv[1])
+with journal.transaction(ws, "child") as tx:
+    tx.write(ws / "repository.json", '{"packages": ["child"]}')
+    print(tx.dir, flush=True)
+    sys.stdin.readline()
+"""
+
+
+def test_recover_leaves_another_processs_transaction_alone(tmp_path):
+    import subprocess
+    import sys
+
+    ws = _ws(tmp_path)
+    child = subprocess.Popen(
+        [sys.executable, "-c", _CHILD_TX, str(ws)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    try:
+        tx_dir = Path(child.stdout.readline().strip())
+        assert tx_dir.is_dir()
+        # In flight in the child: neither discarded nor replayed here
+        assert journal.recover(ws) == 0
+        assert tx_dir.is_dir()
+        assert json.loads((ws / "repository.json").read_text()) == {"packages": []}
+        child.communicate("\n", timeout=10)
+    finally:
+        child.kill()
+    assert child.returncode == 0
+    assert json.loads((ws / "repository.json").read_text()) == {"packages": ["child"]}
+    assert not tx_dir.exists()
+
+
+def test_recover_discards_transactions_of_exited_processes(tmp_path):
+    import subprocess
+    import sys
+
+    ws = _ws(tmp_path)
+    gone = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                          capture_output=True, text=True, check=True)
+    tx_dir = journal.journal_dir(ws) / f"0-{gone.stdout.strip()}-0"
+    tx_dir.mkdir(parents=True)
+    (tx_dir / "0-repository.json").write_text("garbage")  # never committed
+    assert journal.recover(ws) == 1
+    assert not tx_dir.exists()
+
+
+def test_splice_replay_is_idempotent(tmp_path):
+    ws = _ws(tmp_path)
+    tx = journal.Transaction(ws, "test")
+    tx.splice(ws / "Lib" / "Lib.kicad_sym", CLOSE, b"  (symbol \"B\")\n)\n")
+    steps = tx._steps
+    journal._apply(ws, tx.dir, steps)
+    once = (ws / "Lib" / "Lib.kicad_sym").read_bytes()
+    journal._apply(ws, tx.dir, steps)
+    assert (ws / "Lib" / "Lib.kicad_sym").read_bytes() == once
+
+
+def test_write_atomic_replaces_file_without_leftovers(tmp_path):
+    target = tmp_path / "metadata.json"
+    target.write_text("old")
+    journal.write_atomic(target, '{"name": "new"}')
+    assert target.read_text() == '{"name": "new"}'
+    assert [p.name for p in tmp_path.iterdir()] == ["metadata.json"]
+
+
+def test_library_merge_is_recovered_after_crash(tmp_path, monkeypatch):
+    from kiutils.symbol import SymbolLib
+
+    from kibrary_sidecar.library import commit_to_library
+
+    def staged(lcsc):
+        part = tmp_path / "staging" / lcsc
+        (part / f"{lcsc}.pretty").mkdir(parents=True)
+        (part / f"{lcsc}.kicad_sym").write_text(
+            f'(kicad_symbol_lib (version 20211014) (generator None)\n'
+            f'  (symbol "{lcsc}" (in_bom yes) (on_board yes)\n'
+            f'    (property "Reference" "R" (id 0) (at 0.0 0.0 0))\n'
+            f'  )\n)\n'
+        )
+        (part / f"{lcsc}.pretty" / f"{lcsc}.kicad_mod").write_text(f'(footprint "{lcsc}" (layer "F.Cu"))\n')
+        return part
+
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged("C1"), "Lib_KSL", {})
+
+    def crash(*_args):
+        raise OSError("simulated crash")
+
+    real_move = journal._move
+    monkeypatch.setattr(journal, "_move", crash)
+    with pytest.raises(OSError):
+        commit_to_library(ws, "C2", staged("C2"), "Lib_KSL", {})
+    monkeypatch.setattr(journal, "_move", real_move)
+
+    from kibrary_sidecar.workspace import open_workspace
+
+    open_workspace(str(ws))  # recovery runs on open
+    sym = ws / "Lib_KSL" / "Lib_KSL.kicad_sym"
+    assert [s.entryName for s in SymbolLib().from_file(str(sym)).symbols] == ["C1", "C2"]
+    assert (ws / "Lib_KSL" / "Lib_KSL.pretty" / "C2.kicad_mod").is_file()
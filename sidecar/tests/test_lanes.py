@@ -0,0 +1,58 @@
+"""Tests for lanes.py — RPC priority lane configuration."""
+
+import json
+
+import pytest
+
+from kibrary_sidecar import lanes
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    for var in (
+        "KIBRARY_SIDECAR_WORKERS",
+        "KIBRARY_SIDECAR_BACKGROUND_WORKERS",
+        "KIBRARY_SIDECAR_BULK_WORKERS",
+        "KIBRARY_SIDECAR_LANES",
+    ):
+        monkeypatch.delenv(var, raising=False)
+
+
+def _write_settings(tmp_path, rpc_lanes):
+    path = tmp_path / "kibrary" / "settings.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"rpc_lanes": rpc_lanes}))
+
+
+def test_defaults():
+    cfg = lanes.load_config()
+    assert cfg["workers"] == lanes.DEFAULT_WORKERS
+    assert lanes.lane_for("system.ping", cfg) == "interactive"
+    assert lanes.lane_for("library.list", cfg) == "background"
+    assert lanes.lane_for("library.backfill_icons", cfg) == "bulk"
+
+
+def test_settings_override_defaults(tmp_path):
+    _write_settings(tmp_path, {"workers": {"bulk": 3}, "methods": {"library.list": "interactive"}})
+    cfg = lanes.load_config()
+    assert cfg["workers"]["bulk"] == 3
+    assert lanes.lane_for("library.list", cfg) == "interactive"
+
+
+def test_env_overrides_settings(tmp_path, monkeypatch):
+    _write_settings(tmp_path, {"workers": {"interactive": 4}, "methods": {"search.query": "bulk"}})
+    monkeypatch.setenv("KIBRARY_SIDECAR_WORKERS", "2")
+    monkeypatch.setenv("KIBRARY_SIDECAR_LANES", "search.query=background, parts.read_file=bulk")
+    cfg = lanes.load_config()
+    assert cfg["workers"]["interactive"] == 2
+    assert lanes.lane_for("search.query", cfg) == "background"
+    assert lanes.lane_for("parts.read_file", cfg) == "bulk"
+
+
+def test_invalid_values_are_ignored(tmp_path, monkeypatch):
+    _write_settings(tmp_path, {"workers": {"bulk": 0, "nope": 5}, "methods": {"x.y": "urgent"}})
+    monkeypatch.setenv("KIBRARY_SIDECAR_BACKGROUND_WORKERS", "many")
+    cfg = lanes.load_config()
+    assert cfg["workers"] == lanes.DEFAULT_WORKERS
+    assert lanes.lane_for("x.y", cfg) == "interactive"
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from kibrary_sidecar import lazy
+
+SIDECAR_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_module_imports_on_first_attribute_access(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    proxy = lazy.module("colorsys")
+    assert "colorsys" not in sys.modules
+    assert "not loaded" in repr(proxy)
+
+    assert proxy.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert lazy.load(proxy) is sys.modules["colorsys"]
+
+
+def test_attribute_access_sees_patches_on_real_module(monkeypatch):
+    import colorsys
+
+    proxy = lazy.module("colorsys")
+    monkeypatch.setattr(colorsys, "ONE_THIRD", 0.5)
+    assert proxy.ONE_THIRD == 0.5
+
+
+def test_rpc_startup_does_not_import_heavy_subsystems():
+    # Fresh interpreter: the test session itself has imported everything.
+    code = (
+        "import sys, kibrary_sidecar.rpc\n"
+        "heavy = ['git', 'kiutils', 'httpx', 'keyring', 'JLC2KiCadLib']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=SIDECAR_DIR, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == ""
@@ -0,0 +1,134 @@
+"""Tests for lib_index.py — persistent parsed-library index."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from kibrary_sidecar import lib_index
+from kibrary_sidecar.lib_scanner import get_component, list_components, list_libraries
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_unchanged_library_is_not_reparsed(tmp_path: Path, parse_counter, make_lib):
+    lib_dir = make_lib(tmp_path, "Res_KSL", ["R_1k", "R_2k"])
+
+    list_libraries(tmp_path)
+    list_components(lib_dir)
+    get_component(lib_dir, "R_1k")
+
+    assert parse_counter == ["Res_KSL"]
+
+
+def test_modified_library_is_reparsed(tmp_path: Path, parse_counter, make_lib):
+    lib_dir = make_lib(tmp_path, "Res_KSL", ["R_1k"])
+    assert [c["name"] for c in list_components(lib_dir)] == ["R_1k"]
+
+    make_lib(tmp_path, "Res_KSL", ["R_1k", "R_4k7"])
+
+    assert [c["name"] for c in list_components(lib_dir)] == ["R_1k", "R_4k7"]
+    assert parse_counter == ["Res_KSL", "Res_KSL"]
+
+
+def test_iter_library_yields_while_scanning_and_stores_the_result(tmp_path: Path, parse_counter, make_lib):
+    lib_dir = make_lib(tmp_path, "Res_KSL", ["R_1k", "R_2k", "R_4k7"])
+
+    abandoned = lib_index.iter_library(lib_dir)
+    assert next(abandoned)["name"] == "R_1k"
+    abandoned.close()
+    assert lib_index.peek(lib_dir) is None
+
+    it = lib_index.iter_library(lib_dir)
+    assert next(it)["name"] == "R_1k"
+    assert lib_index.peek(lib_dir) is None  # still scanning
+    assert [sym["name"] for sym in it] == ["R_2k", "R_4k7"]
+
+    assert lib_index.peek(lib_dir)["component_count"] == 3
+    assert [c["name"] for c in list_components(lib_dir)] == ["R_1k", "R_2k", "R_4k7"]
+    assert parse_counter == []
+
+
+def test_new_footprint_invalidates_paths(tmp_path: Path, make_lib):
+    lib_dir = make_lib(tmp_path, "Res_KSL", ["R_1k"])
+    pretty = lib_dir / "Res_KSL.pretty"
+    pretty.mkdir()
+    assert get_component(lib_dir, "R_1k")["footprint_path"] is None
+
+    (pretty / "R_1k.kicad_mod").write_text('(footprint "R_1k")\n')
+
+    assert get_component(lib_dir, "R_1k")["footprint_path"] == pretty / "R_1k.kicad_mod"
+
+
+def test_index_persisted_for_opened_workspace(tmp_path: Path, parse_counter, make_lib):
+    (tmp_path / ".kibrary" / "cache").mkdir(parents=True)
+    make_lib(tmp_path, "Caps_KSL", ["C_1u", "C_10u"])
+
+    list_libraries(tmp_path)
+
+    index_file = tmp_path / ".kibrary" / "cache" / "lib_index.json"
+    payload = json.loads(index_file.read_text())
+    entry = payload["libraries"]["Caps_KSL"]
+    assert entry["component_count"] == 2
+    assert [s["name"] for s in entry["symbols"]] == ["C_1u", "C_10u"]
+
+    # A new process (simulated by dropping the in-memory copy) is served
+    # from disk without touching the .kicad_sym.
+    lib_index.invalidate()
+    result = list_libraries(tmp_path)
+    assert result[0]["component_count"] == 2
+    assert parse_counter == ["Caps_KSL"]
+
+
+def test_index_not_written_outside_opened_workspace(tmp_path: Path, make_lib):
+    make_lib(tmp_path, "Caps_KSL", ["C_1u"])
+    list_libraries(tmp_path)
+    assert not (tmp_path / ".kibrary").exists()
+
+
+def test_corrupt_index_file_is_ignored(tmp_path: Path, make_lib):
+    cache = tmp_path / ".kibrary" / "cache"
+    cache.mkdir(parents=True)
+    (cache / "lib_index.json").write_text("{not json")
+    make_lib(tmp_path, "Caps_KSL", ["C_1u"])
+
+    assert list_libraries(tmp_path)[0]["component_count"] == 1
+
+
+def test_removed_library_is_pruned(tmp_path: Path, make_lib):
+    (tmp_path / ".kibrary" / "cache").mkdir(parents=True)
+    make_lib(tmp_path, "A_KSL", ["X"])
+    lib_b = make_lib(tmp_path, "B_KSL", ["Y"])
+    list_libraries(tmp_path)
+
+    (lib_b / "B_KSL.kicad_sym").unlink()
+    list_libraries(tmp_path)
+
+    payload = json.loads((tmp_path / ".kibrary" / "cache" / "lib_index.json").read_text())
+    assert set(payload["libraries"]) == {"A_KSL"}
+
+
+def test_flush_writes_outside_the_index_lock(tmp_path: Path, make_lib, monkeypatch):
+    (tmp_path / ".kibrary").mkdir()
+    make_lib(tmp_path, "Caps_KSL", ["C_1u"])
+    from kibrary_sidecar import journal
+
+    real = journal.write_atomic
+    lock_free = []
+
+    def checking(path, data):
+        lock_free.append(lib_index._lock.acquire(blocking=False))
+        if lock_free[-1]:
+            lib_index._lock.release()
+        real(path, data)
+
+    monkeypatch.setattr(journal, "write_atomic", checking)
+    list_libraries(tmp_path)
+
+    assert lock_free == [True]
+    payload = json.loads((tmp_path / ".kibrary" / "cache" / "lib_index.json").read_text())
+    assert list(payload["libraries"]) == ["Caps_KSL"]
@@ -208,3 +208,48 @@ def test_list_libraries_path_field(tmp_path: Path):
     result = list_libraries(tmp_path)
     assert len(result) == 1
     assert result[0]["path"] == lib_dir
+
+
+# ---------------------------------------------------------------------------
+# Test 9: parallel scan returns the same sorted result as a sequential one
+# ---------------------------------------------------------------------------
+
+def test_list_libraries_parallel_matches_sequential(tmp_path: Path):
+    from kibrary_sidecar import lib_index
+
+    for i in range(6):
+        _make_lib_dir(
+            tmp_path,
+            f"Lib{i}_KSL",
+            [(f"P{i}_{j}", "U", str(j)) for j in range(i + 1)],
+        )
+
+    lib_index.invalidate()
+    parallel = list_libraries(tmp_path, workers=3)
+    lib_index.invalidate(tmp_path)
+    sequential = list_libraries(tmp_path, workers=1)
+
+    assert parallel == sequential
+    assert [lib["name"] for lib in parallel] == [f"Lib{i}_KSL" for i in range(6)]
+    assert [lib["component_count"] for lib in parallel] == [1, 2, 3, 4, 5, 6]
+
+
+# ---------------------------------------------------------------------------
+# Test 10: fast mode counts without refreshing the index
+# ---------------------------------------------------------------------------
+
+def test_list_libraries_fast_counts_without_indexing(tmp_path: Path, monkeypatch):
+    from kibrary_sidecar import lib_index
+
+    (tmp_path / ".kibrary" / "cache").mkdir(parents=True)
+    _make_lib_dir(tmp_path, "Caps_KSL", [("C1", "C", "1"), ("C2", "C", "2")])
+    lib_index.invalidate()
+
+    def no_scan(_lib_dir):
+        raise AssertionError("fast mode must not run a full scan")
+
+    monkeypatch.setattr(lib_index, "build_entry", no_scan)
+    result = list_libraries(tmp_path, fast=True)
+
+    assert [(lib["name"], lib["component_count"]) for lib in result] == [("Caps_KSL", 2)]
+    assert not (tmp_path / ".kibrary" / "cache" / "lib_index.json").exists()
@@ -263,3 +263,138 @@ def test_commit_returns_valid_existing_path(tmp_path: Path):
     assert isinstance(result, Path)
     assert result.exists()
     assert result.is_dir()
+
+
+# ---------------------------------------------------------------------------
+# Test 6: merge splices the prepared symbol in without touching the rest
+# ---------------------------------------------------------------------------
+
+def _make_staging_named(base: Path, lcsc: str, value: str) -> Path:
+    staging_part = base / lcsc
+    pretty = staging_part / f"{lcsc}.pretty"
+    pretty.mkdir(parents=True)
+    (staging_part / f"{lcsc}.kicad_sym").write_text(
+        f'(kicad_symbol_lib (version 20211014) (generator None)\n'
+        f'  (symbol "{lcsc}" (in_bom yes) (on_board yes)\n'
+        f'    (property "Reference" "R" (id 0) (at 0.0 0.0 0))\n'
+        f'    (property "Value" "{value}" (id 1) (at 0.0 0.0 0))\n'
+        f'    (property "Footprint" ".:R_0402" (id 2) (at 0.0 0.0 0))\n'
+        f'  )\n'
+        f')\n'
+    )
+    (pretty / "R_0402.kicad_mod").write_text(
+        '(footprint "R_0402"\n  (version 20211014)\n  (generator pcbnew)\n  (layer "F.Cu")\n)\n'
+    )
+    return staging_part
+
+
+def test_merge_edits_incoming_symbol_and_keeps_existing_bytes(tmp_path: Path):
+    from kiutils.symbol import SymbolLib
+
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    target_lib = "Resistors_KSL"
+    commit_to_library(
+        workspace, "C1", _make_staging_named(tmp_path / "s", "C1", "1k"), target_lib, {}
+    )
+    sym_path = workspace / target_lib / f"{target_lib}.kicad_sym"
+    before = sym_path.read_bytes()
+
+    commit_to_library(
+        workspace,
+        "C2",
+        _make_staging_named(tmp_path / "s", "C2", "2k"),
+        target_lib,
+        {"Description": "2k resistor"},
+    )
+
+    after = sym_path.read_bytes()
+    # Everything up to the old closing paren is untouched
+    assert after.startswith(before[: before.rstrip().rfind(b")")])
+    symbols = {s.entryName: s for s in SymbolLib().from_file(str(sym_path)).symbols}
+    assert list(symbols) == ["C1", "C2"]
+    props_1 = {p.key: p.value for p in symbols["C1"].properties}
+    props_2 = {p.key: p.value for p in symbols["C2"].properties}
+    # Edits land on the incoming part, not on the library's first symbol
+    assert "Description" not in props_1
+    assert props_2["Description"] == "2k resistor"
+    assert props_2["Footprint"] == f"{target_lib}:R_0402"
+
+
+def test_merge_into_library_without_symbols(tmp_path: Path):
+    from kiutils.symbol import SymbolLib
+
+    workspace = tmp_path / "workspace"
+    target_lib = "Empty_KSL"
+    lib_dir = workspace / target_lib
+    lib_dir.mkdir(parents=True)
+    sym_path = lib_dir / f"{target_lib}.kicad_sym"
+    sym_path.write_text("(kicad_symbol_lib (version 20211014) (generator kicad_symbol_editor))")
+
+    commit_to_library(workspace, "C3", _make_staging_named(tmp_path / "s", "C3", "3k"), target_lib, {})
+
+    names = [s.entryName for s in SymbolLib().from_file(str(sym_path)).symbols]
+    assert names == ["C3"]
+
+
+# ---------------------------------------------------------------------------
+# Test 7: commit_many — one write per library, one repository.json update
+# ---------------------------------------------------------------------------
+
+def test_commit_many_groups_parts_by_library(tmp_path: Path):
+    from kiutils.symbol import SymbolLib
+
+    from kibrary_sidecar.library import commit_many, iter_commit_many
+
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    commit_to_library(workspace, "C1", _make_staging_named(tmp_path / "s", "C1", "1k"), "Resistors_KSL", {})
+    (workspace / "repository.json").write_text('{"packages": [{"path": "Resistors_KSL/metadata.json"}]}')
+    broken = tmp_path / "s" / "C9"
+    broken.mkdir()
+    (broken / "C9.kicad_sym").write_text("not a symbol library")
+
+    parts = [
+        {"lcsc": "C2", "staging_part": _make_staging_named(tmp_path / "s", "C2", "2k"),
+         "target_lib": "Resistors_KSL", "edits": {"Description": "2k resistor"}},
+        {"lcsc": "C5", "staging_part": _make_staging_named(tmp_path / "s", "C5", "5p"),
+         "target_lib": "Capacitors_KSL", "edits": {}},
+        {"lcsc": "C9", "staging_part": broken, "target_lib": "Resistors_KSL", "edits": {}},
+        {"lcsc": "C3", "staging_part": _make_staging_named(tmp_path / "s", "C3", "3k"),
+         "target_lib": "Resistors_KSL", "edits": {}},
+    ]
+    gen = iter_commit_many(workspace, parts)
+    # Results arrive per library, in first-seen order
+    first = [next(gen) for _ in range(3)]
+    assert [(r["lcsc"], r["ok"]) for r in first] == [("C2", True), ("C9", False), ("C3", True)]
+    assert not (workspace / "Capacitors_KSL").exists()
+    assert next(gen)["component_name"] == "C5"
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    summary = stop.value.value
+    assert summary["committed"] == 3 and summary["failed"] == 1
+    assert summary["libraries"] == {
+        "Resistors_KSL": {"new": False, "parts": [
+            {"lcsc": "C2", "description": "2k resistor"}, {"lcsc": "C3", "description": "C3"},
+        ]},
+        "Capacitors_KSL": {"new": True, "parts": [{"lcsc": "C5", "description": "C5"}]},
+    }
+
+    res_sym = workspace / "Resistors_KSL" / "Resistors_KSL.kicad_sym"
+    assert [s.entryName for s in SymbolLib().from_file(str(res_sym)).symbols] == ["C1", "C2", "C3"]
+    assert (workspace / "Capacitors_KSL" / "metadata.json").is_file()
+    assert (workspace / "Capacitors_KSL" / "Capacitors_KSL.pretty" / "R_0402.kicad_mod").is_file()
+    packages = json.loads((workspace / "repository.json").read_text())["packages"]
+    assert packages == [
+        {"path": "Resistors_KSL/metadata.json"},
+        {"path": "Capacitors_KSL/metadata.json"},
+    ]
+
+    again = commit_many(workspace, [
+        {"lcsc": "C4", "staging_part": _make_staging_named(tmp_path / "s", "C4", "4k"),
+         "target_lib": "Resistors_KSL", "edits": {}},
+    ])
+    assert again["results"] == [
+        {"lcsc": "C4", "target_lib": "Resistors_KSL", "ok": True, "component_name": "C4"},
+    ]
+    assert len(json.loads((workspace / "repository.json").read_text())["packages"]) == 2
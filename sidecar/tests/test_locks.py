@@ -0,0 +1,111 @@
+"""Tests for locks — per-library write locks."""
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from kibrary_sidecar import locks
+
+
+def _holder(path: Path, entered: threading.Event, release: threading.Event) -> threading.Thread:
+    def run():
+        with locks.hold(path):
+            entered.set()
+            release.wait(5)
+
+    t = threading.Thread(target=run)
+    t.start()
+    assert entered.wait(5)
+    return t
+
+
+def test_same_library_serialises_other_libraries_do_not(tmp_path):
+    release = threading.Event()
+    holder = _holder(tmp_path / "A_KSL", threading.Event(), release)
+
+    # A different library is free
+    with locks.hold(tmp_path / "B_KSL"):
+        pass
+
+    got_a = threading.Event()
+
+    def wait_for_a():
+        with locks.hold(tmp_path / "A_KSL"):
+            got_a.set()
+
+    waiter = threading.Thread(target=wait_for_a)
+    waiter.start()
+    assert not got_a.wait(0.2)
+    release.set()
+    holder.join(5)
+    assert got_a.wait(5)
+    waiter.join(5)
+
+
+def test_hold_is_reentrant(tmp_path):
+    lib = tmp_path / "A_KSL"
+    with locks.hold(lib):
+        with locks.hold(lib, tmp_path / "B_KSL"):
+            pass
+        with locks.hold(lib):
+            pass
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock probe is POSIX-only")
+def test_file_lock_blocks_other_processes(tmp_path):
+    lib = tmp_path / "A_KSL"
+    probe = (
+        "import fcntl, sys\n"
+        "fh = open(sys.argv[1], 'a+b')\n"
+        "try:\n"
+        "    fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+        "except BlockingIOError:\n"
+        "    sys.exit(3)\n"
+    )
+    lock_path = str(locks._lock_path(locks._key(lib)))
+    with locks.hold(lib):
+        assert subprocess.run([sys.executable, "-c", probe, lock_path]).returncode == 3
+    assert subprocess.run([sys.executable, "-c", probe, lock_path]).returncode == 0
+
+
+def test_parallel_commits_to_one_library_keep_every_symbol(tmp_path):
+    from kiutils.symbol import SymbolLib
+
+    from kibrary_sidecar.library import commit_to_library
+
+    def staged(lcsc):
+        part = tmp_path / "staging" / lcsc
+        (part / f"{lcsc}.pretty").mkdir(parents=True)
+        (part / f"{lcsc}.kicad_sym").write_text(
+            f'(kicad_symbol_lib (version 20211014) (generator None)\n'
+            f'  (symbol "{lcsc}" (in_bom yes) (on_board yes)\n'
+            f'    (property "Reference" "R" (id 0) (at 0.0 0.0 0))\n'
+            f'  )\n)\n'
+        )
+        (part / f"{lcsc}.pretty" / f"{lcsc}.kicad_mod").write_text(f'(footprint "{lcsc}" (layer "F.Cu"))\n')
+        return part
+
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    lcscs = [f"C{i}" for i in range(12)]
+    parts = {lcsc: staged(lcsc) for lcsc in lcscs}
+    threads = [
+        threading.Thread(target=commit_to_library, args=(ws, lcsc, parts[lcsc], "Lib_KSL", {}))
+        for lcsc in lcscs
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+    sym = ws / "Lib_KSL" / "Lib_KSL.kicad_sym"
+    assert sorted(s.entryName for s in SymbolLib().from_file(str(sym)).symbols) == sorted(lcscs)
+    assert (ws / "repository.json").read_text().count("Lib_KSL/metadata.json") == 1
+
+
+def test_lock_files_live_in_the_user_cache(tmp_path, user_cache):
+    with locks.hold(tmp_path / "Lib"):
+        pass
+    assert list((user_cache / "kibrary" / "locks").glob("*.lock"))
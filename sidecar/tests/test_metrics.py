@@ -0,0 +1,68 @@
+"""Tests for metrics.py — per-method RPC timing counters."""
+
+import json
+
+import pytest
+
+from kibrary_sidecar import metrics
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_counts_outcomes_and_in_flight():
+    ok = metrics.queued("a.ok")
+    ok.start()
+    assert metrics.snapshot()["methods"]["a.ok"]["in_flight"] == 1
+    ok.finish("ok")
+
+    err = metrics.queued("a.ok")
+    err.start()
+    err.finish("error")
+
+    dropped = metrics.queued("a.ok")
+    dropped.finish("cancelled")  # cancelled while still queued
+
+    snap = metrics.snapshot()
+    stats = snap["methods"]["a.ok"]
+    assert (stats["count"], stats["errors"], stats["cancelled"]) == (3, 1, 1)
+    assert stats["in_flight"] == 0 and snap["in_flight"] == 0
+    assert stats["latency_ms"]["count"] == 2
+    assert stats["queue_wait_ms"]["count"] == 3
+
+
+def test_percentiles_are_bucket_bounds_capped_at_max():
+    hist = metrics._new_histogram()
+    for value in [0.5] * 90 + [40.0] * 9 + [700.0]:
+        metrics._observe(hist, value)
+
+    summary = metrics._summary(hist)
+    assert summary["p50"] == 1
+    assert summary["p90"] == 1
+    assert summary["p99"] == 50
+    assert summary["max"] == 700.0
+    assert summary["buckets"] == {"1": 90, "50": 9, "1000": 1}
+
+
+def test_dumper_appends_jsonl(tmp_path, monkeypatch):
+    path = tmp_path / "m" / "metrics.jsonl"
+    monkeypatch.setenv("KIBRARY_SIDECAR_METRICS_FILE", str(path))
+    call = metrics.queued("b")
+    call.start()
+    call.finish("ok")
+
+    dumper = metrics.start_dumper()
+    dumper.stop()  # always writes a final snapshot
+
+    lines = [json.loads(ln) for ln in path.read_text().splitlines()]
+    assert lines[-1]["methods"]["b"]["count"] == 1
+    assert "ts" in lines[-1]
+
+
+def test_no_dumper_without_env(monkeypatch):
+    monkeypatch.delenv("KIBRARY_SIDECAR_METRICS_FILE", raising=False)
+    assert metrics.start_dumper() is None
@@ -0,0 +1,73 @@
+"""Tests for prewarm.py — background warm-up after start-up."""
+
+import time
+
+import pytest
+
+from kibrary_sidecar import lib_index, metrics, prewarm
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("KIBRARY_SIDECAR_PREWARM", "0")
+    lib_index.invalidate()
+    yield
+    lib_index.invalidate()
+
+
+def test_workspace_opened_is_remembered(tmp_path):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    assert prewarm.last_workspace() is None
+
+    prewarm.workspace_opened(ws)
+    assert prewarm.last_workspace() == ws
+
+    ws.rmdir()
+    assert prewarm.last_workspace() is None
+
+
+def test_warm_workspace_builds_and_persists_index(tmp_path, make_lib):
+    ws = tmp_path / "ws"
+    (ws / ".kibrary" / "cache").mkdir(parents=True)
+    lib_a = make_lib(ws, "A_KSL", ["R1", "R2"])
+    make_lib(ws, "B_KSL", ["C1"])
+
+    assert prewarm.warm_workspace(ws) == 2
+    assert (ws / ".kibrary" / "cache" / "lib_index.json").is_file()
+    assert lib_index.peek(lib_a)["component_count"] == 2
+
+
+def test_warm_workspace_skips_broken_library(tmp_path, make_lib):
+    ws = tmp_path / "ws"
+    make_lib(ws, "Good_KSL", ["R1"])
+    bad = ws / "Bad_KSL"
+    bad.mkdir()
+    (bad / "Bad_KSL.kicad_sym").write_text("(kicad_symbol_lib (symbol")
+
+    assert prewarm.warm_workspace(ws) == 2
+    assert lib_index.peek(ws / "Good_KSL") is not None
+
+
+def test_warm_modules_tolerates_failures(monkeypatch):
+    from kibrary_sidecar import kicad_install
+
+    monkeypatch.setattr(kicad_install, "cached_installs", lambda: 1 / 0)
+    prewarm.warm_modules()  # logged, not raised
+
+
+def test_start_is_a_noop_when_disabled():
+    assert prewarm.start() is False
+
+
+def test_yields_while_requests_are_in_flight(monkeypatch):
+    monkeypatch.setattr(prewarm, "_MAX_DEFER_S", 0.2)
+    call = metrics.queued("test.busy")
+    call.start()
+    try:
+        t0 = time.monotonic()
+        prewarm._yield_to_requests()
+        assert time.monotonic() - t0 >= 0.2
+    finally:
+        call.finish("ok")
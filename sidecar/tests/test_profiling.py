@@ -0,0 +1,70 @@
+import pstats
+import time
+
+import pytest
+
+from kibrary_sidecar import profiling
+
+
+@pytest.fixture(autouse=True)
+def _no_session():
+    yield
+    profiling.stop()
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+    return n
+
+
+def test_handler_is_noop_without_session():
+    assert not profiling.is_active()
+    with profiling.handler("system.ping"):
+        pass
+    assert profiling.stop() is None
+
+
+def test_sample_mode_writes_collapsed_stacks(tmp_path):
+    profiling.start(tmp_path, mode="sample", interval_ms=1)
+    with profiling.handler("library.list"):
+        _busy(0.1)
+    result = profiling.stop()
+
+    assert result["mode"] == "sample"
+    assert result["samples"] > 0
+    path = tmp_path / ".kibrary" / "cache" / "profiles"
+    assert result["path"].startswith(str(path))
+    lines = open(result["path"], encoding="utf-8").read().splitlines()
+    assert any(line.startswith("library.list;") and "_busy" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_cprofile_mode_writes_pstats(tmp_path):
+    profiling.start(tmp_path, mode="cprofile")
+    with profiling.handler("library.list"):
+        _busy(0.01)
+    result = profiling.stop()
+
+    assert result["calls"] == 1
+    stats = pstats.Stats(result["path"])
+    assert any(func[2] == "_busy" for func in stats.stats)
+
+
+def test_start_twice_and_bad_mode_raise(tmp_path):
+    with pytest.raises(ValueError):
+        profiling.start(tmp_path, mode="perf")
+    profiling.start(tmp_path)
+    with pytest.raises(RuntimeError):
+        profiling.start(tmp_path)
+
+
+def test_sessions_in_the_same_second_get_separate_files(tmp_path):
+    paths = set()
+    for _ in range(2):
+        profiling.start(tmp_path, mode="sample")
+        paths.add(profiling.stop()["path"])
+    assert len(paths) == 2
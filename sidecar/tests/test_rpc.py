@@ -83,3 +83,380 @@ def test_handler_exception_returns_handler_error_and_traceback_to_stderr(monkeyp
         assert "Traceback" in stderr.getvalue()
     finally:
         methods.REGISTRY.pop("test.boom", None)
+
+
+def test_batch_returns_sub_responses_in_order():
+    batch = {
+        "id": 9,
+        "method": "$/batch",
+        "params": {
+            "requests": [
+                {"id": 1, "method": "system.ping", "params": {}},
+                {"id": 2, "method": "does.not.exist", "params": {}},
+                {"id": 3, "method": "system.version", "params": {}},
+            ]
+        },
+    }
+    lines, _err = run_raw(json.dumps(batch) + "\n")
+    assert len(lines) == 1
+    resp = lines[0]
+    assert resp["id"] == 9 and resp["ok"] is True
+    subs = resp["result"]["responses"]
+    assert [s["id"] for s in subs] == [1, 2, 3]
+    assert subs[0] == {"id": 1, "ok": True, "result": {"pong": True}}
+    assert subs[1]["error"]["code"] == "UNKNOWN_METHOD"
+    assert "version" in subs[2]["result"]
+
+
+def test_batch_stream_emits_items_then_count():
+    batch = {
+        "id": 4,
+        "method": "$/batch",
+        "params": {
+            "stream": True,
+            "requests": [{"id": i, "method": "system.ping", "params": {}} for i in range(5)],
+        },
+    }
+    lines, _err = run_raw(json.dumps(batch) + "\n")
+    items = [ln for ln in lines if ln.get("event") == "batch.item"]
+    assert sorted(it["params"]["index"] for it in items) == list(range(5))
+    assert all(it["params"]["batch_id"] == 4 for it in items)
+    # The final response comes last, after every item
+    assert lines[-1] == {"id": 4, "ok": True, "result": {"count": 5}}
+
+
+def test_batch_with_bad_params_returns_bad_request():
+    lines, _err = run_raw('{"id":5,"method":"$/batch","params":{"requests":"nope"}}\n')
+    assert lines[0]["id"] == 5
+    assert lines[0]["error"]["code"] == "BAD_REQUEST"
+
+
+def _serve_lines(monkeypatch, lines):
+    """Run rpc.serve in-process over *lines* (an iterable) and return the
+    parsed stdout lines."""
+    import io
+    from kibrary_sidecar import rpc
+
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdin", lines)
+    monkeypatch.setattr(sys, "stdout", stdout)
+    monkeypatch.setattr(sys, "stderr", io.StringIO())
+    rpc.serve()
+    return [json.loads(ln) for ln in stdout.getvalue().splitlines() if ln.strip()]
+
+
+def test_cancel_drops_queued_request(monkeypatch):
+    import threading
+    from kibrary_sidecar import methods, rpc
+
+    release = threading.Event()
+    ran = []
+    methods.REGISTRY["test.block"] = lambda _p: release.wait(5) and {"done": True}
+    methods.REGISTRY["test.record"] = lambda _p: ran.append(1) or {}
+    monkeypatch.setenv("KIBRARY_SIDECAR_WORKERS", "1")
+
+    def lines():
+        yield '{"id":1,"method":"test.block","params":{}}\n'
+        yield '{"id":2,"method":"test.record","params":{}}\n'
+        yield '{"id":3,"method":"$/cancel","params":{"id":2}}\n'
+        release.set()
+
+    try:
+        out = _serve_lines(monkeypatch, lines())
+    finally:
+        methods.REGISTRY.pop("test.block", None)
+        methods.REGISTRY.pop("test.record", None)
+
+    by_id = {}
+    for resp in out:
+        assert resp["id"] not in by_id, "each request must be answered once"
+        by_id[resp["id"]] = resp
+    assert by_id[2]["error"]["code"] == "CANCELLED"
+    assert by_id[3]["result"] == {"cancelled": True}
+    assert by_id[1]["result"] == {"done": True}
+    assert ran == []
+
+
+def test_cancel_running_sync_handler_is_cooperative(monkeypatch):
+    import threading
+    from kibrary_sidecar import cancellation, methods
+
+    started = threading.Event()
+
+    def spin(_p):
+        started.set()
+        while True:
+            cancellation.check()
+            threading.Event().wait(0.01)
+
+    methods.REGISTRY["test.spin"] = spin
+
+    def lines():
+        yield '{"id":1,"method":"test.spin","params":{}}\n'
+        assert started.wait(5)
+        yield '{"id":2,"method":"$/cancel","params":{"id":1}}\n'
+
+    try:
+        out = _serve_lines(monkeypatch, lines())
+    finally:
+        methods.REGISTRY.pop("test.spin", None)
+
+    responses = [r for r in out if r["id"] == 1]
+    assert len(responses) == 1
+    assert responses[0]["error"]["code"] == "CANCELLED"
+
+
+def test_cancel_async_handler_cancels_its_task(monkeypatch):
+    import asyncio
+    import threading
+    from kibrary_sidecar.downloader import ASYNC_REGISTRY
+
+    started = threading.Event()
+
+    async def sleepy(_p, _emit):
+        started.set()
+        await asyncio.sleep(30)
+        return {"slept": True}
+
+    ASYNC_REGISTRY["test.sleepy"] = sleepy
+
+    def lines():
+        yield '{"id":1,"method":"test.sleepy","params":{}}\n'
+        assert started.wait(5)
+        yield '{"id":2,"method":"$/cancel","params":{"id":1}}\n'
+
+    try:
+        out = _serve_lines(monkeypatch, lines())
+    finally:
+        ASYNC_REGISTRY.pop("test.sleepy", None)
+
+    assert [r["error"]["code"] for r in out if r["id"] == 1] == ["CANCELLED"]
+
+
+def test_cancel_unknown_id_reports_not_cancelled():
+    lines, _err = run_raw('{"id":4,"method":"$/cancel","params":{"id":99}}\n')
+    assert lines == [{"id": 4, "ok": True, "result": {"cancelled": False}}]
+
+
+def test_async_handlers_do_not_hold_sync_workers(monkeypatch):
+    """With a single sync worker, a long async handler must not block sync calls."""
+    import asyncio
+    import threading
+    from kibrary_sidecar import methods, rpc
+    from kibrary_sidecar.downloader import ASYNC_REGISTRY
+
+    started = threading.Event()
+    synced = threading.Event()
+
+    async def long_running(_p, _emit):
+        started.set()
+        for _ in range(500):
+            if synced.is_set():
+                break
+            await asyncio.sleep(0.01)
+        return {"loop_thread": threading.current_thread().name}
+
+    ASYNC_REGISTRY["test.long"] = long_running
+    methods.REGISTRY["test.sync"] = lambda _p: synced.set() or {}
+    monkeypatch.setenv("KIBRARY_SIDECAR_WORKERS", "1")
+
+    def lines():
+        yield '{"id":1,"method":"test.long","params":{}}\n'
+        yield '{"id":2,"method":"test.long","params":{}}\n'
+        assert started.wait(5)
+        yield '{"id":3,"method":"test.sync","params":{}}\n'
+        assert synced.wait(5)
+
+    try:
+        out = _serve_lines(monkeypatch, lines())
+    finally:
+        ASYNC_REGISTRY.pop("test.long", None)
+        methods.REGISTRY.pop("test.sync", None)
+
+    by_id = {r["id"]: r for r in out}
+    # Both async handlers ran on the same dedicated loop thread
+    assert by_id[1]["result"] == by_id[2]["result"] == {"loop_thread": "rpc-async"}
+    assert by_id[3]["ok"] is True
+
+
+def test_bulk_lane_does_not_block_interactive_calls(monkeypatch):
+    import threading
+    from kibrary_sidecar import methods
+
+    release = threading.Event()
+    methods.REGISTRY["test.bulk"] = lambda _p: release.wait(5) and {"bulk": True}
+    monkeypatch.setenv("KIBRARY_SIDECAR_LANES", "test.bulk=bulk")
+    monkeypatch.setenv("KIBRARY_SIDECAR_BULK_WORKERS", "1")
+
+    answered = []
+
+    def lines():
+        yield '{"id":1,"method":"test.bulk","params":{}}\n'
+        yield '{"id":2,"method":"test.bulk","params":{}}\n'
+        yield '{"id":3,"method":"system.ping","params":{}}\n'
+        # ping must complete while both bulk calls are still blocked
+        for _ in range(500):
+            if '"id":3' in sys.stdout.getvalue():
+                answered.append(3)
+                break
+            threading.Event().wait(0.01)
+        release.set()
+
+    try:
+        out = _serve_lines(monkeypatch, lines())
+    finally:
+        methods.REGISTRY.pop("test.bulk", None)
+
+    assert answered == [3]
+    assert [r["id"] for r in out][0] == 3
+    assert {r["id"] for r in out} == {1, 2, 3}
+
+
+def test_streamed_handler_sends_chunks_then_final(monkeypatch):
+    from kibrary_sidecar import methods, streaming
+
+    def handler(p):
+        def pages():
+            yield from streaming.paged(range(5), 2)
+            return {"done": True}
+        return streaming.Stream(pages())
+
+    methods.REGISTRY["test.stream"] = handler
+    try:
+        out = _serve_lines(monkeypatch, ['{"id":6,"method":"test.stream","params":{}}\n'])
+    finally:
+        methods.REGISTRY.pop("test.stream", None)
+
+    chunks = [ln["params"] for ln in out if ln.get("event") == "stream.chunk"]
+    assert chunks == [
+        {"id": 6, "seq": 0, "items": [0, 1]},
+        {"id": 6, "seq": 1, "items": [2, 3]},
+        {"id": 6, "seq": 2, "items": [4]},
+    ]
+    assert out[-1] == {"id": 6, "ok": True, "result": {"done": True, "count": 5, "chunks": 3}}
+
+
+def test_system_metrics_reports_handled_calls(monkeypatch):
+    from kibrary_sidecar import metrics
+
+    metrics.reset()
+    out = _serve_lines(monkeypatch, [
+        '{"id":1,"method":"system.ping","params":{}}\n',
+        '{"id":2,"method":"system.ping","params":{}}\n',
+        '{"id":3,"method":"parts.read_file","params":{}}\n',
+    ])
+    assert len(out) == 3
+
+    out = _serve_lines(monkeypatch, ['{"id":4,"method":"system.metrics","params":{"reset":true}}\n'])
+    methods = out[0]["result"]["methods"]
+    assert methods["system.ping"]["count"] == 2
+    assert methods["system.ping"]["latency_ms"]["count"] == 2
+    assert methods["parts.read_file"]["errors"] == 1
+    # Only the metrics call itself (finished after the reset) is left
+    assert list(metrics.snapshot()["methods"]) == ["system.metrics"]
+    assert metrics.snapshot()["in_flight"] == 0
+
+
+def test_system_profile_start_stop_captures_handlers(monkeypatch, tmp_path):
+    monkeypatch.setenv("KIBRARY_SIDECAR_WORKERS", "1")
+    ws = json.dumps(str(tmp_path))
+    out = _serve_lines(monkeypatch, [
+        '{"id":1,"method":"system.profile_start","params":{"workspace":%s,"mode":"cprofile"}}\n' % ws,
+        '{"id":2,"method":"system.ping","params":{}}\n',
+        '{"id":3,"method":"system.profile_stop","params":{}}\n',
+    ])
+    by_id = {r["id"]: r for r in out}
+    assert by_id[1]["result"] == {"mode": "cprofile", "started": True}
+    result = by_id[3]["result"]
+    # profile_start itself ran before the session existed; ping and
+    # profile_stop are both inside it.
+    assert result["calls"] >= 1
+    assert (tmp_path / ".kibrary" / "cache" / "profiles").is_dir()
+    assert result["path"].endswith(".pstats")
+
+
+def _commit_many_setup(tmp_path):
+    """Stage C1–C3 and create a git workspace; returns (staging, workspace, repo)."""
+    import git
+
+    staging = tmp_path / "staging"
+    for lcsc in ("C1", "C2", "C3"):
+        pretty = staging / lcsc / f"{lcsc}.pretty"
+        pretty.mkdir(parents=True)
+        (staging / lcsc / f"{lcsc}.kicad_sym").write_text(
+            f'(kicad_symbol_lib (version 20211014) (generator None)\n'
+            f'  (symbol "{lcsc}" (in_bom yes) (on_board yes)\n'
+            f'    (property "Reference" "R" (id 0) (at 0.0 0.0 0))\n'
+            f'  )\n)\n'
+        )
+        (pretty / f"{lcsc}.kicad_mod").write_text(f'(footprint "{lcsc}" (layer "F.Cu"))\n')
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    repo = git.Repo.init(workspace)
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "Test")
+        cw.set_value("user", "email", "test@example.com")
+    (workspace / "README.md").write_text("ksl\n")
+    repo.index.add(["README.md"])
+    repo.index.commit("init")
+    return staging, workspace, repo
+
+
+def test_library_commit_many_streams_results_and_commits_per_library(monkeypatch, tmp_path):
+    staging, workspace, repo = _commit_many_setup(tmp_path)
+
+    params = {
+        "workspace": str(workspace),
+        "staging_dir": str(staging),
+        "parts": [
+            {"lcsc": "C1", "target_lib": "Resistors_KSL", "edits": {"Description": "1k"}},
+            {"lcsc": "C2", "target_lib": "Capacitors_KSL"},
+            {"lcsc": "C3", "target_lib": "Resistors_KSL"},
+        ],
+        "git_commit": "per_library",
+        "stream": True,
+    }
+    out = _serve_lines(monkeypatch, [json.dumps({"id": 3, "method": "library.commit_many", "params": params}) + "\n"])
+
+    items = [ln["params"]["items"][0] for ln in out if ln.get("event") == "stream.chunk"]
+    assert [(i["lcsc"], i["ok"]) for i in items] == [("C1", True), ("C3", True), ("C2", True)]
+    final = out[-1]["result"]
+    assert final["committed"] == 3 and final["count"] == 3
+    assert len(final["git_shas"]) == 2
+    messages = [c.message for c in repo.iter_commits(max_count=2)]
+    assert messages[0] == "Add C2 (C2) to Capacitors_KSL"
+    assert messages[1].startswith("Add 2 parts to Resistors_KSL\n\n- C1 (1k) to Resistors_KSL")
+    assert not repo.is_dirty(untracked_files=True)
+
+
+def test_library_commit_many_cancelled_midway_commits_finished_libraries(tmp_path):
+    import pytest
+    from kibrary_sidecar import cancellation, methods, workspace as ws
+
+    staging, workspace, repo = _commit_many_setup(tmp_path)
+    settings = ws.read_workspace_settings(str(workspace)) or {}
+    settings["git"] = {"enabled": True, "auto_commit": True}
+    ws.write_workspace_settings(str(workspace), settings)
+    repo.index.add([".kibrary"])
+    repo.index.commit("settings")
+
+    stream = methods.library_commit_many({
+        "workspace": str(workspace),
+        "staging_dir": str(staging),
+        "parts": [
+            {"lcsc": "C1", "target_lib": "Resistors_KSL"},
+            {"lcsc": "C2", "target_lib": "Capacitors_KSL"},
+        ],
+        "stream": True,
+    })
+
+    def emit(seq, items):
+        raise cancellation.Cancelled()
+
+    with pytest.raises(cancellation.Cancelled):
+        stream.drain(emit)
+
+    assert (workspace / "Resistors_KSL").is_dir()
+    assert not (workspace / "Capacitors_KSL").exists()
+    assert next(repo.iter_commits()).message == "Add C1 (C1) to Resistors_KSL"
+    assert not repo.is_dirty(untracked_files=True)
@@ -84,3 +84,30 @@ def test_get_part_returns_none_on_404():
 def test_get_part_returns_none_with_empty_api_key():
     """Empty api_key → None immediately, no network call."""
     assert get_part("C25804", api_key="") is None
+
+
+# ---------------------------------------------------------------------------
+# fetch_photo()
+# ---------------------------------------------------------------------------
+
+
+@respx.mock
+def test_fetch_photo_as_data_url_and_as_file(tmp_path):
+    from kibrary_sidecar import search_client
+
+    search_client._cache_clear()
+    route = respx.get(f"{BASE}/api/kibrary/parts/C1/photo").mock(
+        return_value=httpx.Response(200, content=b"JPEGDATA", headers={"content-type": "image/jpeg"})
+    )
+
+    inline = search_client.fetch_photo("C1", api_key="k")
+    assert inline == {"data_url": "data:image/jpeg;base64,SlBFR0RBVEE="}
+
+    as_file = search_client.fetch_photo("C1", api_key="k", blob_root=tmp_path)
+    assert as_file["content_type"] == "image/jpeg"
+    assert as_file["size"] == 8
+    assert as_file["path"].endswith(".jpg")
+    with open(as_file["path"], "rb") as fh:
+        assert fh.read() == b"JPEGDATA"
+    # Second call came from the in-process cache
+    assert route.call_count == 1
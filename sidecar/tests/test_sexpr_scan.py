@@ -0,0 +1,97 @@
+"""Tests for sexpr_scan.py — the read-only .kicad_sym scanner.
+
+The scanner must agree with kiutils on everything it reports, so most
+fixtures are written by kiutils and cross-checked against a kiutils parse.
+"""
+
+from pathlib import Path
+
+from kiutils.symbol import Symbol, SymbolLib
+
+from kibrary_sidecar.sexpr_scan import count_symbols, iter_symbols, read_header, scan_file
+
+FIXTURE_SYM = Path(__file__).parent / "fixtures" / "sample.kicad_sym"
+
+
+def _write_lib(path: Path) -> SymbolLib:
+    lib = SymbolLib.from_file(str(FIXTURE_SYM))
+    multi = Symbol.create_new(id="U_DUAL", reference="U", value='Quote "x" (paren)')
+    multi.units.append(Symbol.create_new(id="U_DUAL_1_1", reference="U", value="a"))
+    multi.units.append(Symbol.create_new(id="U_DUAL_2_1", reference="U", value="b"))
+    lib.symbols.append(multi)
+    lib.to_file(str(path))
+    return SymbolLib.from_file(str(path))
+
+
+def test_matches_kiutils_names_and_properties(tmp_path: Path):
+    path = tmp_path / "lib.kicad_sym"
+    lib = _write_lib(path)
+
+    scanned = scan_file(path)
+
+    assert [s["name"] for s in scanned] == [s.entryName for s in lib.symbols]
+    for got, want in zip(scanned, lib.symbols):
+        assert got["properties"] == {p.key: p.value for p in want.properties}
+
+
+def test_units_are_nested_not_top_level(tmp_path: Path):
+    path = tmp_path / "lib.kicad_sym"
+    _write_lib(path)
+
+    scanned = scan_file(path)
+
+    dual = scanned[-1]
+    assert [u["name"] for u in dual["units"]] == ["U_DUAL_1_1", "U_DUAL_2_1"]
+    # Unit properties must not leak into the parent's property dict
+    assert dual["properties"]["Value"] == 'Quote "x" (paren)'
+
+
+def test_byte_offsets_cover_the_symbol_node(tmp_path: Path):
+    path = tmp_path / "lib.kicad_sym"
+    _write_lib(path)
+    data = path.read_bytes()
+
+    for sym in iter_symbols(data):
+        chunk = data[sym["start"]:sym["end"]]
+        assert chunk.startswith(f'(symbol "{sym["name"]}"'.encode())
+        assert chunk.endswith(b")")
+        for unit in sym["units"]:
+            assert sym["start"] < unit["start"] < unit["end"] <= sym["end"]
+            assert data[unit["start"]:unit["end"]].startswith(
+                f'(symbol "{unit["name"]}"'.encode()
+            )
+
+
+def test_extends_is_reported():
+    data = (
+        b'(kicad_symbol_lib (version 20231120) (generator "kicad_symbol_editor")\n'
+        b'  (symbol "Base" (property "Reference" "U"))\n'
+        b'  (symbol "Derived" (extends "Base") (property "Value" "D"))\n'
+        b")\n"
+    )
+    scanned = list(iter_symbols(data))
+    assert [s["extends"] for s in scanned] == [None, "Base"]
+    assert scanned[1]["properties"] == {"Value": "D"}
+
+
+def test_read_header():
+    data = b'(kicad_symbol_lib (version 20231120) (generator "kicad_symbol_editor")\n)\n'
+    assert read_header(data) == {"version": "20231120", "generator": "kicad_symbol_editor"}
+
+
+def test_empty_file_yields_nothing(tmp_path: Path):
+    path = tmp_path / "empty.kicad_sym"
+    path.write_bytes(b"")
+    assert scan_file(path) == []
+
+
+def test_count_symbols_ignores_units_and_strings(tmp_path: Path):
+    path = tmp_path / "lib.kicad_sym"
+    _write_lib(path)
+    data = path.read_bytes()
+    # A property value that looks like structure must not be counted
+    data = data.replace(b'"100nF 0402"', b'"(symbol \\"fake\\" ((("')
+    path.write_bytes(data)
+
+    assert count_symbols(path) == 2
+    assert count_symbols(path) == len(scan_file(path))
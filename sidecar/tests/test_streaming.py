@@ -0,0 +1,35 @@
+"""Tests for streaming.py — paged handler results."""
+
+from kibrary_sidecar import streaming
+
+
+def test_drain_emits_pages_and_merges_return_value():
+    def pages():
+        yield [1, 2]
+        yield []  # empty pages are skipped
+        yield [3]
+        return {"total": 3}
+
+    sent = []
+    final = streaming.Stream(pages()).drain(lambda seq, items: sent.append((seq, items)))
+
+    assert sent == [(0, [1, 2]), (1, [3])]
+    assert final == {"total": 3, "count": 3, "chunks": 2}
+
+
+def test_paged_and_singles():
+    assert list(streaming.paged(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def gen():
+        yield "a"
+        yield "b"
+        return {"n": 2}
+
+    final = streaming.Stream(streaming.singles(gen())).drain(lambda *_: None)
+    assert final == {"n": 2, "count": 2, "chunks": 2}
+
+
+def test_wants_stream_defaults():
+    assert streaming.wants_stream({}) == (False, streaming.DEFAULT_PAGE_SIZE)
+    assert streaming.wants_stream({"stream": True, "page_size": 50}) == (True, 50)
+    assert streaming.wants_stream({"stream": True, "page_size": "x"})[1] == streaming.DEFAULT_PAGE_SIZE
@@ -0,0 +1,95 @@
+"""Tests for transfer.py — reflink / hard link / rename instead of copying."""
+
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from kibrary_sidecar import transfer
+from kibrary_sidecar.library import commit_to_library
+
+MODEL = b"ISO-10303-21;\n" + b"x" * 4096
+
+
+pytestmark = pytest.mark.usefixtures("fresh_index")
+
+
+@pytest.fixture
+def no_reflink(monkeypatch):
+    monkeypatch.setattr(transfer, "_reflink", lambda src, dst: False)
+
+
+def test_link_prefers_hard_link_and_falls_back_to_copy(tmp_path: Path, no_reflink, monkeypatch):
+    src = tmp_path / "model.step"
+    src.write_bytes(MODEL)
+
+    assert transfer.link(src, tmp_path / "a.step") == "hardlink"
+    assert os.path.samefile(src, tmp_path / "a.step")
+
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device)
+    assert transfer.link(src, tmp_path / "b.step") == "copy"
+    assert (tmp_path / "b.step").read_bytes() == MODEL
+    assert not os.path.samefile(src, tmp_path / "b.step")
+
+
+def test_clone_never_shares_the_file(tmp_path: Path):
+    src = tmp_path / "fp.kicad_mod"
+    src.write_text("(footprint)")
+    dst = tmp_path / "copy.kicad_mod"
+
+    assert transfer.clone(src, dst) in ("reflink", "copy")
+    dst.write_text("(footprint edited)")
+    assert src.read_text() == "(footprint)"
+
+
+def test_reflink_failure_leaves_no_file(tmp_path: Path, monkeypatch):
+    src = tmp_path / "model.step"
+    src.write_bytes(MODEL)
+
+    def unsupported(fd, request, arg):
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    if transfer.fcntl is None:
+        pytest.skip("no fcntl")
+    monkeypatch.setattr(transfer.fcntl, "ioctl", unsupported)
+    assert transfer.clone(src, tmp_path / "dst.step") == "copy"
+    assert (tmp_path / "dst.step").read_bytes() == MODEL
+
+
+def test_merge_links_models_and_keeps_staging(tmp_path: Path, no_reflink, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", model=MODEL), "Lib_KSL", {})
+
+    part = staged_part(tmp_path / "s", "C2", model=MODEL)
+    counts: dict = {}
+    commit_to_library(ws, "C2", part, "Lib_KSL", {}, transferred=counts)
+
+    model = ws / "Lib_KSL" / "Lib_KSL.3dshapes" / "C2.step"
+    assert os.path.samefile(model, part / "C2.3dshapes" / "C2.step")
+    mod = ws / "Lib_KSL" / "Lib_KSL.pretty" / "C2.kicad_mod"
+    assert "${KSL_ROOT}/Lib_KSL/Lib_KSL.3dshapes/C2.step" in mod.read_text()
+    assert "${KSL_ROOT}" not in (part / "C2.pretty" / "C2.kicad_mod").read_text()
+    assert counts == {"linked": len(MODEL), "copied": (part / "C2.pretty" / "C2.kicad_mod").stat().st_size}
+
+
+def test_merge_with_consume_staging_moves_files(tmp_path: Path, no_reflink, staged_part):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    commit_to_library(ws, "C1", staged_part(tmp_path / "s", "C1", model=MODEL), "Lib_KSL", {})
+
+    part = staged_part(tmp_path / "s", "C2", model=MODEL)
+    inode = (part / "C2.3dshapes" / "C2.step").stat().st_ino
+    counts: dict = {}
+    commit_to_library(ws, "C2", part, "Lib_KSL", {}, consume_staging=True, transferred=counts)
+
+    model = ws / "Lib_KSL" / "Lib_KSL.3dshapes" / "C2.step"
+    assert model.stat().st_ino == inode
+    assert not (part / "C2.3dshapes" / "C2.step").exists()
+    assert not (part / "C2.pretty" / "C2.kicad_mod").exists()
+    assert not (part / "C2.kicad_sym").exists()
+    assert counts["linked"] == len(MODEL)
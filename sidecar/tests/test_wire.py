@@ -0,0 +1,34 @@
+"""Tests for wire.py — response encoding and the stdout writer thread."""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+from kibrary_sidecar import wire
+
+
+def test_encode_handles_paths_and_sets():
+    out = json.loads(wire.encode({"path": Path("/tmp/x"), "tags": {"a"}, "n": None}))
+    assert out == {"path": "/tmp/x", "tags": ["a"], "n": None}
+
+
+def test_encode_without_orjson_matches(monkeypatch):
+    obj = {"id": 1, "ok": True, "result": {"text": 'ü "q"\n', "path": Path("p")}}
+    fast = json.loads(wire.encode(obj))
+    monkeypatch.setattr(wire, "orjson", None)
+    assert json.loads(wire.encode(obj)) == fast == {
+        "id": 1, "ok": True, "result": {"text": 'ü "q"\n', "path": "p"},
+    }
+
+
+def test_writer_keeps_order_and_drains_on_close(monkeypatch):
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    writer = wire.StdoutWriter()
+    for i in range(1000):
+        writer.write(wire.encode({"event": "e", "params": {"i": i}}))
+    writer.close()
+
+    lines = [json.loads(ln) for ln in stdout.getvalue().splitlines()]
+    assert [ln["params"]["i"] for ln in lines] == list(range(1000))
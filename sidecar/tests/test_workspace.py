@@ -33,3 +33,23 @@ def test_open_workspace_first_run_false_when_existing(tmp_path: Path):
     open_workspace(str(ws))  # creates workspace.json
     info = open_workspace(str(ws))  # second call — not first run
     assert info["first_run"] is False
+
+def test_write_workspace_settings_roundtrips(tmp_path: Path):
+    from kibrary_sidecar.workspace import write_workspace_settings
+    ws = tmp_path / "repo3"
+    ws.mkdir()
+    open_workspace(str(ws))
+    settings = read_workspace_settings(str(ws))
+    settings["scan_workers"] = 3
+    write_workspace_settings(str(ws), settings)
+    assert read_workspace_settings(str(ws))["scan_workers"] == 3
+
+def test_scan_workers_zero_means_auto(tmp_path: Path):
+    import os
+    from kibrary_sidecar.workspace import AUTO_SCAN_WORKERS, scan_workers, write_workspace_settings
+    ws = tmp_path / "repo4"
+    ws.mkdir()
+    open_workspace(str(ws))
+    assert scan_workers(str(ws)) == min(AUTO_SCAN_WORKERS, os.cpu_count() or 1)
+    write_workspace_settings(str(ws), {"scan_workers": 2})
+    assert scan_workers(str(ws)) == 2
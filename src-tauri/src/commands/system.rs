@@ -33,11 +33,15 @@ pub async fn sidecar_version(sidecar: State<'_, Arc<Sidecar>>) -> Result<Value,
     sidecar.call("system.version", json!({})).await.map_err(|e| e.to_string())
 }
 
+/// Forward one JSON-RPC call to the sidecar.  An optional `tag` names the
+/// call for [`sidecar_cancel`]; a new call with the same tag cancels the
+/// previous one (see `Sidecar::call_tagged`).
 #[tauri::command]
 pub async fn sidecar_call(
     sidecar: State<'_, Arc<Sidecar>>,
     method: String,
     params: Value,
+    tag: Option<String>,
 ) -> Result<Value, String> {
     // Intercept search.raph.io API key reads — serve the compile-time-embedded
     // key directly so the user is never asked for one. Any other secret name
@@ -54,5 +58,14 @@ pub async fn sidecar_call(
         return Ok(json!({}));
     }
 
-    sidecar.call(&method, params).await.map_err(|e| e.to_string())
+    sidecar
+        .call_tagged(&method, params, tag.as_deref())
+        .await
+        .map_err(|e| e.to_string())
+}
+
+/// Cancel the in-flight `sidecar_call` made with `tag`; `false` if none is.
+#[tauri::command]
+pub async fn sidecar_cancel(sidecar: State<'_, Arc<Sidecar>>, tag: String) -> Result<bool, String> {
+    sidecar.cancel(&tag).await.map_err(|e| e.to_string())
 }
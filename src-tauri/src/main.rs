@@ -140,6 +140,7 @@ fn main() -> anyhow::Result<()> {
             commands::sidecar_ping,
             commands::sidecar_version,
             commands::sidecar_call,
+            commands::sidecar_cancel,
             commands::workspace_open,
             watcher::watch_workspace,
             bootstrap::bootstrap_status,
@@ -1,5 +1,5 @@
 use anyhow::{anyhow, Result};
-use serde_json::Value;
+use serde_json::{json, Value};
 use std::collections::HashMap;
 use std::process::Stdio;
 use std::sync::atomic::{AtomicU64, Ordering};
@@ -42,6 +42,10 @@ fn build_command(program: &str, args: &[&str]) -> Command {
 pub struct Sidecar {
     stdin: Arc<Mutex<ChildStdin>>,
     pending: Arc<Mutex<HashMap<u64, oneshot::Sender<Response>>>>,
+    /// Caller-chosen tag → request id of the in-flight call made with it.
+    /// Request ids are private to the shell; tags are how the frontend
+    /// names a call it wants to cancel or whose `stream.chunk`s it wants.
+    tags: Arc<Mutex<HashMap<String, u64>>>,
     next_id: AtomicU64,
     _child: Child,
 }
@@ -70,6 +74,8 @@ impl Sidecar {
         let pending: Arc<Mutex<HashMap<u64, oneshot::Sender<Response>>>> =
             Arc::new(Mutex::new(HashMap::new()));
         let pending_for_reader = pending.clone();
+        let tags: Arc<Mutex<HashMap<String, u64>>> = Arc::new(Mutex::new(HashMap::new()));
+        let tags_for_reader = tags.clone();
 
         // stdout reader → JSON-RPC responses + Tauri notifications.
         tokio::spawn(async move {
@@ -79,7 +85,21 @@ impl Sidecar {
                     if let Some(tx) = pending_for_reader.lock().await.remove(&resp.id) {
                         let _ = tx.send(resp);
                     }
-                } else if let Ok(n) = serde_json::from_str::<Notification>(&line) {
+                } else if let Ok(mut n) = serde_json::from_str::<Notification>(&line) {
+                    // Request ids mean nothing to the frontend: label the
+                    // notifications of a tagged call (stream.chunk) with
+                    // its tag so a listener can pick out its own.
+                    if let Some(id) = n.params.get("id").and_then(Value::as_u64) {
+                        let tag = tags_for_reader
+                            .lock()
+                            .await
+                            .iter()
+                            .find(|(_, v)| **v == id)
+                            .map(|(t, _)| t.clone());
+                        if let (Some(tag), Some(obj)) = (tag, n.params.as_object_mut()) {
+                            obj.insert("tag".into(), Value::String(tag));
+                        }
+                    }
                     if let Some(handle) = APP_HANDLE.get() {
                         use tauri::Emitter;
                         let _ = handle.emit(&n.event, n.params);
@@ -105,6 +125,7 @@ impl Sidecar {
         Ok(Self {
             stdin: Arc::new(Mutex::new(stdin)),
             pending,
+            tags,
             next_id: AtomicU64::new(1),
             _child: child,
         })
@@ -126,17 +147,40 @@ impl Sidecar {
     }
 
     pub async fn call(&self, method: &str, params: Value) -> Result<Value> {
+        self.call_tagged(method, params, None).await
+    }
+
+    /// [`call`](Self::call), optionally under a caller-chosen `tag`.
+    ///
+    /// A tagged call supersedes the in-flight call with the same tag: that
+    /// one is sent `$/cancel` and fails with `CANCELLED`.  This is what a
+    /// search-as-you-type box wants — each keystroke's query replaces the
+    /// last.  [`cancel`](Self::cancel) cancels a tagged call outright.
+    pub async fn call_tagged(&self, method: &str, params: Value, tag: Option<&str>) -> Result<Value> {
         let id = self.next_id.fetch_add(1, Ordering::SeqCst);
         let (tx, rx) = oneshot::channel();
         self.pending.lock().await.insert(id, tx);
 
-        let req = Request { id, method: method.into(), params };
-        let mut line = serde_json::to_string(&req)?;
-        line.push('\n');
-        self.stdin.lock().await.write_all(line.as_bytes()).await?;
-        self.stdin.lock().await.flush().await?;
+        if let Some(tag) = tag {
+            let superseded = self.tags.lock().await.insert(tag.to_string(), id);
+            if let Some(old) = superseded {
+                // a broken pipe surfaces from the write below
+                let _ = self.send_cancel(old).await;
+            }
+        }
+        let sent = self.write(&Request { id, method: method.into(), params }).await;
+        let resp = match sent {
+            Ok(()) => rx.await.map_err(anyhow::Error::from),
+            Err(e) => Err(e),
+        };
+        if let Some(tag) = tag {
+            let mut tags = self.tags.lock().await;
+            if tags.get(tag) == Some(&id) {
+                tags.remove(tag);
+            }
+        }
 
-        let resp = rx.await?;
+        let resp = resp?;
         if resp.ok {
             Ok(resp.result.unwrap_or(Value::Null))
         } else {
@@ -144,6 +188,36 @@ impl Sidecar {
             Err(anyhow!("{}: {}", e.code, e.message))
         }
     }
+
+    /// Cancel the in-flight call made with `tag`.  Returns whether there
+    /// was one; the call itself then fails with `CANCELLED`.
+    pub async fn cancel(&self, tag: &str) -> Result<bool> {
+        let id = self.tags.lock().await.get(tag).copied();
+        match id {
+            Some(id) => {
+                self.send_cancel(id).await?;
+                Ok(true)
+            }
+            None => Ok(false),
+        }
+    }
+
+    /// Send `$/cancel` for request `id`.  Its own response has no pending
+    /// entry, so the reader drops it.
+    async fn send_cancel(&self, id: u64) -> Result<()> {
+        let cancel_id = self.next_id.fetch_add(1, Ordering::SeqCst);
+        self.write(&Request { id: cancel_id, method: "$/cancel".into(), params: json!({ "id": id }) })
+            .await
+    }
+
+    async fn write(&self, req: &Request) -> Result<()> {
+        let mut line = serde_json::to_string(req)?;
+        line.push('\n');
+        let mut stdin = self.stdin.lock().await;
+        stdin.write_all(line.as_bytes()).await?;
+        stdin.flush().await?;
+        Ok(())
+    }
 }
 
 // ---------------------------------------------------------------------------
@@ -1,6 +1,73 @@
 import { invoke } from '@tauri-apps/api/core';
+import { listen } from '@tauri-apps/api/event';
+
+export interface SidecarResponse<T = unknown> {
+  id: number;
+  ok: boolean;
+  result?: T;
+  error?: { code: string; message: string };
+}
+
+/** True for the error of a call that was cancelled (`CANCELLED: …`). */
+export const isCancelled = (e: unknown) => String(e).startsWith('CANCELLED');
+
+/** One page of a streamed result; the shell adds `tag` for tagged calls. */
+interface StreamChunk<T> {
+  id: number;
+  seq: number;
+  items: T[];
+  tag?: string;
+}
+
+// Newest stream per tag — a superseded stream must not see its successor's pages.
+const streamTokens = new Map<string, number>();
+let nextStreamToken = 0;
 
 export const sidecar = {
   ping: () => invoke<{ pong: boolean }>('sidecar_ping'),
   version: () => invoke<{ version: string }>('sidecar_version'),
+  /**
+   * Call a sidecar method. With a `tag`, the call supersedes any in-flight
+   * call made with the same tag — that one rejects with a CANCELLED error
+   * (see `isCancelled`) — and `sidecar.cancel(tag)` can cancel it.
+   */
+  call: <T = unknown>(method: string, params: object = {}, tag?: string) =>
+    invoke<T>('sidecar_call', { method, params, tag }),
+  /** Cancel the in-flight call made with `tag`; false if there is none. */
+  cancel: (tag: string) => invoke<boolean>('sidecar_cancel', { tag }),
+  /**
+   * Call a streaming method (`stream: true`) under `tag`, handing each
+   * `stream.chunk` page to `onItems` as it arrives. Resolves with the final
+   * `{ count, chunks }` once the last page is out; like `call`, a newer
+   * stream with the same tag cancels this one.
+   */
+  stream: async <T>(method: string, params: object, tag: string, onItems: (items: T[]) => void) => {
+    const token = ++nextStreamToken;
+    streamTokens.set(tag, token);
+    const unlisten = await listen<StreamChunk<T>>('stream.chunk', (e) => {
+      if (e.payload.tag === tag && streamTokens.get(tag) === token) onItems(e.payload.items);
+    });
+    try {
+      return await invoke<{ count: number; chunks: number }>('sidecar_call', {
+        method,
+        params: { ...params, stream: true },
+        tag,
+      });
+    } finally {
+      unlisten();
+      if (streamTokens.get(tag) === token) streamTokens.delete(tag);
+    }
+  },
+  /**
+   * Send several calls in one `$/batch` round trip. Responses come back in
+   * call order; a failing call only fails its own entry.
+   */
+  batch: async <T = unknown>(calls: { method: string; params?: object }[]) => {
+    const requests = calls.map((c, i) => ({ id: i + 1, method: c.method, params: c.params ?? {} }));
+    const res = await invoke<{ responses: SidecarResponse<T>[] }>('sidecar_call', {
+      method: '$/batch',
+      params: { requests },
+    });
+    return res.responses;
+  },
 };
@@ -11,6 +11,7 @@
 
 import { createResource, createSignal, For, Show } from 'solid-js';
 import { invoke } from '@tauri-apps/api/core';
+import { sidecar } from '~/api/sidecar';
 import { currentWorkspace } from '~/state/workspace';
 import { pushToast } from '~/state/toasts';
 import {
@@ -156,6 +157,8 @@ interface ComponentListResult {
   components: ComponentInfo[];
 }
 
+const COMPONENTS_TAG = 'component-list.components';
+
 type ModalKind = 'rename' | 'move' | 'delete' | null;
 
 // ---------------------------------------------------------------------------
@@ -195,6 +198,24 @@ export default function ComponentList() {
   // For inline (single-component) actions; null means bulk selection is the scope
   const [modalTarget, setModalTarget] = createSignal<string | null>(null);
 
+  // Rows stream in page by page while the sidecar scans a stale library;
+  // the resource settles once the last page is out.
+  const [rows, setRows] = createSignal<ComponentInfo[]>([]);
+  // Icon SVGs keyed on lib_dir + component_name, fetched one batch per page
+  const [icons, setIcons] = createSignal<Map<string, string | null>>(new Map());
+
+  const hydrateIcons = async (dir: string, page: ComponentInfo[]) => {
+    const responses = await sidecar.batch<IconGetResult>(
+      page.map((c) => ({
+        method: 'library.get_component_icon',
+        params: { lib_dir: dir, component_name: c.name },
+      })),
+    ).catch(() => []);
+    const next = new Map(icons());
+    responses.forEach((r, i) => next.set(`${dir}::${page[i].name}`, r.ok ? r.result?.svg ?? null : null));
+    setIcons(next);
+  };
+
   const [components, { refetch }] = createResource<ComponentListResult | null, string | null>(
     () => {
       const ws = currentWorkspace();
@@ -204,18 +225,30 @@ export default function ComponentList() {
       return `${ws.root}::${lib}`;
     },
     async (key) => {
+      setRows([]);
+      setIcons(new Map());
       if (!key) return null;
       const [wsRoot, libName] = key.split('::');
-      return invoke<ComponentListResult>('sidecar_call', {
-        method: 'library.list_components',
-        params: { lib_dir: `${wsRoot}/${libName}` },
-      });
+      const dir = `${wsRoot}/${libName}`;
+      const all: ComponentInfo[] = [];
+      // One tag for the pane: switching library cancels the previous listing
+      await sidecar.stream<ComponentInfo>(
+        'library.list_components',
+        { lib_dir: dir },
+        COMPONENTS_TAG,
+        (items) => {
+          all.push(...items);
+          setRows([...all]);
+          void hydrateIcons(dir, items);
+        },
+      );
+      return { components: all };
     }
   );
 
   const filtered = () => {
     const q = search().toLowerCase().trim();
-    const all = components()?.components ?? [];
+    const all = rows();
     if (!q) return all;
     return all.filter(
       (c) =>
@@ -261,7 +294,7 @@ export default function ComponentList() {
           fallback={<span class="text-sm font-medium text-zinc-700 dark:text-zinc-300">Components</span>}
         >
           <span class="text-sm font-medium text-zinc-700 dark:text-zinc-300">
-            {lib()} ({components()?.components.length ?? '…'})
+            {lib()} ({components.loading ? '…' : rows().length})
           </span>
         </Show>
       </div>
@@ -296,7 +329,7 @@ export default function ComponentList() {
         </div>
 
         {/* Loading */}
-        <Show when={components.loading}>
+        <Show when={components.loading && rows().length === 0}>
           <div class="flex-1 flex items-center justify-center px-3">
             <span class="text-xs text-zinc-600 dark:text-zinc-400">Loading components…</span>
           </div>
@@ -310,7 +343,7 @@ export default function ComponentList() {
         </Show>
 
         {/* Component list */}
-        <Show when={!components.loading && !components.error}>
+        <Show when={!components.error && (!components.loading || rows().length > 0)}>
           <div class="flex-1 overflow-y-auto">
             <Show
               when={filtered().length > 0}
@@ -325,28 +358,7 @@ export default function ComponentList() {
                   const isSelected = () => selectedComponent() === comp.name;
                   const isChecked = () => multiSelected().has(comp.name);
 
-                  // Fetch icon SVG — keyed on lib_dir + component_name
-                  const [iconData] = createResource<IconGetResult | null, string>(
-                    () => {
-                      const dir = libDir();
-                      if (!dir) return '';
-                      return `${dir}::${comp.name}`;
-                    },
-                    async (key) => {
-                      if (!key) return null;
-                      const [dir, name] = key.split('::');
-                      try {
-                        return await invoke<IconGetResult>('sidecar_call', {
-                          method: 'library.get_component_icon',
-                          params: { lib_dir: dir, component_name: name },
-                        });
-                      } catch {
-                        return null;
-                      }
-                    },
-                  );
-
-                  const icon = () => iconData()?.svg ?? null;
+                  const icon = () => icons().get(`${libDir()}::${comp.name}`) ?? null;
 
                   return (
                     <div
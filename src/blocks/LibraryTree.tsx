@@ -26,14 +26,25 @@ interface LibraryListResult {
 export default function LibraryTree() {
   const ws = currentWorkspace();
 
-  const [libs] = createResource<LibraryListResult | null, string | null>(
+  const [libs, { mutate }] = createResource<LibraryListResult | null, string | null>(
     () => currentWorkspace()?.root ?? null,
     async (root) => {
       if (!root) return null;
-      return invoke<LibraryListResult>('sidecar_call', {
+      // Render from the cheap `fast` listing first (symbol counts only), then
+      // swap in the full listing once the sidecar has refreshed its index.
+      const quick = await invoke<LibraryListResult>('sidecar_call', {
         method: 'library.list',
-        params: { workspace: root },
+        params: { workspace: root, fast: true },
       });
+      invoke<LibraryListResult>('sidecar_call', {
+        method: 'library.list',
+        params: { workspace: root },
+      })
+        .then((full) => {
+          if (currentWorkspace()?.root === root) mutate(full);
+        })
+        .catch((e) => console.warn('[LibraryTree] full library.list failed', e));
+      return quick;
     }
   );
 
@@ -150,31 +150,41 @@ export default function ReviewBulkAssign() {
     if (!ws) return;
     const stagingDir = `${ws.root}/.kibrary/staging`;
 
-    await Promise.all(
-      rows().map(async (row) => {
-        const targetLib = row.overrideLib.trim() || row.suggestedLib;
-        updateRow(row.lcsc, { saveState: 'saving', errorMsg: '' });
-        setStatus(row.lcsc, 'committing');
-        try {
-          await invoke('sidecar_call', {
-            method: 'library.commit',
-            params: {
-              workspace: ws.root,
-              lcsc: row.lcsc,
-              staging_dir: stagingDir,
-              target_lib: targetLib,
-              edits: row.edits,
-            },
-          });
-          updateRow(row.lcsc, { saveState: 'ok' });
-          setStatus(row.lcsc, 'committed');
-        } catch (e) {
-          const msg = String(e);
-          updateRow(row.lcsc, { saveState: 'error', errorMsg: msg });
-          setStatus(row.lcsc, 'failed', msg);
+    // One batched call: the sidecar writes each target library once and
+    // makes a single git commit, instead of racing one commit per row.
+    const batch = rows().map((row) => ({
+      lcsc: row.lcsc,
+      target_lib: row.overrideLib.trim() || row.suggestedLib,
+      edits: row.edits,
+    }));
+    for (const part of batch) {
+      updateRow(part.lcsc, { saveState: 'saving', errorMsg: '' });
+      setStatus(part.lcsc, 'committing');
+    }
+    try {
+      const res = await invoke<{
+        results: { lcsc: string; ok: boolean; error?: string }[];
+      }>('sidecar_call', {
+        method: 'library.commit_many',
+        params: { workspace: ws.root, staging_dir: stagingDir, parts: batch },
+      });
+      for (const r of res.results) {
+        if (r.ok) {
+          updateRow(r.lcsc, { saveState: 'ok' });
+          setStatus(r.lcsc, 'committed');
+        } else {
+          const msg = r.error ?? 'commit failed';
+          updateRow(r.lcsc, { saveState: 'error', errorMsg: msg });
+          setStatus(r.lcsc, 'failed', msg);
         }
-      }),
-    );
+      }
+    } catch (e) {
+      const msg = String(e);
+      for (const part of batch) {
+        updateRow(part.lcsc, { saveState: 'error', errorMsg: msg });
+        setStatus(part.lcsc, 'failed', msg);
+      }
+    }
   };
 
   return (
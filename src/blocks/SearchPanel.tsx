@@ -7,7 +7,8 @@
  * Behaviour (spec §8):
  *  - On mount: fetch api_key from OS keychain and base_url from settings.
  *    If api_key is empty → render null.
- *  - Debounced (250 ms) text input calls sidecar_call('search.query', { q }).
+ *  - Debounced (250 ms) text input calls sidecar_call('search.query', { q }),
+ *    tagged so that a newer query cancels the one still in flight.
  *  - Results rendered as scrollable card list with thumbnail, description, MPN,
  *    and "+ Add" button that calls enqueue().
  *  - Inline error banner on result.error; "No matches" when results empty.
@@ -19,6 +20,7 @@ import { invoke } from '@tauri-apps/api/core';
 // to `openUrl` for readability at the call site (and to match the Tauri 1.x
 // name some docs still reference).
 import { open as openUrl } from '@tauri-apps/plugin-shell';
+import { isCancelled, sidecar } from '~/api/sidecar';
 import { enqueue } from '~/state/queue';
 
 // ---------------------------------------------------------------------------
@@ -142,6 +144,8 @@ function AuthedThumbnail(props: AuthedThumbnailProps) {
 // Component
 // ---------------------------------------------------------------------------
 
+const SEARCH_TAG = 'search-panel.query';
+
 export default function SearchPanel() {
   // Load settings for base_url, and api_key separately from OS keychain.
   const [settingsData] = createResource<{ settings: Settings }>(() =>
@@ -176,9 +180,13 @@ export default function SearchPanel() {
   const [searching, setSearching] = createSignal(false);
 
   let debounceTimer: ReturnType<typeof setTimeout> | undefined;
+  // Bumped per search; only the latest one may touch the UI state.
+  let searchSeq = 0;
 
   const runSearch = async (q: string) => {
+    const seq = ++searchSeq;
     if (!q.trim()) {
+      void sidecar.cancel(SEARCH_TAG).catch(() => {});
       setResults([]);
       setSearchError(null);
       setSearching(false);
@@ -187,10 +195,9 @@ export default function SearchPanel() {
     setSearching(true);
     setSearchError(null);
     try {
-      const resp = await invoke<SearchResponse>('sidecar_call', {
-        method: 'search.query',
-        params: { q },
-      });
+      // Same tag every time: the sidecar drops the query this one supersedes.
+      const resp = await sidecar.call<SearchResponse>('search.query', { q }, SEARCH_TAG);
+      if (seq !== searchSeq) return;
       if (resp.error) {
         setSearchError(resp.error);
         setResults([]);
@@ -198,10 +205,11 @@ export default function SearchPanel() {
         setResults(resp.results ?? []);
       }
     } catch (e) {
+      if (seq !== searchSeq || isCancelled(e)) return;
       setSearchError(String(e));
       setResults([]);
     } finally {
-      setSearching(false);
+      if (seq === searchSeq) setSearching(false);
     }
   };
 